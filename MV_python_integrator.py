@@ -1,36 +1,51 @@
 # -*- coding: utf-8 -*-
 
 
+import os
 import sys
-from py4j.java_gateway import JavaGateway, GatewayParameters, CallbackServerParameters
 
 #Here you should replace 'model_file_name' with the name of the .py file containing your model (without .py)
 import sequence_model
+from sequence.utils import trace
 import logging
 
 class SimulationWrapper(object):
 
 	# constructor for Python
-	def __init__(self, model):
+	# with batch_steps, one multivesta step advances until a query observable may change (see SequenceModel.run_until_change)
+	def __init__(self, model, batch_steps=False):
 		self.model: sequence_model.SequenceModel = model
+		self.batch_steps = batch_steps
+		# compiled observations: {observation: handle}, and the accessor of each handle
+		self.handles = {}
+		self.accessors = []
 
 	# code to let multivesta initialize the simulator for a new simulation
 	# that is, re-initialize the model to its initial state, and set the
 	# new random seed
 	def setSimulatorForNewSimulation(self, random_seed):
-		print('setSimulatorForNewSimulation')
+		trace.trace('setSimulatorForNewSimulation')
 		self.model.set_simulator_for_new_simulation(random_seed)	
 
 	# code to let multivesta ask the simulator to perform a step of simulation
 	def performOneStepOfSimulation(self):
-		print('onestep')
-		self.model.one_step()
+		trace.trace('onestep')
+		if self.batch_steps:
+			self.model.run_until_change()
+		else:
+			self.model.one_step()
+
+	# code to let multivesta advance the simulator until an observation
+	# used by the query may have changed (many events in one call)
+	def performStepsUntilChange(self):
+		trace.trace('steps')
+		return self.model.run_until_change()
 
 	# code to let multivesta ask the simulator to perform a
 	# "whole simulation"
 	# (i.e., until a stopping condition is found by the simulator)
 	def performWholeSimulation(self):
-		print('whole')
+		trace.trace('whole')
 		self.model.run()
 
 	# code to let multivesta ask the simulator the current simulated time
@@ -40,44 +55,63 @@ class SimulationWrapper(object):
 
 	# code to let multivesta ask the simulator to return the value of the
 	# specified observation in the current state of the simulation
+	# (each distinct observation is parsed once, see compile)
 	def rval(self, observation):
+		handle = self.handles.get(observation)
+		if handle is None:
+			handle = self.compile(observation)
+		ret_val = self.accessors[handle]()
+		if trace.enabled:
+			trace.trace(f'--- {observation} -> {ret_val}')
+		return ret_val
+
+	# values of several observations in one call (e.g. all the observations of a query),
+	# for python-side drivers: the multivesta interface only calls rval
+	def rvals(self, observations):
+		values = []
+		for observation in observations:
+			handle = self.handles.get(observation)
+			if handle is None:
+				handle = self.compile(observation)
+			values.append(self.accessors[handle]())
+		return values
+
+	# parse an observation into an accessor of its value, and return the accessor's handle (index in accessors)
+	# observations: 3 (simulation completed), 4 (a-c entangled), 5 (a-c entanglement time),
+	# "Entangled: (n1, n2)", "MEM_LIFETIME: t", "SWAP_FAILED: 1", "RETRIALS: (n1, n2)" and "FIDELITY: (n1, n2)";
+	# the value of other observations is None
+	def compile(self, observation):
+		if observation in self.handles:
+			return self.handles[observation]
+		model = self.model
+		accessor = lambda: None
 		if type(observation) == int:
 			if observation == 3:
-				ret_val = self.model.is_simulation_completed()
-				print('--- Is simulation complete: ', ret_val)
-				return float(ret_val)
-			if observation == 4:	#checks if the entanglement between a and c is complete
-				ret_val = self.model.a_c_entangled()
-				print('--- self.model.a_c_entangled(): ', ret_val)
-				return float(ret_val)
+				accessor = lambda: float(model.is_simulation_completed())
+			elif observation == 4:	#checks if the entanglement between a and c is complete
+				accessor = lambda: float(model.a_c_entangled())
 			elif observation == 5:  #a_c entanglement time
-				return float(self.model.entanglement_time())
+				accessor = lambda: float(model.entanglement_time())
 		elif type(observation) == str:
-			observation = observation.replace(' ', '')
-			# print(observation)
-			task, args = observation.split(':')
-			# print(f'Task: {task} and Args: {args}')
-			if task == "Entangled":
+			task, args = observation.replace(' ', '').split(':')
+			if task in ("Entangled", "RETRIALS", "FIDELITY"):
 				node1, node2 = args[1:-1].split(',')
-				ret_val = self.model.entangled(node1, node2)
-				print(f'--- {node1} and {node2} entanglement status-> {ret_val}')
-				return float(ret_val)
+			if task == "Entangled":
+				entangled = model.entangled_accessor(node1, node2)
+				accessor = lambda: float(entangled())
 			elif task == "MEM_LIFETIME":
 				lifetime = int(args.strip())
-				ret_val = self.model.all_mem_life_above(lifetime)
-				return float(ret_val)
+				accessor = lambda: float(model.all_mem_life_above(lifetime))
 			elif task == "SWAP_FAILED":
-				return self.model.swap_failed()
+				accessor = model.swap_failed
 			elif task == "RETRIALS":
-				node1, node2 = args[1:-1].split(',')
-				ret_val = self.model.retrial_count(node1, node2)
-				print(f'--- {node1} and {node2} retrials count-> {ret_val}')
-				return float(ret_val)
+				retrial_count = model.retrial_count_accessor(node1, node2)
+				accessor = lambda: float(retrial_count())
 			elif task == "FIDELITY":
-				node1, node2 = args[1:-1].split(',')
-				ret_val = self.model.fidelity(node1, node2)
-				print(f'--- {node1} and {node2} fidelity-> {ret_val}')
-				return float(ret_val)
+				accessor = lambda: float(model.fidelity(node1, node2))
+		self.handles[observation] = len(self.accessors)
+		self.accessors.append(accessor)
+		return self.handles[observation]
 		
 
 	class Java:
@@ -85,6 +119,9 @@ class SimulationWrapper(object):
 
 
 if __name__ == '__main__':
+	# py4j is only needed to serve multivesta, not to import the wrapper
+	from py4j.java_gateway import JavaGateway, GatewayParameters, CallbackServerParameters
+
 	print('\n--------------------------')
 	print('Entered Python Integartion')
 	print('--------------------------')
@@ -99,8 +136,19 @@ if __name__ == '__main__':
 	# logger.addHandler(logging.StreamHandler())
 	# gateway.jvm.py4j.GatewayServer.turnLoggingOn()
 
+	# set SEQUENCE_TRACE to get the per-step trace of the simulator and of this wrapper
+	if os.environ.get('SEQUENCE_TRACE'):
+		trace.set_trace()
+
 	#Here you should put any initialization code you need to create an instance of
 	#your model_file_name class
 	
-	model=sequence_model.SequenceModel()
-	gateway.entry_point.playWithState(SimulationWrapper(model))
\ No newline at end of file
+	# set SEQUENCE_OBSERVATION_TIMES to the comma-separated times (in seconds) the query compares rval(0) against,
+	# e.g. "2.1" for P_ac(T) with T = 2100, to advance several events per multivesta step
+	observation_times = os.environ.get('SEQUENCE_OBSERVATION_TIMES')
+	if observation_times:
+		model=sequence_model.SequenceModel([float(t) for t in observation_times.split(',')])
+		gateway.entry_point.playWithState(SimulationWrapper(model, batch_steps=True))
+	else:
+		model=sequence_model.SequenceModel()
+		gateway.entry_point.playWithState(SimulationWrapper(model))
\ No newline at end of file
@@ -149,7 +149,7 @@ class RandomRequestApp():
         """
 
         for card in self.node.network_manager.protocol_stack[1].timecards:
-            if reservation in card.reservations:
+            if reservation in card:
                 process = Process(self, "add_memo_reserve_map", [card.memory_index, reservation])
                 event = Event(reservation.start_time, process)
                 self.node.timeline.schedule(event)
@@ -1,45 +1,61 @@
 """Models for simulation of quantum circuit.
 
-This module introduces the QuantumCircuit class. The qutip library is used to calculate the unitary matrix of a circuit.
+This module introduces the QuantumCircuit class.
+The unitary matrix of a circuit is built with numpy, by applying each gate to the axes of its qubits.
 """
 
-from math import e, pi
+from math import e, pi, sqrt
 from typing import List
 
 import numpy as np
-from qutip.qip.circuit import QubitCircuit
-from qutip.qip.operations import gate_sequence_product
-from qutip import Qobj
 
 
-def x_gate():
-    mat = np.array([[0, 1],
-                    [1, 0]])
-    return Qobj(mat, dims=[[2], [2]])
-
-
-def y_gate():
-    mat = np.array([[0, -1.j],
-                    [1.j, 0]])
-    return Qobj(mat, dims=[[2], [2]])
-
-
-def z_gate():
-    mat = np.array([[1, 0],
-                    [0, -1]])
-    return Qobj(mat, dims=[[2], [2]])
-
-
-def s_gate():
-    mat = np.array([[1.,   0],
-                    [0., 1.j]])
-    return Qobj(mat, dims=[[2], [2]])
-
+H = np.array([[1, 1],
+              [1, -1]]) * (1 / sqrt(2))
+X = np.array([[0, 1],
+              [1, 0]])
+Y = np.array([[0, -1.j],
+              [1.j, 0]])
+Z = np.array([[1, 0],
+              [0, -1]])
+S = np.array([[1., 0],
+              [0., 1.j]])
+T = np.array([[1., 0],
+              [0., e ** (1.j * (pi / 4))]])
+CX = np.array([[1, 0, 0, 0],
+               [0, 1, 0, 0],
+               [0, 0, 0, 1],
+               [0, 0, 1, 0]])
+CCX = np.identity(8)[[0, 1, 2, 3, 4, 5, 7, 6]]
+
+# matrices of the supported gates; the first index of a gate is its most significant qubit
+GATES = {'h': H, 'x': X, 'y': Y, 'z': Z, 's': S, 't': T, 'cx': CX, 'ccx': CCX}
+
+
+def apply_gate(tensor: "np.ndarray", name: str, indices: List[int]) -> "np.ndarray":
+    """Function to left-multiply a gate onto a reshaped operator.
+
+    The operator of `n` qubits is stored as a tensor with one axis of size 2 per qubit (qubit 0 first), followed by any other axes.
+    The gate is contracted with the axes of its qubits only, so its matrix is never expanded to the full register.
+    A swap is a transpose of the two axes.
+
+    Args:
+        tensor (np.ndarray): operator (or state) tensor.
+        name (str): name of gate (key of `GATES` or 'swap').
+        indices (List[int]): qubits the gate acts on.
+
+    Returns:
+        np.ndarray: tensor after applying the gate.
+    """
 
-def t_gate():
-    mat = np.array([[1.,   0],
-                    [0., e ** (1.j * (pi / 4))]])
-    return Qobj(mat, dims=[[2], [2]])
+    if name == 'swap':
+        return tensor.swapaxes(*indices)
+    if name not in GATES:
+        raise NotImplementedError
+    k = len(indices)
+    gate = GATES[name].reshape((2,) * 2 * k)
+    tensor = np.tensordot(gate, tensor, axes=(list(range(k, 2 * k)), indices))
+    return np.moveaxis(tensor, list(range(k)), indices)
 
 
 def validator(func):
@@ -87,35 +103,10 @@ class Circuit():
                 self._cache = np.identity(2 ** self.size)
                 return self._cache
 
-            qc = QubitCircuit(self.size)
-            qc.user_gates = {"X": x_gate,
-                             "Y": y_gate,
-                             "Z": z_gate,
-                             "S": s_gate,
-                             "T": t_gate}
-            for gate in self.gates:
-                name, indices = gate
-                if name == 'h':
-                    qc.add_gate('SNOT', indices[0])
-                elif name == 'x':
-                    qc.add_gate('X', indices[0])
-                elif name == 'y':
-                    qc.add_gate('Y', indices[0])
-                elif name == 'z':
-                    qc.add_gate('Z', indices[0])
-                elif name == 'cx':
-                    qc.add_gate('CNOT', controls=indices[0], targets=indices[1])
-                elif name == 'ccx':
-                    qc.add_gate('TOFFOLI', controls=indices[:2], targets=indices[2])
-                elif name == 'swap':
-                    qc.add_gate('SWAP', indices)
-                elif name == 't':
-                    qc.add_gate('T', indices[0])
-                elif name == 's':
-                    qc.add_gate('S', indices[0])
-                else:
-                    raise NotImplementedError
-            self._cache = gate_sequence_product(qc.propagators()).full()
+            unitary = np.identity(2 ** self.size, dtype=complex).reshape((2,) * self.size + (2 ** self.size,))
+            for name, indices in self.gates:
+                unitary = apply_gate(unitary, name, indices)
+            self._cache = unitary.reshape(2 ** self.size, 2 ** self.size)
             return self._cache
         return self._cache
 
@@ -11,8 +11,6 @@ from typing import Any, List, TYPE_CHECKING, Dict
 #from numpy import random
 from random import random
 
-from scipy import stats
-
 if TYPE_CHECKING:
     from ..entanglement_management.entanglement_protocol import EntanglementProtocol
     from ..kernel.timeline import Timeline
@@ -92,6 +90,8 @@ class MemoryArray(Entity):
     def update_memory_params(self, arg_name: str, value: Any) -> None:
         for memory in self.memories:
             memory.__setattr__(arg_name, value)
+            if arg_name == "coherence_time":
+                self.timeline.observables.update_memory(memory)
 
     def set_node(self, node: "QuantumRouter") -> None:
         self.owner = node
@@ -346,6 +346,9 @@ class MemoryWithRandomCoherenceTime(Memory):
                                       self.coherence_time > 0.0 )
         
     def coherence_time_distribution(self) -> None:
+        # scipy is only needed (and imported) for memories with random coherence times
+        from scipy import stats
+
         return stats.truncnorm.rvs(
             -0.95 * self.coherence_time / self.coherence_time_stdev,
             19.0 * self.coherence_time / self.coherence_time_stdev,
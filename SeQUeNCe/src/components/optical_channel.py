@@ -6,7 +6,7 @@ OpticalChannels must be attached to nodes on both ends.
 """
 
 import heapq as hq
-from typing import TYPE_CHECKING
+from typing import List, TYPE_CHECKING
 
 #from numpy import random
 from random import random
@@ -79,6 +79,7 @@ class QuantumChannel(OpticalChannel):
         loss (float): loss rate for transmitted photons (determined by attenuation).
         delay (int): delay (in ps) of photon transmission (determined by light speed, distance).
         frequency (float): maximum frequency of qubit transmission (in Hz).
+        send_bins (List[int]): heap of reserved transmission time bins (bins before the current time are pruned).
     """
 
     def __init__(self, name: str, timeline: "Timeline", attenuation: float, distance: int, polarization_fidelity=1, light_speed=2e-4, frequency=8e7):
@@ -99,6 +100,7 @@ class QuantumChannel(OpticalChannel):
         self.loss = 1
         self.frequency = frequency  # maximum frequency for sending qubits (measured in Hz)
         self.send_bins = []
+        self._next_bins = {}  # reserved time bin -> a later bin to try next (all bins in between are reserved)
 
     def init(self) -> None:
         """Implementation of Entity interface (see base class)."""
@@ -127,10 +129,10 @@ class QuantumChannel(OpticalChannel):
 
         # remove lowest time bin
         if len(self.send_bins) > 0:
-            time = -1
-            while time < self.timeline.now():
-                time_bin = hq.heappop(self.send_bins)
-                time = int(time_bin * (1e12 / self.frequency))
+            self._prune_bins()
+            time_bin = hq.heappop(self.send_bins)
+            del self._next_bins[time_bin]
+            time = int(time_bin * (1e12 / self.frequency))
             assert time == self.timeline.now(), "qc {} transmit method called at invalid time".format(self.name)
 
         # check if photon kept
@@ -163,6 +165,25 @@ class QuantumChannel(OpticalChannel):
             int: simulation time for next available transmission window.
         """
 
+        self._prune_bins()
+        return self._reserve_bin(min_time)
+
+    def schedule_transmits(self, min_times: List[int]) -> List[int]:
+        """Method to schedule several photon transmissions at once.
+
+        Equivalent to calling `schedule_transmit` for each minimum time in order.
+
+        Args:
+            min_times (List[int]): minimum simulation time for each transmission.
+
+        Returns:
+            List[int]: simulation time for each transmission.
+        """
+
+        self._prune_bins()
+        return [self._reserve_bin(min_time) for min_time in min_times]
+
+    def _reserve_bin(self, min_time: int) -> int:
         min_time = max(min_time, self.timeline.now())
         time_bin = min_time * (self.frequency / 1e12)
         if time_bin - int(time_bin) > 0.00001:
@@ -170,15 +191,28 @@ class QuantumChannel(OpticalChannel):
         else:
             time_bin = int(time_bin)
 
-        # find earliest available time bin
-        while time_bin in self.send_bins:
-            time_bin += 1
+        # find earliest available time bin, skipping runs of reserved bins
+        next_bins = self._next_bins
+        skipped = []
+        while time_bin in next_bins:
+            skipped.append(time_bin)
+            time_bin = next_bins[time_bin]
+        for reserved in skipped:
+            next_bins[reserved] = time_bin
+        next_bins[time_bin] = time_bin + 1
         hq.heappush(self.send_bins, time_bin)
 
         # calculate time
         time = int(time_bin * (1e12 / self.frequency))
         return time
 
+    def _prune_bins(self) -> None:
+        # drop reserved bins before the current time (transmitted, or never used)
+        now = self.timeline.now()
+        period = 1e12 / self.frequency
+        while self.send_bins and int(self.send_bins[0] * period) < now:
+            del self._next_bins[hq.heappop(self.send_bins)]
+
 
 class ClassicalChannel(OpticalChannel):
     """Optical channel for transmission of classical messages.
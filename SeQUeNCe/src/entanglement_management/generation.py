@@ -6,11 +6,14 @@ Entanglement generation is asymmetric:
 
 * EntanglementGenerationA should be used on the QuantumRouter (with one node set as the primary) and should be started via the "start" method
 * EntanglementGeneraitonB should be used on the BSMNode and does not need to be started
+
+If `Timeline.abstract_generation` is set, the primary samples each attempt instead of simulating it (abstract link):
+no messages, photons or BSM results are exchanged, and each side only schedules the end of the attempt.
 """
 
 from enum import Enum, auto
-from math import sqrt
-from typing import List, TYPE_CHECKING, Dict, Any
+from math import log1p, sqrt
+from typing import List, TYPE_CHECKING, Dict, Any, Tuple
 
 if TYPE_CHECKING:
     from ..components.memory import Memory
@@ -20,8 +23,9 @@ from .entanglement_protocol import EntanglementProtocol
 from ..message import Message
 from ..kernel.event import Event
 from ..kernel.process import Process
+from ..components.bsm import BSM, _set_memory_with_fidelity
 from ..components.circuit import Circuit
-from ..utils import log
+from ..utils import log, trace
 
 import random
 random.seed(0)
@@ -168,7 +172,8 @@ class EntanglementGenerationA(EntanglementProtocol):
 
         self.execution_count += 1
         log.logger.info(self.own.name + " protocol start with partner {}".format(self.other))
-        print(self.own.name + " generation protocol start with partner {}".format(self.other))
+        if trace.enabled:
+            trace.trace(self.own.name + " generation protocol start with partner {}".format(self.other))
         # print(f'Start Time of Entanglement Generation: {self.own.timeline.now()}')
         """if self.own.name == 'c' and self.other == 'd' and self.own.timeline.swap_success_count[0][2] == 0: #and self.own.timeline.swap_success_count[2][0] == 0):
             print('c-d generation can only begin once a-c swap is over')
@@ -182,7 +187,7 @@ class EntanglementGenerationA(EntanglementProtocol):
 
         # #To only count the generations that take place before E2E swap has been performed
         # if self.own.timeline.swap_exec_count[0][2] == 0:
-        self.own.timeline.gen_exec_count[ord(self.own.name)-ord('a')][ord(self.other)-ord('a')] += 1
+        self.own.timeline.observables.count_attempt(self.own.name, self.other)
         
         # if self.own.timeline.gen_exec_count[ord(self.own.name)-ord('a')][ord(self.other)-ord('a')] > self.own.timeline.gen_threshold:
         #     # print('-----------------------\nGen Threshold reached, so exiting\n-----------------------')
@@ -194,6 +199,10 @@ class EntanglementGenerationA(EntanglementProtocol):
 
         # start negotiations
         if self.primary:
+            if self.own.timeline.abstract_generation:
+                self._sample_attempt()
+                return
+
             # send NEGOTIATE message
             self.qc_delay = self.own.qchannels[self.middle].delay
             frequency = self.memory.frequency
@@ -246,11 +255,15 @@ class EntanglementGenerationA(EntanglementProtocol):
             # successful entanglement            
             # state correction
             self.bsm_res[0], self.bsm_res[1]= 0, 1
-            if self.primary:
+            if self.own.timeline.abstract_generation:
+                # abstract links are prepared in the corrected state when sampled
+                pass
+            elif self.primary:
                 self.own.timeline.quantum_manager.run_circuit(EntanglementGenerationA._flip_circuit, [self._qstate_key])
             elif self.bsm_res[0] != self.bsm_res[1]:
                 self.own.timeline.quantum_manager.run_circuit(EntanglementGenerationA._z_circuit, [self._qstate_key])
-            print(f'Successful entanglement self.bsm_res[0]: {self.bsm_res[0]}   and   self.bsm_res[1]:  {self.bsm_res[1]}   and   self._qstate_key: {self._qstate_key}')
+            if trace.enabled:
+                trace.trace(f'Successful entanglement self.bsm_res[0]: {self.bsm_res[0]}   and   self.bsm_res[1]:  {self.bsm_res[1]}   and   self._qstate_key: {self._qstate_key}')
             # print("In random number comparision: " + self.own.name + " successful entanglement of memory with the node: ",self.other)
             # print(f"Random generated:    {self.random}")
             self._entanglement_succeed()
@@ -258,13 +271,156 @@ class EntanglementGenerationA(EntanglementProtocol):
         else:
             # entanglement failed
             #print('Entanglement Generation failed by random number comparison')
-            print("In random number comparision: " + self.own.name + " failed entanglement of memory with the node: ",self.other)
+            if trace.enabled:
+                trace.trace("In random number comparision: " + self.own.name + " failed entanglement of memory with the node: ",self.other)
             # print(f"Random generated:    {self.random}")
             self.bsm_res[0], self.bsm_res[1]= -1, -1
             self._entanglement_fail()
         
 
 
+    def _sample_attempt(self) -> None:
+        """Method to sample an attempt of the abstract link (on the primary).
+
+        The emission times are those the other node would negotiate when the NEGOTIATE message arrives.
+        As with the single-atom BSM, two photons in one round reaching different detectors fail the attempt when the result arrives.
+        Otherwise, the attempt ends as in `end`, with the random number drawn here.
+        If `Timeline.skip_generation_retries` is set, the failed attempts before the next success are sampled at once (see `_skip_retries`).
+
+        Side Effects:
+            Will reserve the quantum channels and schedule the end of the attempt on both nodes.
+            May set the entangled state of both memories.
+        """
+
+        other = self.other_protocol
+        self.qc_delay = self.own.qchannels[self.middle].delay
+        other.qc_delay = other.own.qchannels[other.middle].delay
+        period = int(1e12 / min(self.memory.frequency, other.memory.frequency))
+
+        # both photons survive and reach different detectors
+        detectors = self.own.qchannels[self.middle].receiver.bsm.detectors
+        survival = [protocol.memory.efficiency * (1 - protocol.own.qchannels[protocol.middle].loss) for protocol in (self, other)]
+        double_click = survival[0] * survival[1] * detectors[0].efficiency * detectors[1].efficiency / 8
+
+        start = self.own.timeline.now()
+        if self.own.timeline.skip_generation_retries:
+            start, draw = self._skip_retries(period, double_click)
+        else:
+            draw = random.random()
+
+        other_emit_times = other.own.schedule_qubits(other.middle, self._emit_times(start, period))
+        emit_times = [emit_time + other.qc_delay - self.qc_delay for emit_time in other_emit_times]
+        self.own.schedule_qubits(self.middle, emit_times)
+        for protocol, times in ((self, emit_times), (other, other_emit_times)):
+            protocol.expected_times = [emit_time + other.qc_delay for emit_time in other_emit_times]
+            protocol._emit_abstract(times)
+
+        if draw >= 2 * double_click:
+            self.random = other.random = (draw - 2 * double_click) / (1 - 2 * double_click)
+            if self.random < self.own.timeline.gen_success_probability:
+                _set_memory_with_fidelity([self.memory, other.memory], BSM._phi_plus)
+        for protocol in (self, other):
+            protocol._schedule(*protocol._attempt_end(protocol.expected_times, draw, double_click))
+
+    def _skip_retries(self, period: int, double_click: float) -> Tuple[int, float]:
+        """Method to sample the failed attempts before the next success of the abstract link (on the primary).
+
+        The number of failures is geometric.
+        Both nodes fail an attempt at its end, and the next attempt starts once the resource managers pair the new protocols:
+        the node that sent the request of this attempt sends it again, and the other one starts when the request arrives.
+        Failures are not sampled if attempts cannot succeed or a memory could expire during an attempt, and attempts that would start after the
+        reservation (or the simulation) ends are never started.
+        The skipped attempts are still counted in `Timeline.gen_exec_count` when they would start.
+
+        Args:
+            period (int): time (in ps) between the two emissions of an attempt.
+            double_click (float): probability of a double click in a given round of an attempt.
+
+        Returns:
+            Tuple[int, float]: start time of the attempt to simulate, and its random number (as drawn in `_sample_attempt`).
+        """
+
+        other = self.other_protocol
+        timeline = self.own.timeline
+        now = timeline.now()
+        success = (1 - 2 * double_click) * timeline.gen_success_probability
+        if success <= 0:
+            return now, random.random()
+        for protocol in (self, other):
+            lifetime = protocol.memory.coherence_time * 1e12
+            if 0 < lifetime <= period + protocol.qc_delay + protocol.own.cchannels[protocol.middle].delay + 10:
+                return now, random.random()
+
+        failures = int(log1p(-random.random()) / log1p(-success)) if success < 1 else 0
+        limit = timeline.stop_time
+        if self.rule is not None:
+            limit = min(limit, self.rule.get_reservation().end_time)
+        # the other protocol started before this one if it answered the request, otherwise it starts when the response arrives
+        to_other, to_self = int(self.own.cchannels[self.other].delay), int(other.own.cchannels[self.own.name].delay)
+        if other.execution_count:
+            requester, pairing, other_offset = self, to_other + to_self, other.start_time - now
+        else:
+            requester, pairing, other_offset = other, to_self, to_other
+
+        start, starts = now, []
+        while len(starts) < failures:
+            # random number of a failure (outside of the success interval)
+            draw = random.random() * (1 - success)
+            if draw >= 2 * double_click:
+                draw += success
+            expected_times = [emit_time + other.qc_delay for emit_time in self._emit_times(start, period)]
+            next_start = requester._attempt_end(expected_times, draw, double_click)[0] + pairing
+            if next_start >= limit:
+                break
+            # the failed attempt's emissions
+            for protocol in (self, other):
+                if protocol.memory.frequency > 0:
+                    protocol.memory.next_excite_time = expected_times[1] - protocol.qc_delay + 1e12 / protocol.memory.frequency
+            start = next_start
+            starts.append(start)
+        else:
+            draw = 2 * double_click + success * random.random()
+
+        if starts:
+            self._schedule(starts[0], "_count_retry", [starts, 0])
+            other._schedule(starts[0] + other_offset, "_count_retry", [[time + other_offset for time in starts], 0])
+        return start, draw
+
+    def _emit_times(self, start: int, period: int) -> List[int]:
+        # emission times of the other node for an attempt started at `start`, as negotiated in `received_message`
+        other = self.other_protocol
+        arrival = start + int(self.own.cchannels[self.other].delay)
+        min_time = max(arrival, other.memory.next_excite_time) + max(self.qc_delay, other.qc_delay) - other.qc_delay \
+            + int(other.own.cchannels[self.own.name].delay)
+        return [min_time, min_time + period]
+
+    def _attempt_end(self, expected_times: List[int], draw: float, double_click: float) -> Tuple[int, str]:
+        # end of an abstract attempt on this node: first double click, otherwise `end`
+        if draw < 2 * double_click:
+            return expected_times[int(draw >= double_click)] + self.own.cchannels[self.middle].delay, "_entanglement_fail"
+        return expected_times[1] + self.own.cchannels[self.middle].delay + 10, "end"
+
+    def _count_retry(self, starts: List[int], index: int) -> None:
+        """Method to count a generation attempt skipped by `_skip_retries` when it would start."""
+
+        self.own.timeline.observables.count_attempt(self.own.name, self.other)
+        if index + 1 < len(starts):
+            self._schedule(starts[index + 1], "_count_retry", [starts, index + 1])
+
+    def _emit_abstract(self, emit_times: List[int]) -> None:
+        # memory bookkeeping of the two emissions: expiration from the first one, excitation period from the second one
+        self.memory.update_state(EntanglementGenerationA._plus_state)
+        if self.memory.coherence_time > 0:
+            self.memory.update_expire_time(emit_times[0] + int(self.memory.coherence_time * 1e12))
+        if self.memory.frequency > 0:
+            self.memory.next_excite_time = emit_times[1] + 1e12 / self.memory.frequency
+
+    def _schedule(self, time: int, activation: str, args: List[Any] = None) -> None:
+        process = Process(self, activation, args or [])
+        event = Event(time, process)
+        self.own.timeline.schedule(event)
+        self.scheduled_events.append(event)
+
     def next_round(self) -> None:
         """Sets entanglement generation to next round."""
         self.ent_round += 1
@@ -318,15 +474,15 @@ class EntanglementGenerationA(EntanglementProtocol):
             # get time for first excite event
             memory_excite_time = self.memory.next_excite_time
             min_time = max(self.own.timeline.now(), memory_excite_time) + total_quantum_delay - self.qc_delay + cc_delay
-            emit_time_0 = self.own.schedule_qubit(self.middle, min_time)
-            self.expected_times[0] = emit_time_0 + self.qc_delay
 
             # get time for second excite event
             local_frequency = self.memory.frequency
             other_frequency = msg.frequency
             total = min(local_frequency, other_frequency)
-            min_time = min_time + int(1e12 / total)
-            emit_time_1 = self.own.schedule_qubit(self.middle, min_time)
+
+            # reserve both emissions
+            emit_time_0, emit_time_1 = self.own.schedule_qubits(self.middle, [min_time, min_time + int(1e12 / total)])
+            self.expected_times[0] = emit_time_0 + self.qc_delay
             self.expected_times[1] = emit_time_1 + self.qc_delay
 
             # schedule emit
@@ -368,9 +524,8 @@ class EntanglementGenerationA(EntanglementProtocol):
                 msg.emit_time_0 = self.own.timeline.now()
 
             # schedule emit
-            emit_time_0 = self.own.schedule_qubit(self.middle, msg.emit_time_0)
+            emit_time_0, emit_time_1 = self.own.schedule_qubits(self.middle, [msg.emit_time_0, msg.emit_time_1])
             assert emit_time_0 == msg.emit_time_0, "%d %d %d" % (emit_time_0, msg.emit_time_0, self.own.timeline.now())
-            emit_time_1 = self.own.schedule_qubit(self.middle, msg.emit_time_1)
 
             process = Process(self, "emit_event", [])
             event = Event(msg.emit_time_0, process)
@@ -462,8 +617,9 @@ class EntanglementGenerationA(EntanglementProtocol):
         self.memory.fidelity = self.memory.raw_fidelity
         self.update_resource_manager(self.memory, 'ENTANGLED')
         # self.own.timeline.ent_success_count[ord(self.own.name)-ord('a')][ord(self.other)-ord('a')] += 1
-        self.own.timeline.entanglement_time[self.own.name+'-'+self.other] = self.own.timeline.now()
-        print(f'entanglement_time dictionary: {self.own.timeline.entanglement_time}')
+        self.own.timeline.observables.record_entanglement(self.own.name, self.other, self.memory.fidelity)
+        if trace.enabled:
+            trace.trace(f'entanglement_time dictionary: {self.own.timeline.entanglement_time}')
 
     def _entanglement_fail(self):
         for event in self.scheduled_events:
@@ -161,6 +161,8 @@ class BBPSSW(EntanglementProtocol):
         self.update_resource_manager(self.meas_memo, "RAW")
         if self.meas_res == msg.meas_res:
             self.kept_memo.fidelity = self.improved_fidelity(self.kept_memo.fidelity)
+            self.own.timeline.observables.record_fidelity(self.own.name, self.kept_memo.entangled_memory["node_id"],
+                                                          self.kept_memo.fidelity)
             self.update_resource_manager(self.kept_memo, state="ENTANGLED")
         else:
             self.update_resource_manager(self.kept_memo, state="RAW")
@@ -26,7 +26,7 @@ if TYPE_CHECKING:
 
 from ..message import Message
 from .entanglement_protocol import EntanglementProtocol
-from ..utils import log
+from ..utils import log, trace
 from ..components.circuit import Circuit
 import sys
 
@@ -210,8 +210,9 @@ class EntanglementSwappingA(EntanglementProtocol):
             # print(f'Entanglement swap successful between {self.left_protocol.own.name, self.right_protocol.own.name}')
             # self.own.timeline.swap_success_count[ord(self.left_protocol.own.name)-ord('a')][ord(self.right_protocol.own.name)-ord('a')] += 1
             # print('swap_success_count: ', self.own.timeline.swap_success_count)
-            self.own.timeline.entanglement_time[self.left_protocol.own.name+'-'+self.right_protocol.own.name] = self.own.timeline.now()
-            print(f'entanglement_time dictionary: {self.own.timeline.entanglement_time}')
+            self.own.timeline.observables.record_entanglement(self.left_protocol.own.name, self.right_protocol.own.name, fidelity)
+            if trace.enabled:
+                trace.trace(f'entanglement_time dictionary: {self.own.timeline.entanglement_time}')
             # if self.left_protocol.own.name == self.own.timeline.src and self.right_protocol.own.name == self.own.timeline.dst or self.right_protocol.own.name == self.own.timeline.src and self.left_protocol.own.name == self.own.timeline.dst:
             #     self.own.timeline.stop_rules = True
 
@@ -222,7 +223,7 @@ class EntanglementSwappingA(EntanglementProtocol):
             # self.own.timeline.swap_failure_count[ord(self.left_protocol.own.name)-ord('a')][ord(self.right_protocol.own.name)-ord('a')] += 1
             # print('swap_failure_count: ', self.own.timeline.swap_failure_count)
             self.own.timeline.hasSwapFailed = True
-            print('-----------------------\nSwap failed so exiting\n-----------------------')
+            trace.trace('-----------------------\nSwap failed so exiting\n-----------------------')
             # sys.exit()
 
 
@@ -253,7 +254,7 @@ class EntanglementSwappingA(EntanglementProtocol):
 
     def received_message(self, src: str, msg: "Message") -> None:
         """Method to receive messages (should not be used on A protocol)."""
-        print('recieved message middle node')
+        trace.trace('recieved message middle node')
         raise Exception("EntanglementSwappingA protocol '{}' should not receive messages.".format(self.name))
 
     def memory_expire(self, memory: "Memory") -> None:
@@ -379,7 +380,8 @@ class EntanglementSwappingB(EntanglementProtocol):
             self.memory.update_expire_time(msg.expire_time)
             self.update_resource_manager(self.memory, "ENTANGLED")
             # print(f'Entanglement swap successful between {self.own.name, msg.remote_node}')
-            print(f'Time of Entanglement swap success: {self.own.timeline.now()}')
+            if trace.enabled:
+                trace.trace(f'Time of Entanglement swap success: {self.own.timeline.now()}')
             self.end_time = self.own.timeline.now()
             # print(f'Start Time: {self.start_time*1e-12} , End Time: {self.end_time*1e-12} , execution time: {(self.end_time - self.start_time)*1e-12}')
             #self.own.timeline.swap_success_count[ord(self.own.name)-ord('a')][ord(msg.remote_node)-ord('a')] += 1
@@ -390,7 +392,8 @@ class EntanglementSwappingB(EntanglementProtocol):
 
         else:
             # print(f'Entanglement swap failed between {self.own.name, self.another.own.name}')
-            print(f'Time of Entanglement swap failure: {self.own.timeline.now()}')
+            if trace.enabled:
+                trace.trace(f'Time of Entanglement swap failure: {self.own.timeline.now()}')
             self.update_resource_manager(self.memory, "RAW")
             self.end_time = self.own.timeline.now()
             # print(f'Start Time: {self.start_time*1e-12} , End Time: {self.end_time*1e-12} , execution time: {(self.end_time - self.start_time)*1e-12}')
@@ -22,6 +22,7 @@ class Event:
         process (Process): the process encapsulated in the event.
         priority (int): the priority of the event, lower value denotes a higher priority.
         _is_removed (bool): the flag to denotes if it's a valid event
+        _heap_index (int): position of the event in the event list heap (-1 if not pending)
     """
 
     def __init__(self, time: int, process: "Process", priority=inf):
@@ -37,6 +38,7 @@ class Event:
         self.priority = priority
         self.process = process
         self._is_removed = False
+        self._heap_index = -1
     
     def __str__(self) -> str:
         return str(self.process)+" "+str(self.time)
@@ -1,7 +1,7 @@
 """Definition of EventList class.
 
 This module defines the EventList class, used by the timeline to order and execute events.
-EventList is implemented as a min heap ordered by simulation time.
+EventList is implemented as an indexed min heap ordered by simulation time.
 """
 
 from typing import TYPE_CHECKING
@@ -9,13 +9,13 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from .event import Event
 
-from heapq import heappush, heappop
-
 
 class EventList:
     """Class of event list.
 
-    This class is implemented as a min-heap. The event with the lowest time and priority is placed at the top of heap.
+    This class is implemented as an indexed min-heap. The event with the lowest time and priority is placed at the top of heap.
+    Each event records its current position in the heap (`Event._heap_index`), so that rescheduling and removal take O(log n).
+    Push and pop follow the same sift procedure as `heapq`, so events are popped in the same order.
 
     Attributes:
         data (List[Event]): heap storing events.
@@ -31,11 +31,27 @@ class EventList:
         for data in self.data:
             yield data
 
+    def __contains__(self, event: "Event") -> bool:
+        index = event._heap_index
+        return 0 <= index < len(self.data) and self.data[index] is event
+
     def push(self, event: "Event") -> "None":
-        heappush(self.data, event)
+        event._heap_index = len(self.data)
+        self.data.append(event)
+        self._sift_up(0, len(self.data) - 1)
 
     def pop(self) -> "Event":
-        return heappop(self.data)
+        data = self.data
+        last = data.pop()
+        if data:
+            top = data[0]
+            data[0] = last
+            last._heap_index = 0
+            self._sift_down(0)
+        else:
+            top = last
+        top._heap_index = -1
+        return top
 
     def isempty(self) -> bool:
         return len(self.data) == 0
@@ -43,10 +59,13 @@ class EventList:
     def remove(self, event: "Event") -> None:
         """Method to remove events from heap.
 
-        The event is set as the invalid state to save the time of removing event from heap.
+        The event is set as the invalid state and, if it is still pending, taken out of the heap.
+        The heap therefore only holds live events.
         """
 
         event.set_invalid()
+        if event in self:
+            self._delete(event._heap_index)
 
     def update_event_time(self, event: "Event", time: int):
         """Method to update the timestamp of event and maintain the min-heap structure.
@@ -54,24 +73,71 @@ class EventList:
         if time == event.time:
             return
 
-        def _pop_updated_event(heap: "List", index: int):
-            parent_i = (index - 1) // 2
-            while index > 0 and event < self.data[parent_i]:
-                heap[index], heap[parent_i] = heap[parent_i], heap[index]
-                index = parent_i
-                parent_i = (parent_i - 1) // 2
-
-        for i, e in enumerate(self.data):
-            if id(e) == id(event):
-                if event.time > time:
-                    event.time = time
-                    _pop_updated_event(self.data, i)
-
-                elif event.time < time:
-                    event.time = -1
-                    _pop_updated_event(self.data, i)
-                    self.pop()
-                    event.time = time
-                    self.push(event)
-
-                break
+        if event not in self:
+            # removed events keep tracking their (cancelled) time; executed events are left untouched
+            if event.is_invalid():
+                event.time = time
+            return
+
+        index = event._heap_index
+        if event.time > time:
+            event.time = time
+            self._sift_up(0, index)
+        else:
+            event.time = time
+            self._sift_down(index)
+
+    def _delete(self, index: int) -> None:
+        data = self.data
+        event = data[index]
+        last = data.pop()
+        if index < len(data):
+            data[index] = last
+            last._heap_index = index
+            if last < event:
+                self._sift_up(0, index)
+            else:
+                self._sift_down(index)
+        event._heap_index = -1
+
+    def _sift_up(self, start: int, index: int) -> None:
+        # same procedure as heapq._siftdown: move the event at `index` toward the root
+        # (`Event.__lt__` is inlined on the (time, priority) pair to avoid a method call per comparison)
+        data = self.data
+        event = data[index]
+        time = event.time
+        priority = event.priority
+        while index > start:
+            parent_index = (index - 1) >> 1
+            parent = data[parent_index]
+            if time < parent.time or (time == parent.time and priority < parent.priority):
+                data[index] = parent
+                parent._heap_index = index
+                index = parent_index
+                continue
+            break
+        data[index] = event
+        event._heap_index = index
+
+    def _sift_down(self, index: int) -> None:
+        # same procedure as heapq._siftup: bubble the smaller child up to a leaf, then sift the event up
+        data = self.data
+        end = len(data)
+        start = index
+        event = data[index]
+        child_index = 2 * index + 1
+        while child_index < end:
+            right_index = child_index + 1
+            child = data[child_index]
+            if right_index < end:
+                right = data[right_index]
+                if not (child.time < right.time or (child.time == right.time and child.priority < right.priority)):
+                    child_index = right_index
+                    child = right
+            data[index] = child
+            child._heap_index = index
+            index = child_index
+            child_index = 2 * index + 1
+        data[index] = event
+        event._heap_index = index
+        self._sift_up(start, index)
@@ -0,0 +1,140 @@
+"""Definition of the Observables class.
+
+This module defines the Observables class, used by the timeline to keep the quantities queried during a simulation.
+Protocols report generation attempts, new entangled pairs and fidelity changes as they happen,
+so that queries on node pairs and memories read a stored value instead of scanning the network.
+"""
+
+from math import inf
+from typing import TYPE_CHECKING, Dict, Set, Tuple
+
+if TYPE_CHECKING:
+    from .timeline import Timeline
+    from ..components.memory import Memory
+    from ..topology.topology import Topology
+
+
+class Observables:
+    """Class of observables of a simulation.
+
+    Nodes are indexed by name in order of registration (routers of the topology first, then as they are reported),
+    so node names are arbitrary.
+    Generation attempts are counted in `Timeline.gen_exec_count`, indexed by these indices,
+    and entanglement times are also kept in `Timeline.entanglement_time` (in format {"node1-node2": time}).
+
+    Attributes:
+        timeline (Timeline): timeline holding the observables.
+        ids (Dict[str, int]): index of each node in `Timeline.gen_exec_count`.
+        entangled_pairs (Set[Tuple[str, str]]): pairs of nodes entangled at least once, in both orders.
+        entanglement_times (Dict[Tuple[str, str], int]): time (in ps) of the last entanglement of each pair, in the order reported.
+        fidelities (Dict[Tuple[str, str], float]): fidelity of the last entanglement of each pair, in both orders.
+        coherence_times (Dict[str, float]): coherence time (in s) of each tracked memory.
+        min_coherence_time (float): shortest coherence time of tracked memories, ignoring memories that do not expire (-1).
+    """
+
+    def __init__(self, timeline: "Timeline"):
+        self.timeline = timeline
+        self.ids = {}
+        self.entangled_pairs = set()
+        self.entanglement_times = {}
+        self.fidelities = {}
+        self.coherence_times = {}
+        self.min_coherence_time = inf
+
+    def add_topology(self, topology: "Topology") -> None:
+        """Method to register the quantum routers of a topology and track their memories."""
+
+        for node in topology.get_nodes_by_type("QuantumRouter"):
+            self._index(node.name)
+            for memory in node.memory_array:
+                self.coherence_times[memory.name] = memory.coherence_time
+        self._update_min_coherence_time()
+
+    def _index(self, node: str) -> int:
+        index = self.ids.get(node)
+        if index is None:
+            index = self.ids[node] = len(self.ids)
+        counts = self.timeline.gen_exec_count
+        if counts is None:
+            counts = self.timeline.gen_exec_count = []
+        while len(counts) <= index:
+            for row in counts:
+                row.append(0)
+            counts.append([0] * (len(counts) + 1))
+        return index
+
+    def count_attempt(self, node: str, other: str) -> None:
+        """Method to count an entanglement generation attempt of `node` with `other`."""
+
+        ids = self.ids
+        if node in ids and other in ids:
+            self.timeline.gen_exec_count[ids[node]][ids[other]] += 1
+        else:
+            # indexing may create or grow the matrix, so it is looked up afterwards
+            i, j = self._index(node), self._index(other)
+            self.timeline.gen_exec_count[i][j] += 1
+
+    def retries(self, node: str, other: str) -> int:
+        """Method to get the number of entanglement generation attempts of `node` with `other`."""
+
+        ids = self.ids
+        if node in ids and other in ids:
+            return self.timeline.gen_exec_count[ids[node]][ids[other]]
+        return 0
+
+    def record_entanglement(self, node1: str, node2: str, fidelity: float) -> None:
+        """Method to record that two nodes are entangled at the current time.
+
+        Args:
+            node1 (str): name of first node (the order is kept for `entanglement_time`).
+            node2 (str): name of second node.
+            fidelity (float): fidelity of the entangled pair.
+        """
+
+        now = self.timeline.now()
+        self.entangled_pairs.add((node1, node2))
+        self.entangled_pairs.add((node2, node1))
+        self.entanglement_times[(node1, node2)] = now
+        self.timeline.entanglement_time[node1 + '-' + node2] = now
+        self.record_fidelity(node1, node2, fidelity)
+
+    def record_fidelity(self, node1: str, node2: str, fidelity: float) -> None:
+        """Method to record a new fidelity for the entangled pair of two nodes (e.g. after purification)."""
+
+        self.fidelities[(node1, node2)] = fidelity
+        self.fidelities[(node2, node1)] = fidelity
+
+    def entangled(self, node1: str, node2: str) -> bool:
+        """Method to check if two nodes have been entangled (in any order)."""
+
+        return (node1, node2) in self.entangled_pairs
+
+    def entanglement_time(self, node1: str, node2: str) -> int:
+        """Method to get the time (in ps) of the last entanglement reported as `node1`-`node2` (-1 if none)."""
+
+        return self.entanglement_times.get((node1, node2), -1)
+
+    def fidelity(self, node1: str, node2: str) -> float:
+        """Method to get the fidelity of the last entanglement of two nodes (0 if none)."""
+
+        return self.fidelities.get((node1, node2), 0)
+
+    def update_memory(self, memory: "Memory") -> None:
+        """Method to report a change of coherence time of a memory (ignored if the memory is not tracked)."""
+
+        if memory.name not in self.coherence_times:
+            return
+        old = self.coherence_times[memory.name]
+        self.coherence_times[memory.name] = memory.coherence_time
+        if memory.coherence_time != -1 and memory.coherence_time < self.min_coherence_time:
+            self.min_coherence_time = memory.coherence_time
+        elif old == self.min_coherence_time:
+            self._update_min_coherence_time()
+
+    def _update_min_coherence_time(self) -> None:
+        self.min_coherence_time = min((c for c in self.coherence_times.values() if c != -1), default=inf)
+
+    def all_memories_live(self, lifetime: float) -> bool:
+        """Method to check if all tracked memories have a coherence time of at least `lifetime` (in s) or do not expire."""
+
+        return self.min_coherence_time >= lifetime
@@ -0,0 +1,151 @@
+"""Definition of the Profiler class.
+
+This module defines the Profiler class, which records the events handled by a timeline.
+Profiling is disabled by default; it is enabled by setting `Timeline.profiler` (see `Timeline.enable_profiling`).
+The timeline only checks whether a profiler is set, so disabled profiling does not time or count anything.
+"""
+
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    from .event import Event
+
+# histogram buckets: 4 per power of two of the wall time (in ns), i.e. within 25% of the recorded times
+SUB_BUCKETS = 4
+COLUMNS = ("owner", "activation", "scheduled", "executed", "invalidated", "total_ms", "mean_us", "p50_us", "p90_us",
+           "p99_us")
+
+
+def _bucket(nanoseconds: int) -> int:
+    if nanoseconds < SUB_BUCKETS:
+        return nanoseconds
+    shift = nanoseconds.bit_length() - 3
+    return SUB_BUCKETS * shift + (nanoseconds >> shift)
+
+
+def _bucket_bounds(bucket: int) -> Tuple[int, int]:
+    if bucket < SUB_BUCKETS:
+        return bucket, bucket + 1
+    shift, mantissa = divmod(bucket - SUB_BUCKETS, SUB_BUCKETS)
+    mantissa += SUB_BUCKETS
+    return mantissa << shift, (mantissa + 1) << shift
+
+
+class ActivationStats:
+    """Class of statistics of the events of one activation method on one owner type.
+
+    Attributes:
+        scheduled (int): number of events scheduled.
+        executed (int): number of events executed.
+        invalidated (int): number of events removed before execution, popped invalid, or dropped by `Timeline.run_step` at the stop time.
+        total_time (int): wall time (in ns) spent executing the events.
+        histogram (Dict[int, int]): number of executions in each wall time bucket.
+    """
+
+    __slots__ = ("scheduled", "executed", "invalidated", "total_time", "histogram")
+
+    def __init__(self):
+        self.scheduled = 0
+        self.executed = 0
+        self.invalidated = 0
+        self.total_time = 0
+        self.histogram = {}
+
+    def add(self, other: "ActivationStats") -> None:
+        self.scheduled += other.scheduled
+        self.executed += other.executed
+        self.invalidated += other.invalidated
+        self.total_time += other.total_time
+        for bucket, count in other.histogram.items():
+            self.histogram[bucket] = self.histogram.get(bucket, 0) + count
+
+    def percentile(self, fraction: float) -> float:
+        """Method to estimate a percentile (in ns) of the execution wall time, as the middle of its histogram bucket."""
+
+        if self.executed == 0:
+            return 0
+        rank = fraction * self.executed
+        count = 0
+        for bucket in sorted(self.histogram):
+            count += self.histogram[bucket]
+            if count >= rank:
+                lower, upper = _bucket_bounds(bucket)
+                return (lower + upper) / 2
+        return 0
+
+
+class Profiler:
+    """Class to profile the events of a timeline.
+
+    Events are grouped by the type of the owner of their process and by the process activation method.
+    The timeline reports each event scheduled, executed (with its wall time) and invalidated.
+
+    Attributes:
+        stats (Dict[Tuple[str, str], ActivationStats]): statistics by (owner type, activation method).
+    """
+
+    def __init__(self):
+        self.stats = {}
+
+    def _stats(self, event: "Event") -> ActivationStats:
+        process = event.process
+        key = (type(process.owner).__name__, process.activation)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = ActivationStats()
+        return stats
+
+    def scheduled(self, event: "Event") -> None:
+        self._stats(event).scheduled += 1
+
+    def executed(self, event: "Event", nanoseconds: int) -> None:
+        stats = self._stats(event)
+        stats.executed += 1
+        stats.total_time += nanoseconds
+        bucket = _bucket(nanoseconds)
+        stats.histogram[bucket] = stats.histogram.get(bucket, 0) + 1
+
+    def invalidated(self, event: "Event") -> None:
+        self._stats(event).invalidated += 1
+
+    def reset(self) -> None:
+        """Method to clear recorded statistics."""
+
+        self.stats = {}
+
+    def rows(self, by: str = "activation") -> List[Dict]:
+        """Method to export the statistics as table rows, slowest (by total wall time) first.
+
+        Args:
+            by (str): grouping of rows: "activation" (owner type and activation), "owner" (owner type) or
+                "method" (activation method) (default "activation").
+
+        Returns:
+            List[Dict]: rows with keys `COLUMNS` (grouped keys are "*").
+        """
+
+        if by not in ("activation", "owner", "method"):
+            raise ValueError(f"Invalid grouping {by}")
+        groups = {}
+        for (owner, activation), stats in self.stats.items():
+            key = (owner if by != "method" else "*", activation if by != "owner" else "*")
+            groups.setdefault(key, ActivationStats()).add(stats)
+
+        rows = []
+        for (owner, activation), stats in sorted(groups.items(), key=lambda item: -item[1].total_time):
+            rows.append({"owner": owner, "activation": activation, "scheduled": stats.scheduled,
+                         "executed": stats.executed, "invalidated": stats.invalidated,
+                         "total_ms": stats.total_time / 1e6,
+                         "mean_us": stats.total_time / stats.executed / 1e3 if stats.executed else 0,
+                         "p50_us": stats.percentile(0.5) / 1e3, "p90_us": stats.percentile(0.9) / 1e3,
+                         "p99_us": stats.percentile(0.99) / 1e3})
+        return rows
+
+    def table(self, by: str = "activation") -> str:
+        """Method to format the statistics as a text table (see `rows`)."""
+
+        lines = ["{:<24} {:<28} {:>10} {:>10} {:>11} {:>10} {:>9} {:>9} {:>9} {:>9}".format(*COLUMNS)]
+        for row in self.rows(by):
+            lines.append("{owner:<24} {activation:<28} {scheduled:>10} {executed:>10} {invalidated:>11} {total_ms:>10.2f} "
+                         "{mean_us:>9.2f} {p50_us:>9.2f} {p90_us:>9.2f} {p99_us:>9.2f}".format(**row))
+        return "\n".join(lines)
@@ -12,9 +12,7 @@ from copy import copy
 from typing import List, Dict, Tuple, TYPE_CHECKING
 from math import sqrt
 
-from qutip.qip.circuit import QubitCircuit, Gate
-from qutip.qip.operations import gate_sequence_product
-from numpy import log2, array, kron, identity, zeros, arange, outer
+from numpy import log2, array, asarray, kron, zeros, arange, outer
 from numpy.random import random_sample, choice
 from random import random
 
@@ -89,30 +87,59 @@ class QuantumManager():
         for state in old_states:
             new_state = kron(new_state, state)
 
-        # get circuit matrix; expand if necessary
+        # get circuit matrix; acts on the first circuit.size qubits (see _apply_operator)
         circ_mat = circuit.get_unitary_matrix()
-        if circuit.size < len(all_keys):
-            # pad size of circuit matrix if necessary
-            diff = len(all_keys) - circuit.size
-            circ_mat = kron(circ_mat, identity(2 ** diff))
 
-        # apply any necessary swaps
+        # order qubits of the compound state so that the circuit qubits come first
         if not all([all_keys.index(key) == i for i, key in enumerate(keys)]):
-            all_keys, swap_mat = self._swap_qubits(all_keys, keys)
-            circ_mat = circ_mat @ swap_mat
+            all_keys, permutation = self._swap_qubits(all_keys, keys)
+            new_state = self._permute(new_state, permutation)
 
         return new_state, all_keys, circ_mat
 
-    def _swap_qubits(self, all_keys, keys):
-        swap_circuit = QubitCircuit(N=len(all_keys))
-        for i, key in enumerate(keys):
-            j = all_keys.index(key)
-            if j != i:
-                gate = Gate("SWAP", targets=[i, j])
-                swap_circuit.add_gate(gate)
-                all_keys[i], all_keys[j] = all_keys[j], all_keys[i]
-        swap_mat = gate_sequence_product(swap_circuit.propagators()).full()
-        return all_keys, swap_mat
+    def _swap_qubits(self, all_keys: List[int], keys: List[int]) -> Tuple[List[int], Tuple[int]]:
+        """Method to reorder qubits so that `keys` come first (in order).
+
+        Args:
+            all_keys (List[int]): keys of the qubits of a compound state.
+            keys (List[int]): keys to move to the front.
+
+        Returns:
+            Tuple[List[int], Tuple[int]]: reordered keys, and the permutation of qubit axes to apply to the state (see `_permute`).
+        """
+
+        positions = tuple(all_keys.index(key) for key in keys)
+        permutation = qubit_permutation(len(all_keys), positions)
+        return [all_keys[i] for i in permutation], permutation
+
+    @abstractmethod
+    def _apply_operator(self, state: any, operator: "np.ndarray") -> any:
+        """Method to apply an operator to the first qubits of a state.
+
+        The state is reshaped so that the operator only multiplies the axes of the qubits it acts on.
+        The cost is proportional to the size of the state, instead of its square for the operator padded with the identity.
+
+        Args:
+            state: state of `n` qubits. Type depends on type of subclass.
+            operator (np.ndarray): unitary on `k <= n` qubits.
+
+        Returns:
+            any: the state after the operator is applied to its first `k` qubits.
+        """
+        pass
+
+    @abstractmethod
+    def _permute(self, state: any, permutation: Tuple[int]) -> any:
+        """Method to reorder the qubits of a state.
+
+        Args:
+            state: state of `n` qubits. Type depends on type of subclass.
+            permutation (Tuple[int]): qubit `i` of the new state is qubit `permutation[i]` of `state`.
+
+        Returns:
+            any: the reordered state.
+        """
+        pass
 
     @abstractmethod
     def set(self, keys: List[int], amplitudes: any) -> None:
@@ -149,7 +176,7 @@ class QuantumManagerKet(QuantumManager):
         super().run_circuit(circuit, keys)
         new_state, all_keys, circ_mat = self._prepare_circuit(circuit, keys)
 
-        new_state = circ_mat @ new_state
+        new_state = self._apply_operator(new_state, circ_mat)
 
         if len(circuit.measured_qubits) == 0:
             # set state, return no measurement result
@@ -168,6 +195,14 @@ class QuantumManagerKet(QuantumManager):
         for key in keys:
             self.states[key] = new_state
 
+    def _apply_operator(self, state, operator):
+        dim = operator.shape[0]
+        return (operator @ state.reshape(dim, -1)).reshape(-1)
+
+    def _permute(self, state, permutation):
+        num_qubits = len(permutation)
+        return asarray(state).reshape((2,) * num_qubits).transpose(permutation).reshape(2 ** num_qubits)
+
     def _measure(self, state: List[complex], keys: List[int], all_keys: List[int]) -> Dict[int, int]:
         """Method to measure qubits at given keys.
 
@@ -185,7 +220,7 @@ class QuantumManagerKet(QuantumManager):
 
         if len(keys) == 1:
             if len(all_keys) == 1:
-                prob_0 = measure_state_with_cache_ket(tuple(state))
+                prob_0 = measure_state_with_cache_ket(state)
                 if random() < prob_0:
                     result = 0
                 else:
@@ -195,7 +230,7 @@ class QuantumManagerKet(QuantumManager):
                 key = keys[0]
                 num_states = len(all_keys)
                 state_index = all_keys.index(key)
-                state_0, state_1, prob_0 = measure_entangled_state_with_cache_ket(tuple(state), state_index, num_states)
+                state_0, state_1, prob_0 = measure_entangled_state_with_cache_ket(state, state_index, num_states)
                 if random() < prob_0:
                     new_state = array(state_0, dtype=complex)
                     result = 0
@@ -208,12 +243,12 @@ class QuantumManagerKet(QuantumManager):
         else:
             # swap states into correct position
             if not all([all_keys.index(key) == i for i, key in enumerate(keys)]):
-                all_keys, swap_mat = self._swap_qubits(all_keys, keys)
-                state = swap_mat @ state
+                all_keys, permutation = self._swap_qubits(all_keys, keys)
+                state = self._permute(state, permutation)
 
             # calculate meas probabilities and projected states
             len_diff = len(all_keys) - len(keys)
-            new_states, probabilities = measure_multiple_with_cache_ket(tuple(state), len(keys), len_diff)
+            new_states, probabilities = measure_multiple_with_cache_ket(state, len(keys), len_diff)
 
             # choose result, set as new state
             possible_results = arange(0, 2 ** len(keys), 1)
@@ -257,7 +292,7 @@ class QuantumManagerDensity(QuantumManager):
         super().run_circuit(circuit, keys)
         new_state, all_keys, circ_mat = super()._prepare_circuit(circuit, keys)
 
-        new_state = circ_mat @ new_state @ circ_mat.T
+        new_state = self._apply_operator(new_state, circ_mat)
 
         if len(circuit.measured_qubits) == 0:
             # set state, return no measurement result
@@ -276,6 +311,17 @@ class QuantumManagerDensity(QuantumManager):
         for key in keys:
             self.states[key] = new_state
 
+    def _apply_operator(self, state, operator):
+        # operator @ state @ operator.T, with both products on the first qubits of the rows and of the columns
+        dim, size = operator.shape[0], state.shape[0]
+        state = (operator @ state.reshape(dim, -1)).reshape(size, dim, -1)
+        state = (operator @ state).reshape(size, size)
+        return state
+
+    def _permute(self, state, permutation):
+        num_qubits = len(permutation)
+        axes = permutation + tuple(i + num_qubits for i in permutation)
+        return asarray(state).reshape((2,) * 2 * num_qubits).transpose(axes).reshape(2 ** num_qubits, 2 ** num_qubits)
 
     def _measure(self, state: List[List[complex]], keys: List[int], all_keys: List[int]) -> Dict[int, int]:
         """Method to measure qubits at given keys.
@@ -294,7 +340,7 @@ class QuantumManagerDensity(QuantumManager):
 
         if len(keys) == 1:
             if len(all_keys) == 1:
-                prob_0 = measure_state_with_cache_density(tuple(map(tuple, state)))
+                prob_0 = measure_state_with_cache_density(state)
                 if random() < prob_0:
                     result = 0
                     new_state = [[1, 0], [0, 0]]
@@ -306,8 +352,7 @@ class QuantumManagerDensity(QuantumManager):
                 key = keys[0]
                 num_states = len(all_keys)
                 state_index = all_keys.index(key)
-                state_0, state_1, prob_0 = measure_entangled_state_with_cache_density(tuple(map(tuple, state)),
-                        state_index, num_states)
+                state_0, state_1, prob_0 = measure_entangled_state_with_cache_density(state, state_index, num_states)
                 if random() < prob_0:
                     new_state = array(state_0, dtype=complex)
                     result = 0
@@ -318,13 +363,12 @@ class QuantumManagerDensity(QuantumManager):
         else:
             # swap states into correct position
             if not all([all_keys.index(key) == i for i, key in enumerate(keys)]):
-                all_keys, swap_mat = self._swap_qubits(all_keys, keys)
-                state = swap_mat @ state @ swap_mat.T
+                all_keys, permutation = self._swap_qubits(all_keys, keys)
+                state = self._permute(state, permutation)
 
             # calculate meas probabilities and projected states
             len_diff = len(all_keys) - len(keys)
-            state_to_measure = tuple(map(tuple, state))
-            new_states, probabilities = measure_multiple_with_cache_density(state_to_measure, len(keys), len_diff)
+            new_states, probabilities = measure_multiple_with_cache_density(state, len(keys), len_diff)
 
             # choose result, set as new state
             possible_results = arange(0, 2 ** len(keys), 1)
@@ -1,40 +1,228 @@
-"""This module defines functions to handle cached measurement of quantum states.
+"""This module defines functions to handle cached measurement and qubit reordering of quantum states.
 
 These should not be used directly, but accessed by a QuantumManager instance.
+Measurement results are cached by `MeasurementCache` objects, keyed on the quantized bytes of the state array.
+The caches of all measurement functions can be configured with `set_measurement_cache` and inspected with `measurement_cache_info`.
 """
 
-from functools import lru_cache
-from typing import Tuple
+from collections import OrderedDict
+from functools import lru_cache, wraps
+from typing import Any, Callable, Dict, Tuple
 from math import sqrt
 
-from numpy import array, kron, identity, zeros, trace 
+from numpy import array, asarray, ascontiguousarray, int64, kron, identity, zeros, trace
+
+
+class MeasurementCache():
+    """Class for a bounded cache of measurement results.
 
+    The key of a state is the byte view of its array truncated to `decimals` places (as integers), with its shape and the other arguments of the measurement.
+    States that differ by floating-point noise below the precision therefore share an entry.
 
-@lru_cache(maxsize=1000)
-def measure_state_with_cache_ket(state: Tuple[complex, complex]) -> float:
-    state = array(state)
-    M0 = array([[1, 0], [0, 0]], dtype=complex)
+    Attributes:
+        maxsize (int): maximum number of entries (0 disables caching).
+        policy (str): eviction policy, "lru" (least recently used) or "fifo" (first inserted).
+        decimals (int): number of decimal places kept in keys.
+        hits (int): number of lookups answered by the cache.
+        misses (int): number of lookups computed.
+    """
 
-    # probability of measuring basis[0]
-    prob_0 = (state.conj().T @ M0 @ state).real
-    return prob_0
+    POLICIES = ("lru", "fifo")
+
+    def __init__(self, maxsize=1000, policy="lru", decimals=12):
+        """Constructor for measurement cache.
+
+        Args:
+            maxsize (int): maximum number of entries (default 1000).
+            policy (str): eviction policy, "lru" or "fifo" (default "lru").
+            decimals (int): number of decimal places kept in keys (default 12).
+        """
+
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.configure(maxsize, policy, decimals)
+
+    def configure(self, maxsize=None, policy=None, decimals=None) -> None:
+        """Method to change the parameters of the cache; entries are cleared.
+
+        Args:
+            maxsize (int): maximum number of entries (default None to keep the current value).
+            policy (str): eviction policy (default None to keep the current value).
+            decimals (int): number of decimal places kept in keys (default None to keep the current value).
+        """
+
+        if policy is not None and policy not in self.POLICIES:
+            raise ValueError("unknown eviction policy {}; expected one of {}".format(policy, self.POLICIES))
+        self.maxsize = self.maxsize if maxsize is None else maxsize
+        self.policy = self.policy if policy is None else policy
+        self.decimals = self.decimals if decimals is None else decimals
+        self._scale = 10 ** self.decimals
+        self.clear()
+
+    def clear(self) -> None:
+        """Method to remove all entries and reset counters."""
+
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, state: "np.ndarray", args: Tuple) -> Tuple:
+        # complex arrays are viewed as interleaved real and imaginary parts; fixed-point integers avoid -0.0 keys
+        if state.dtype.kind == "c":
+            state = ascontiguousarray(state).view(state.real.dtype)
+        quantized = (state * self._scale).astype(int64)
+        return state.shape, quantized.tobytes(), args
+
+    def lookup(self, func: Callable, state: "np.ndarray", args: Tuple) -> Any:
+        """Method to get the result of `func(state, *args)`, computing it on a miss.
+
+        Args:
+            func (Callable): measurement function.
+            state (np.ndarray): state to measure.
+            args (Tuple): other arguments of `func`.
+
+        Returns:
+            Any: result of `func`.
+        """
+
+        if self.maxsize <= 0:
+            self.misses += 1
+            return func(state, *args)
+
+        key = self.key(state, args)
+        result = self._entries.get(key)
+        if result is not None:
+            self.hits += 1
+            if self.policy == "lru":
+                self._entries.move_to_end(key)
+            return result
+
+        self.misses += 1
+        result = func(state, *args)
+        self._entries[key] = result
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return result
+
+    def info(self) -> Dict[str, int]:
+        """Method to get cache statistics.
+
+        Returns:
+            Dict[str, int]: number of hits, misses and current entries.
+        """
+
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+_measurement_caches = {}
+
+
+def measurement_cache(func: Callable) -> Callable:
+    """Decorator to cache a measurement function in a `MeasurementCache`.
+
+    The decorated function takes the state (any array-like) as its first argument, followed by hashable arguments.
+    The cache is available as the `cache` attribute of the decorated function.
+    """
+
+    cache = MeasurementCache()
+    _measurement_caches[func.__name__] = cache
+
+    @wraps(func)
+    def wrapper(state, *args):
+        return cache.lookup(func, asarray(state), args)
+
+    wrapper.cache = cache
+    return wrapper
+
+
+def set_measurement_cache(maxsize=None, policy=None, decimals=None) -> None:
+    """Function to configure the caches of all measurement functions (see `MeasurementCache.configure`)."""
+
+    for cache in _measurement_caches.values():
+        cache.configure(maxsize, policy, decimals)
+
+
+def measurement_cache_info() -> Dict[str, Dict[str, int]]:
+    """Function to get statistics of the caches of all measurement functions.
+
+    Returns:
+        Dict[str, Dict[str, int]]: mapping of function names to their cache statistics (see `MeasurementCache.info`).
+    """
+
+    return {name: cache.info() for name, cache in _measurement_caches.items()}
 
 
 @lru_cache(maxsize=1000)
-def measure_entangled_state_with_cache_ket(state: Tuple[complex], state_index: int, num_states: int) -> Tuple[
-        Tuple[complex], Tuple[complex], float]:
-    state = array(state)
+def qubit_permutation(num_qubits: int, positions: Tuple[int]) -> Tuple[int]:
+    """Function to find the order of qubits that moves the qubits at `positions` to the front.
 
-    # generate projectors
+    Qubits are exchanged pairwise in the order of `positions`, so the other qubits keep the order of the previous SWAP-gate implementation.
+
+    Args:
+        num_qubits (int): number of qubits in the state.
+        positions (Tuple[int]): current positions of the qubits to move, in their new order.
+
+    Returns:
+        Tuple[int]: qubit `i` of the reordered state is qubit `permutation[i]` of the original state.
+    """
+
+    order = list(range(num_qubits))
+    for i, position in enumerate(positions):
+        j = order.index(position)
+        order[i], order[j] = order[j], order[i]
+    return tuple(order)
+
+
+@lru_cache(maxsize=None)
+def _single_projectors(state_index: int, num_states: int, density: bool) -> Tuple["np.ndarray", "np.ndarray"]:
+    # projectors onto basis[0] and basis[1] of one qubit of a state
+    # ket projectors are the 2 ** (num_states - 1) x 2 ** num_states reductions; density projectors are square
     projector0 = [1]
     projector1 = [1]
     for i in range(num_states):
         if i == state_index:
-            projector0 = kron(projector0, [1, 0])
-            projector1 = kron(projector1, [0, 1])
+            if density:
+                projector0 = kron(projector0, [[1, 0], [0, 0]])
+                projector1 = kron(projector1, [[0, 0], [0, 1]])
+            else:
+                projector0 = kron(projector0, [1, 0])
+                projector1 = kron(projector1, [0, 1])
         else:
             projector0 = kron(projector0, identity(2))
             projector1 = kron(projector1, identity(2))
+    return projector0, projector1
+
+
+@lru_cache(maxsize=None)
+def _multiple_projectors(num_states: int, length_diff: int, density: bool) -> Tuple["np.ndarray"]:
+    # projectors onto each basis state of the first num_states qubits of a state
+    basis_count = 2 ** num_states
+    projectors = [None] * basis_count
+    for i in range(basis_count):
+        if density:
+            M = zeros((basis_count, basis_count), dtype=complex)  # measurement operator
+            M[i, i] = 1
+        else:
+            M = zeros((1, basis_count), dtype=complex)  # measurement operator
+            M[0, i] = 1
+        projectors[i] = kron(M, identity(2 ** length_diff))  # projector
+    return tuple(projectors)
+
+
+@measurement_cache
+def measure_state_with_cache_ket(state: "np.ndarray") -> float:
+    M0 = array([[1, 0], [0, 0]], dtype=complex)
+
+    # probability of measuring basis[0]
+    prob_0 = (state.conj().T @ M0 @ state).real
+    return prob_0
+
+
+@measurement_cache
+def measure_entangled_state_with_cache_ket(state: "np.ndarray", state_index: int, num_states: int) -> Tuple[
+        Tuple[complex], Tuple[complex], float]:
+    projector0, projector1 = _single_projectors(state_index, num_states, False)
 
     # probability of measuring basis[0]
     prob_0 = (state.conj().T @ projector0.T @ projector0 @ state).real
@@ -52,19 +240,15 @@ def measure_entangled_state_with_cache_ket(state: Tuple[complex], state_index: i
     return (state0, state1, prob_0)
 
 
-@lru_cache(maxsize=1000)
-def measure_multiple_with_cache_ket(state: Tuple[complex], num_states: int, length_diff: int) -> Tuple[
+@measurement_cache
+def measure_multiple_with_cache_ket(state: "np.ndarray", num_states: int, length_diff: int) -> Tuple[
         Tuple[Tuple[complex]], Tuple[float]]:
-    state = array(state)
     basis_count = 2 ** num_states
 
-    # construct measurement operators, projectors, and probabilities of measurement
-    projectors = [None] * basis_count
+    # probabilities of measurement
+    projectors = _multiple_projectors(num_states, length_diff, False)
     probabilities = [0] * basis_count
     for i in range(basis_count):
-        M = zeros((1, basis_count), dtype=complex)  # measurement operator
-        M[0, i] = 1
-        projectors[i] = kron(M, identity(2 ** length_diff))  # projector
         probabilities[i] = (state.conj().T @ projectors[i].T @ projectors[i] @ state).real
         if probabilities[i] < 0:
             probabilities[i] = 0
@@ -82,9 +266,8 @@ def measure_multiple_with_cache_ket(state: Tuple[complex], num_states: int, leng
     return (tuple(return_states), tuple(probabilities))
 
 
-@lru_cache(maxsize=1000)
-def measure_state_with_cache_density(state: Tuple[Tuple[complex, complex]]) -> float:
-    state = array(state)
+@measurement_cache
+def measure_state_with_cache_density(state: "np.ndarray") -> float:
     M0 = array([[1, 0], [0, 0]], dtype=complex)
 
     # probability of measuring basis[0]
@@ -92,21 +275,10 @@ def measure_state_with_cache_density(state: Tuple[Tuple[complex, complex]]) -> f
     return prob_0
 
 
-@lru_cache(maxsize=1000)
-def measure_entangled_state_with_cache_density(state: Tuple[Tuple[complex]], state_index: int, num_states: int) -> Tuple[
+@measurement_cache
+def measure_entangled_state_with_cache_density(state: "np.ndarray", state_index: int, num_states: int) -> Tuple[
         Tuple[complex], Tuple[complex], float]:
-    state = array(state)
-
-    # generate projectors
-    projector0 = [1]
-    projector1 = [1]
-    for i in range(num_states):
-        if i == state_index:
-            projector0 = kron(projector0, [[1, 0], [0, 0]])
-            projector1 = kron(projector1, [[0, 0], [0, 1]])
-        else:
-            projector0 = kron(projector0, identity(2))
-            projector1 = kron(projector1, identity(2))
+    projector0, projector1 = _single_projectors(state_index, num_states, True)
 
     # probability of measuring basis[0]
     prob_0 = trace(state @ projector0).real
@@ -123,19 +295,15 @@ def measure_entangled_state_with_cache_density(state: Tuple[Tuple[complex]], sta
 
     return (state0, state1, prob_0)
 
-@lru_cache(maxsize=1000)
-def measure_multiple_with_cache_density(state: Tuple[Tuple[complex]], num_states: int, length_diff: int) -> Tuple[
+@measurement_cache
+def measure_multiple_with_cache_density(state: "np.ndarray", num_states: int, length_diff: int) -> Tuple[
         Tuple[Tuple[complex]], Tuple[float]]:
-    state = array(state)
     basis_count = 2 ** num_states
 
-    # construct measurement operators, projectors, and probabilities of measurement
-    projectors = [None] * basis_count
+    # probabilities of measurement
+    projectors = _multiple_projectors(num_states, length_diff, True)
     probabilities = [0] * basis_count
     for i in range(basis_count):
-        M = zeros((basis_count, basis_count), dtype=complex)  # measurement operator
-        M[i, i] = 1
-        projectors[i] = kron(M, identity(2 ** length_diff))  # projector
         probabilities[i] = trace(state @ projectors[i]).real
         if probabilities[i] < 0:
             probabilities[i] = 0
@@ -4,11 +4,12 @@ This module defines the Timeline class, which provides an interface for the simu
 All entities are required to have an attached timeline for simulation.
 """
 
+import pickle
 from _thread import start_new_thread
 from math import inf
 from sys import stdout
-from time import time_ns, sleep
-from typing import TYPE_CHECKING
+from time import perf_counter_ns, time_ns, sleep
+from typing import TYPE_CHECKING, Callable
 
 from numpy import random
 
@@ -16,7 +17,9 @@ if TYPE_CHECKING:
     from .event import Event
 
 from .eventlist import EventList
-from ..utils import log
+from .observables import Observables
+from .profiler import Profiler
+from ..utils import log, trace
 from .quantum_manager import QuantumManagerKet, QuantumManagerDensity
 from ..topology.topology import Topology
 
@@ -52,6 +55,8 @@ class Timeline:
         is_running (bool): records if the simulation has stopped executing events.
         show_progress (bool): show/hide the progress bar of simulation.
         quantum_manager (QuantumManager): quantum state manager.
+        observables (Observables): observables of the simulation, kept up to date by the protocols.
+        profiler (Profiler): event profiler (None if profiling is disabled, see `enable_profiling`).
     """
 
     def __init__(self, stop_time=inf, formalism='ket_vector'):
@@ -97,11 +102,21 @@ class Timeline:
         # self.swap_schedule = {'b':['a','c'], 'd':['c','e'], 'c':['a','e']}
         # self.swap_schedule = {'b':['a','c']}
         self.swap_schedule = None
+        # policy (or swap order) used to plan the schedule of a path when swap_schedule is not set
+        self.swap_policy = "balanced"
+        # sample entanglement generation attempts instead of simulating photons (see entanglement_management.generation)
+        self.abstract_generation = False
+        # with abstract_generation, sample the failed generation attempts before the next success at once
+        self.skip_generation_retries = False
+        # entanglement, generation attempts and memory lifetimes kept up to date by the protocols
+        self.observables = Observables(self)
+        self.profiler = None
     
     def set_topology(self, topology: "Topology") -> None:
         self.topology = topology
         num_nodes = len(self.topology.get_nodes_by_type('QuantumRouter'))
         self.gen_exec_count = [[0 for i in range(num_nodes)] for j in range(num_nodes)]
+        self.observables.add_topology(topology)
         
 
     def now(self) -> int:
@@ -113,6 +128,8 @@ class Timeline:
         """Method to schedule an event."""
 
         self.schedule_counter += 1
+        if self.profiler is not None:
+            self.profiler.scheduled(event)
         self.events.push(event)
 
     def init(self) -> None:
@@ -128,61 +145,71 @@ class Timeline:
         The `run` method begins simulation of events.
         Events are continuously popped and executed, until the simulation time limit is reached or events are exhausted.
         A progress bar may also be displayed, if the `show_progress` flag is set.
+        Per-event trace output is only produced if tracing is enabled (see `utils.trace`).
         """
         log.logger.info("Timeline start simulation")
-        print("Timeline start simulation")
+        tracing = trace.enabled
+        profiler = self.profiler
+        if tracing:
+            trace.trace("Timeline start simulation")
         tick = time_ns()
         self.is_running = True
 
         if self.show_progress:
             self.progress_bar()
 
-        # log = {}
-        print(f'len(self.events) {len(self.events)}')
+        if tracing:
+            trace.trace(f'len(self.events) {len(self.events)}')
         while len(self.events) > 0:
             event = self.events.pop()
-            print('Running event: ', event)
+            if tracing:
+                trace.trace('Running event: ', event)
 
             if event.time >= self.stop_time:
-                self.schedule(event)
+                # put back without counting it as scheduled again
+                self.events.push(event)
                 break
 
             assert self.time <= event.time, f"invalid event time for process scheduled on {event.process.owner}"
 
             if event.is_invalid():
+                if profiler is not None:
+                    profiler.invalidated(event)
                 continue
 
             self.time = event.time
-            # if not event.process.activation in log:
-            #     log[event.process.activation] = 0
-            # log[event.process.activation]+=1
-
-            event.process.run()
+            if profiler is not None:
+                tick_event = perf_counter_ns()
+                event.process.run()
+                profiler.executed(event, perf_counter_ns() - tick_event)
+            else:
+                event.process.run()
 
             self.run_counter += 1
 
-        # #print('number of event', self.event_counter)
-        # #print('log:',log)
-
         self.is_running = False
         self.has_completed = True
         self.time = self.stop_time
         time_elapsed = time_ns() - tick
         log.logger.info("Timeline end simulation. Execution Time: %d ns; Scheduled Event: %d; Executed Event: %d" %
                         (time_elapsed, self.schedule_counter, self.run_counter))
-        
+
     def run_step(self) -> None:
         """Main simulation method.
 
         The `run_step` method continues from the last executed event and runs till it successfully executes an event.
         A progress bar may also be displayed, if the `show_progress` flag is set.
+        Step logging, timing and trace output are only produced if tracing is enabled (see `utils.trace`).
         """
-        log.logger.info("Timeline run_step")
         self.steps += 1
-        print("Timeline running step: ",self.steps)
-        print("len(self.events): ", len(self.events))
-        
-        tick = time_ns()
+        tracing = trace.enabled
+        profiler = self.profiler
+        if tracing:
+            log.logger.info("Timeline run_step")
+            trace.trace("Timeline running step: ", self.steps)
+            trace.trace("len(self.events): ", len(self.events))
+            tick = time_ns()
+
         self.is_running = True
 
         if self.show_progress:
@@ -190,21 +217,34 @@ class Timeline:
 
         while len(self.events) > 0:
             event = self.events.pop()
-            print('Running event: ', event)
+            if tracing:
+                trace.trace('Running event: ', event)
 
             if event.time >= self.stop_time:
-                print('in reschedule condition')
+                # the event is dropped, and profiled as invalidated
+                if tracing:
+                    trace.trace('in reschedule condition')
+                if profiler is not None:
+                    profiler.invalidated(event)
                 continue
 
             assert self.time <= event.time, f"invalid event time for process scheduled on {event.process.owner}"
 
             if event.is_invalid():
-                print('invalid event')
+                if tracing:
+                    trace.trace('invalid event')
+                if profiler is not None:
+                    profiler.invalidated(event)
                 continue
 
             self.time = event.time
 
-            event.process.run()
+            if profiler is not None:
+                tick_event = perf_counter_ns()
+                event.process.run()
+                profiler.executed(event, perf_counter_ns() - tick_event)
+            else:
+                event.process.run()
 
             self.run_counter += 1
             break
@@ -212,19 +252,48 @@ class Timeline:
         if len(self.events) == 0:
             self.has_completed = True
             self.time = self.stop_time
-            print("Timeline end simulation")
+            if tracing:
+                trace.trace("Timeline end simulation")
+
+        if tracing:
+            time_elapsed = time_ns() - tick
+            log.logger.info("Timeline end simulation. Execution Time: %d ns; Scheduled Event: %d; Executed Event: %d" %
+                            (time_elapsed, self.schedule_counter, self.run_counter))
+
+    def run_until(self, predicate: Callable[[], bool] = None, time=inf, max_steps=inf) -> int:
+        """Method to advance simulation by several steps in one call.
+
+        Repeatedly performs `run_step` until, after a step, the simulation has completed, the current time exceeds `time`,
+        `max_steps` steps have been performed, or `predicate()` returns True.
+        The timeline is left in the same state as after the same number of individual `run_step` calls.
+
+        Args:
+            predicate (Callable[[], bool]): function evaluated after each step; stepping stops once it returns True (default None).
+            time (int): simulation time (in ps) that, once exceeded, stops stepping (default inf).
+            max_steps (int): maximum number of steps to perform (default inf).
+
+        Returns:
+            int: number of steps performed.
+        """
+
+        steps = 0
+        while steps < max_steps:
+            self.run_step()
+            steps += 1
+            if self.has_completed or self.time > time:
+                break
+            if predicate is not None and predicate():
+                break
+        return steps
 
-            
-        time_elapsed = time_ns() - tick
-        log.logger.info("Timeline end simulation. Execution Time: %d ns; Scheduled Event: %d; Executed Event: %d" %
-                        (time_elapsed, self.schedule_counter, self.run_counter))
-       
     def stop(self) -> None:
         """Method to stop simulation."""
         log.logger.info("Timeline is stopped")
         self.stop_time = self.now()
 
     def remove_event(self, event: "Event") -> None:
+        if self.profiler is not None and event in self.events:
+            self.profiler.invalidated(event)
         self.events.remove(event)
 
     def update_event_time(self, event: "Event", time: int) -> None:
@@ -237,6 +306,51 @@ class Timeline:
 
         self.events.update_event_time(event, time)
 
+    def snapshot(self) -> bytes:
+        """Method to capture the complete simulation state.
+
+        The snapshot contains the timeline and everything reachable from it (entities, topology, pending events and quantum states).
+        Random number generator states are not included; they should be seeded after restoring.
+
+        Returns:
+            bytes: serialized state, to be passed to `Timeline.restore`.
+        """
+
+        return pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def restore(snapshot: bytes) -> "Timeline":
+        """Method to create a new timeline from a snapshot.
+
+        Each call returns an independent copy of the captured state, which is much cheaper than rebuilding the network.
+
+        Args:
+            snapshot (bytes): state captured with `Timeline.snapshot`.
+
+        Returns:
+            Timeline: restored timeline (with its topology and entities).
+        """
+
+        return pickle.loads(snapshot)
+
+    def enable_profiling(self, profiler: Profiler = None) -> Profiler:
+        """Method to record the events scheduled, executed and invalidated from now on (see `kernel.profiler`).
+
+        Args:
+            profiler (Profiler): profiler to record to, e.g. shared by several timelines (default None for a new one).
+
+        Returns:
+            Profiler: the profiler of the timeline.
+        """
+
+        self.profiler = profiler if profiler is not None else Profiler()
+        return self.profiler
+
+    def disable_profiling(self) -> None:
+        """Method to stop recording events."""
+
+        self.profiler = None
+
     def seed(self, seed: int) -> None:
         """Sets random seed for simulation."""
 
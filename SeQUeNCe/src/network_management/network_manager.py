@@ -13,6 +13,7 @@ if TYPE_CHECKING:
 from ..message import Message
 from .routing import StaticRoutingProtocol
 from .reservation import ResourceReservationProtocol, ResourceReservationMessage, RSVPMsgType
+from ..utils import trace
 
 
 class NetworkManagerMessage(Message):
@@ -129,7 +130,7 @@ class NetworkManager():
         Side Effects:
             Will invoke `push` method of -1 indexed protocol in `protocol_stack`.
         """
-        print('Inside create request of network manager')
+        trace.trace('Inside create request of network manager')
         self.protocol_stack[-1].push(responder, start_time, end_time, memory_size, target_fidelity,False)#$$Shouldnt isvirtual be a _isvirtual?
 
     def createvirtualrequest(self, responder: str, start_time: int, end_time: int, memory_size: int, target_fidelity: float) -> None:#$$
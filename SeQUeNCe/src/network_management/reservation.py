@@ -5,13 +5,14 @@ This includes the Reservation, MemoryTimeCard, and QCap classes, which are used
 Also included is the definition of the message type used by the reservation protocol.
 """
 
+from bisect import bisect_left, bisect_right
 from enum import Enum, auto
 from typing import List, TYPE_CHECKING
 if TYPE_CHECKING:
     from ..topology.node import QuantumRouter
     from ..resource_management.memory_manager import MemoryInfo, MemoryManager
 
-from ..resource_management.rule_manager import Rule
+from ..resource_management.rule_manager import Rule, RuleCondition
 from ..entanglement_management.generation import EntanglementGenerationA
 from ..entanglement_management.purification import BBPSSW
 from ..entanglement_management.swapping import EntanglementSwappingA, EntanglementSwappingB
@@ -19,7 +20,8 @@ from ..message import Message
 from ..protocol import StackProtocol
 from ..kernel.event import Event
 from ..kernel.process import Process
-import copy
+from .swap_planner import plan_schedule, swap_order
+from ..utils import trace
 
 
 class RSVPMsgType(Enum):
@@ -187,26 +189,40 @@ class ResourceReservationProtocol(StackProtocol):
             counter = reservation.memory_size
         else:
             counter = reservation.memory_size * 2
-        cards = []
-        
-        ##print('###########Adding Reservation#############')
-        ##print('Node: ', self.own.name)
-        for card in self.timecards:            
-        #   #print('Card for memory id: ', card.memory_index)
-            condition, isCardVirtual = card.add(reservation)
-            if (not isCardVirtual) and condition:
-                counter -= 1
-                cards.append(card)
-            if counter == 0:
-                break
+        if counter == 0:
+            return True
 
-        if counter > 0:
-            for card in cards:
-                card.remove(reservation)
+        cards = self.get_free_cards(reservation.start_time, reservation.end_time, counter)
+        if len(cards) < counter:
             return False
 
+        # free memories with a virtual reservation up to the last chosen one also hold the reservation
+        for card in self.timecards[:cards[-1].memory_index + 1]:
+            card.add(reservation)
         return True
 
+    def get_free_cards(self, start_time: int, end_time: int, count: int) -> List["MemoryTimeCard"]:
+        """Method to find the first memories without physical reservations in [start_time, end_time].
+
+        Memories with a virtual reservation are skipped.
+
+        Args:
+            start_time (int): start of interval.
+            end_time (int): end of interval.
+            count (int): number of memories wanted.
+
+        Returns:
+            List[MemoryTimeCard]: time cards of the first (at most) `count` free memories.
+        """
+
+        cards = []
+        for card in self.timecards:
+            if len(cards) == count:
+                break
+            if not card.has_virtual_reservation() and card.is_free(start_time, end_time):
+                cards.append(card)
+        return cards
+
     def create_rules(self, path: List[str], reservation: "Reservation") -> List["Rule"]:
         """Method to create rules for a successful request.
 
@@ -222,7 +238,7 @@ class ResourceReservationProtocol(StackProtocol):
 
         rules = []
 
-        self.own.resource_manager.rule_manager.rules = []
+        self.own.resource_manager.rule_manager.clear()
         #print(f'Rules for this node: {self.own.name} are {len(self.own.resource_manager.rule_manager.rules)}')
         memory_indices = []
         virtual_indices = []
@@ -230,7 +246,7 @@ class ResourceReservationProtocol(StackProtocol):
         last_virtual_index = -1
 
         for card in self.timecards:
-            if reservation in card.reservations:
+            if reservation in card:
                 memory_indices.append(card.memory_index)
                 #To maintain the virtual link indices 
                 if card.has_virtual_reservation() and not reservation.isvirtual:
@@ -246,142 +262,24 @@ class ResourceReservationProtocol(StackProtocol):
             #To generate entanglement with left side node
             #To accept virtual links, we skip the generation step when a non physical neighbor is found
             if path[index - 1] in self.own.neighbors:
-                ##print("###",self.own.name)
                 #This will run for all nodes barring starting node
-                def eg_rule_condition(memory_info: "MemoryInfo", manager: "MemoryManager"):
-                    
-                    # """
-                    #     #########################################################
-                    #     Adding special condition to ensure a-c happens before c-d
-                    #     #########################################################
-                    # """
-                    # # if self.own.name == 'd' and path[index - 1] == 'c':
-                    # #     print('Trying to generate ENT b/w d and c')
-
-                    # if self.own.name == 'd' and path[index - 1] == 'c' and self.own.timeline.swap_success_count[2][0] == 0: #and self.own.timeline.swap_success_count[2][0] == 0):
-                    #     # print('d-c generation can only begin once a-c swap is over')
-                    #     return []                
-                    
-                    
-                    """if manager.resource_manager.owner.name == 'd' and memory_info.index == 1:
-                        #print('EG for node: ', manager.resource_manager.owner.name)
-                        #print('memory_info.state ', memory_info.state)
-                        #print('memory_info.index: ', memory_info.index)
-                        #print('memory_indices[last_virtual_index + 1 : last_virtual_index + reservation.memory_size + 1]: ', memory_indices[last_virtual_index + 1 : last_virtual_index + reservation.memory_size + 1])
-                        #print('reservation.memory_size', reservation.memory_size)
-                    """
-                    #memory_list = memory_indices[:reservation.memory_size]
-                    #if index < len(path) - 1 and path[index + 1] not in self.own.neighbors:
-                    #    memory_list.append(reservation.memory_size)                    
-
-                    #memories_indices_free = [x for x in memory_indices if x not in virtual_indices]
-
-                    #if memory_info.state == "RAW" and memory_info.index in memory_indices[:reservation.memory_size]:
-                    #begin, end = last_virtual_index + 1 , (last_virtual_index+1) + reservation.memory_size
-                    if memory_info.state == "RAW" and memory_info.index in memory_indices[last_virtual_index + 1 : last_virtual_index + reservation.memory_size + 1]:
-                        #Check for node B's memory
-                        """#print('self.own.name here is : ', self.own.name)
-                        if self.own.name == 'd':
-                            #print(f'In rule condition for Entanglement Generation  at node e for d')
-                            #print('memory_info.index: ', memory_info.index)
-                            #print('memory_info.state: ', memory_info.state)
-                            #print('memory_info.remote_node: ', memory_info.remote_node)
-                        """
-                        return [memory_info]
-                    else:
-                        return []
-
-                def eg_rule_action(memories_info: List["MemoryInfo"]):
-                    memories = [info.memory for info in memories_info]
-                    memory = memories[0]
-                    mid = self.own.map_to_middle_node[path[index - 1]]
-                    ##print('---------EntanglementGenerationA----------for pair: ', (self.own.name, path[index - 1]))
-                    ##print('---------Middle node for this----------', mid)
-                    protocol = EntanglementGenerationA(None, "EGA." + memory.name, mid, path[index - 1], memory)
-                    return [protocol, [None], [None]]
-                
-
-                rule = Rule(10, eg_rule_action, eg_rule_condition)
-                rules.append(rule)
-
-            #memory_indices_occupied.append(memories_indices_free)
-            
+                condition = RuleCondition("RAW", memory_indices[last_virtual_index + 1 : last_virtual_index + reservation.memory_size + 1])
+                action = EntanglementGenerationAction(self.own.name, self.own.map_to_middle_node[path[index - 1]], path[index - 1])
+                rules.append(Rule(10, action, condition))
+
         if index < len(path) - 1:
             #To generate entanglement with right side node
             #To accept virtual links, we skip the generation step when a non physical neighbor is found
             if path[index + 1] in self.own.neighbors:
-                #Starting node
                 if index == 0:
-                    def eg_rule_condition(memory_info: "MemoryInfo", manager: "MemoryManager"):
-                        if memory_info.state == "RAW" and memory_info.index in memory_indices:
-                            return [memory_info]
-                        else:
-                            return []
-                #second to second last node
+                    #Starting node
+                    condition = RuleCondition("RAW", memory_indices)
                 else:
-                    def eg_rule_condition(memory_info: "MemoryInfo", manager: "MemoryManager"):
-                        
-                        """
-                            #########################################################
-                            Adding special condition to ensure a-c happens before c-d
-                            #########################################################
-                        """
-                        """if self.own.name == 'c':
-                            print('At c executing some rules')
-
-                        if self.own.name == 'c' and path[index + 1] == 'd':
-                            print('Trying to generate ENT b/w c and d')
-                            #print('swap_success_count: ', self.own.timeline.swap_success_count)"""
-                        
-                        # if self.own.name == 'c' and path[index + 1] == 'd' and self.own.timeline.swap_success_count[2][0] == 0: #and self.own.timeline.swap_success_count[2][0] == 0):
-                        #     # print('c-d generation can only begin once a-c swap is over')
-                        #     return []
-                        
-                        """if self.own.name == 'c' and path[index + 1] == 'd':
-                            print(f'In rule condition for Entanglement Generation  at node d for e')
-                            print('memory_info.index: ', memory_info.index)
-                            print('memory_info.state: ', memory_info.state)
-                            print('memory_info.remote_node: ', memory_info.remote_node)
-                            print('last_virtual_index, reservation.memory_size: ',last_virtual_index, reservation.memory_size)
-                            print('acceptable indexes: ', memory_indices[last_virtual_index + reservation.memory_size:])
-                        """
-
-                        #if memory_info.state == "RAW" and memory_info.index in memory_indices[reservation.memory_size:]:
-                        if memory_info.state == "RAW" and memory_info.index in memory_indices[(last_virtual_index+1) + reservation.memory_size:]:
-                            #Check for node B's memory
-                            """#print('self.own.name here is : ', self.own.name)
-                        
-                            #print(f'In rule condition for Entanglement Generation  at node {self.own.name}')
-                            #print('memory_info.index: ', memory_info.index)
-                            #print('memory_info.state: ', memory_info.state)
-                            #print('memory_info.remote_node: ', memory_info.remote_node)
-                            """
-
-                            #if self.own.name == 'c' and path[index + 1] == 'd':
-                            #    print('memory found at c to generate entanglement with d')
-                            
-                            return [memory_info]
-                        else:
-                            return []
-
-                def eg_rule_action(memories_info: List["MemoryInfo"]):
-                    def req_func(protocols):
-                        for protocol in protocols:
-                            if isinstance(protocol,
-                                          EntanglementGenerationA) and protocol.other == self.own.name and protocol.rule.get_reservation() == reservation:
-                                return protocol
-
-                    memories = [info.memory for info in memories_info]
-                    memory = memories[0]
-                    #memory = memories[-1]
-                    mid = self.own.map_to_middle_node[path[index + 1]]
-                    ##print('---------EntanglementGenerationA----------for pair: ', (self.own.name, path[index + 1]))
-                    ##print('---------Middle node for this---------- ', mid)
-                    protocol = EntanglementGenerationA(None, "EGA." + memory.name, mid, path[index + 1], memory)
-                    return [protocol, [path[index + 1]], [req_func]]
-                ##print('---------EntanglementGenerationA----------for pair: ', (self.own.name, path[index + 1]))
-                rule = Rule(10, eg_rule_action, eg_rule_condition)
-                rules.append(rule)
+                    #second to second last node
+                    condition = RuleCondition("RAW", memory_indices[(last_virtual_index + 1) + reservation.memory_size:])
+                action = EntanglementGenerationAction(self.own.name, self.own.map_to_middle_node[path[index + 1]], path[index + 1],
+                                                      reservation=reservation)
+                rules.append(Rule(10, action, condition))
 
         ##print(f'For {self.own.name}: --- len(rules): {len(rules)}')
 
@@ -463,129 +361,34 @@ class ResourceReservationProtocol(StackProtocol):
         #     rules.append(rule)
 
         # create rules for entanglement swapping
-        def es_rule_actionB(memories_info: List["MemoryInfo"]):
-            memories = [info.memory for info in memories_info]
-            memory = memories[0]
-            protocol = EntanglementSwappingB(None, "ESB." + memory.name, memory)
-            return [protocol, [None], [None]]
-
         if index == 0:
-            def es_rule_condition(memory_info: "MemoryInfo", manager: "MemoryManager"):
-                if (memory_info.state == "ENTANGLED"
-                        and memory_info.index in memory_indices
-                        and memory_info.remote_node != path[-1]
-                        #and memory_info.remote_node == path[index+1]
-                        and memory_info.fidelity >= reservation.fidelity):                
-                    return [memory_info]
-                else:
-                    return []
-
-            rule = Rule(10, es_rule_actionB, es_rule_condition)
-            rules.append(rule)
+            condition = RuleCondition("ENTANGLED", memory_indices, excluded_remote_nodes=[path[-1]],
+                                      min_fidelity=reservation.fidelity)
+            rules.append(Rule(10, EntanglementSwappingBAction(), condition))
 
         elif index == len(path) - 1:
-            def es_rule_condition(memory_info: "MemoryInfo", manager: "MemoryManager"):
-                if (memory_info.state == "ENTANGLED"
-                        and memory_info.index in memory_indices
-                        and memory_info.remote_node != path[0]
-                        #and memory_info.remote_node == path[index-1]
-                        and memory_info.fidelity >= reservation.fidelity):
-                    return [memory_info]
-                else:
-                    return []
-
-            rule = Rule(10, es_rule_actionB, es_rule_condition)
-            rules.append(rule)
+            condition = RuleCondition("ENTANGLED", memory_indices, excluded_remote_nodes=[path[0]],
+                                      min_fidelity=reservation.fidelity)
+            rules.append(Rule(10, EntanglementSwappingBAction(), condition))
 
         else:
-            if self.own.timeline.swap_order == None:
-                print('Computing Swap Order fo this request')
-                swap_order = {}
-                for p in path[1:-1]:
-                    _path_ = copy.deepcopy(path)
-                    while _path_.index(p) % 2 == 0:
-                        _new_path = []
-                        for i, n in enumerate(_path_):
-                            if i % 2 == 0 or i == len(_path_) - 1:
-                                _new_path.append(n)
-                        _path_ = _new_path
-                    swap_order[p] = len(_path_)
-                swap_ls = [k for k, v in sorted(swap_order.items(), key=lambda item: item[1], reverse=True)]
-                print(f'computed swap order: {swap_ls}')
-                self.own.timeline.swap_order = swap_ls            
-            
-            # _path = path[:]
-            # while _path.index(self.own.name) % 2 == 0:
-            #     new_path = []
-            #     for i, n in enumerate(_path):
-            #         if i % 2 == 0 or i == len(_path) - 1:
-            #             new_path.append(n)
-            #     _path = new_path
-            # _index = _path.index(self.own.name)
-            # left, right = _path[_index - 1], _path[_index + 1]
-            print(f'node: {self.own.name}')
-            left, right = self.own.timeline.swap_schedule[self.own.name]
-
-            def es_rule_conditionA(memory_info: "MemoryInfo", manager: "MemoryManager"):
-                if (memory_info.state == "ENTANGLED"
-                        and memory_info.index in memory_indices
-                        and memory_info.remote_node == left
-                        and memory_info.fidelity >= reservation.fidelity):
-                    for info in manager:
-                        if (info.state == "ENTANGLED"
-                                and info.index in memory_indices
-                                and info.remote_node == right
-                                and info.fidelity >= reservation.fidelity):     
-                            return [memory_info, info]
-                    
-                if (memory_info.state == "ENTANGLED"
-                      and memory_info.index in memory_indices
-                      and memory_info.remote_node == right
-                      and memory_info.fidelity >= reservation.fidelity):
-                    for info in manager:
-                        if (info.state == "ENTANGLED"
-                                and info.index in memory_indices
-                                and info.remote_node == left
-                                and info.fidelity >= reservation.fidelity):
-                            return [memory_info, info]
-                return []
-
-            def es_rule_actionA(memories_info: List["MemoryInfo"]):
-                memories = [info.memory for info in memories_info]
-
-                def req_func1(protocols):
-                    for protocol in protocols:
-                        if (isinstance(protocol, EntanglementSwappingB)
-                                and protocol.memory.name == memories_info[0].remote_memo):
-                            return protocol
-
-                def req_func2(protocols):
-                    for protocol in protocols:
-                        if (isinstance(protocol, EntanglementSwappingB)
-                                and protocol.memory.name == memories_info[1].remote_memo):
-                            return protocol
-
-                protocol = EntanglementSwappingA(None, "ESA.%s.%s" % (memories[0].name, memories[1].name),
-                                                 memories[0], memories[1],
-                                                 success_prob=self.es_succ_prob, degradation=self.es_degradation)
-                dsts = [info.remote_node for info in memories_info]
-                req_funcs = [req_func1, req_func2]
-                return protocol, dsts, req_funcs
-            rule = Rule(10, es_rule_actionA, es_rule_conditionA)
-            rules.append(rule)
-
-            def es_rule_conditionB(memory_info: "MemoryInfo", manager: "MemoryManager") -> List["MemoryInfo"]:
-                if (memory_info.state == "ENTANGLED"
-                        and memory_info.index in memory_indices
-                        and memory_info.remote_node not in [left, right]
-                        and memory_info.fidelity >= reservation.fidelity):
-                    return [memory_info]
-
-                else:
-                    return []
-            
-            rule = Rule(10, es_rule_actionB, es_rule_conditionB)
-            rules.append(rule)
+            timeline = self.own.timeline
+            schedule = timeline.swap_schedule or plan_schedule(path, timeline.swap_policy)
+            if timeline.swap_order == None:
+                timeline.swap_order = swap_order(schedule, path)
+                if trace.enabled:
+                    trace.trace(f'computed swap order: {timeline.swap_order}')
+            if trace.enabled:
+                trace.trace(f'node: {self.own.name}')
+            left, right = schedule[self.own.name]
+
+            condition = RuleCondition("ENTANGLED", memory_indices, min_fidelity=reservation.fidelity, partners=(left, right))
+            action = EntanglementSwappingAAction(self.es_succ_prob, self.es_degradation)
+            rules.append(Rule(10, action, condition))
+
+            condition = RuleCondition("ENTANGLED", memory_indices, excluded_remote_nodes=[left, right],
+                                      min_fidelity=reservation.fidelity)
+            rules.append(Rule(10, EntanglementSwappingBAction(), condition))
 
         for rule in rules:
             rule.set_reservation(reservation)
@@ -606,7 +409,7 @@ class ResourceReservationProtocol(StackProtocol):
         self.accepted_reservation.append(reservation)
         for card in self.timecards:
 
-            if reservation in card.reservations:
+            if reservation in card:
                 #if self.own.name == 'b' and card.memory_index == 0:
                 #    #print ('Memory 0 in b is in this reservation')
                 process = Process(self.own.resource_manager, "update",
@@ -638,6 +441,92 @@ class ResourceReservationProtocol(StackProtocol):
         self.es_degradation = degradation
 
 
+class EntanglementGenerationAction():
+    """Rule action to start entanglement generation with a neighbor.
+
+    Actions (and the request functions they send) are plain objects, so that rules can be inspected and pickled with the timeline.
+
+    Attributes:
+        node (str): name of node running the rule.
+        middle (str): name of BSM node between the two neighbors.
+        remote (str): name of neighbor.
+        reservation (Reservation): reservation of the rule; if given, the protocol is paired by a request to `remote` (None to wait for the neighbor's request).
+    """
+
+    def __init__(self, node: str, middle: str, remote: str, reservation: "Reservation" = None):
+        self.node = node
+        self.middle = middle
+        self.remote = remote
+        self.reservation = reservation
+
+    def __call__(self, memories_info: List["MemoryInfo"]):
+        memory = memories_info[0].memory
+        protocol = EntanglementGenerationA(None, "EGA." + memory.name, self.middle, self.remote, memory)
+        if self.reservation is None:
+            return [protocol, [None], [None]]
+        return [protocol, [self.remote], [GenerationRequest(self.node, self.reservation)]]
+
+
+class GenerationRequest():
+    """Request function selecting the waiting EntanglementGenerationA protocol paired with `node` for `reservation`."""
+
+    def __init__(self, node: str, reservation: "Reservation"):
+        self.node = node
+        self.reservation = reservation
+
+    def __call__(self, protocols):
+        for protocol in protocols:
+            if (isinstance(protocol, EntanglementGenerationA) and protocol.other == self.node
+                    and protocol.rule.get_reservation() == self.reservation):
+                return protocol
+
+
+class EntanglementSwappingAAction():
+    """Rule action to swap the entanglement of two memories (EntanglementSwappingA).
+
+    Attributes:
+        success_prob (float): `success_prob` of created protocols.
+        degradation (float): `degradation` of created protocols.
+    """
+
+    def __init__(self, success_prob: float, degradation: float):
+        self.success_prob = success_prob
+        self.degradation = degradation
+
+    def __call__(self, memories_info: List["MemoryInfo"]):
+        memories = [info.memory for info in memories_info]
+        protocol = EntanglementSwappingA(None, "ESA.%s.%s" % (memories[0].name, memories[1].name),
+                                         memories[0], memories[1],
+                                         success_prob=self.success_prob, degradation=self.degradation)
+        dsts = [info.remote_node for info in memories_info]
+        req_funcs = [SwappingRequest(info) for info in memories_info]
+        return protocol, dsts, req_funcs
+
+
+class SwappingRequest():
+    """Request function selecting the waiting EntanglementSwappingB protocol on the remote memory of `memory_info`.
+
+    The remote memory is read when the request is evaluated, so a memory that expired in the meantime matches no protocol.
+    """
+
+    def __init__(self, memory_info: "MemoryInfo"):
+        self.memory_info = memory_info
+
+    def __call__(self, protocols):
+        for protocol in protocols:
+            if isinstance(protocol, EntanglementSwappingB) and protocol.memory.name == self.memory_info.remote_memo:
+                return protocol
+
+
+class EntanglementSwappingBAction():
+    """Rule action to wait for the swapping result of a memory (EntanglementSwappingB)."""
+
+    def __call__(self, memories_info: List["MemoryInfo"]):
+        memory = memories_info[0].memory
+        protocol = EntanglementSwappingB(None, "ESB." + memory.name, memory)
+        return [protocol, [None], [None]]
+
+
 class Reservation():
     """Tracking of reservation parameters for the network manager.
 
@@ -680,9 +569,14 @@ class Reservation():
 class MemoryTimeCard():
     """Class for tracking reservations on a specific memory.
 
+    Physical reservations of a memory never overlap, so they are kept sorted by start time (which also sorts them by end time).
+    An incoming reservation can only overlap the last physical reservation starting before its end, found by bisection.
+    Virtual reservations are tracked separately and do not block physical ones.
+
     Attributes:
         memory_index (int): index of memory being tracked (in memory array).
-        reservations (List[Reservation]): list of reservations for the memory.
+        physical_reservations (List[Reservation]): physical reservations for the memory, sorted by start time.
+        virtual_reservations (List[Reservation]): virtual reservations for the memory.
     """
 
     def __init__(self, memory_index: int):
@@ -693,13 +587,21 @@ class MemoryTimeCard():
         """
 
         self.memory_index = memory_index
-        self.reservations = []
+        self.physical_reservations = []
+        self.virtual_reservations = []
+        self._start_times = []
+
+    @property
+    def reservations(self) -> List["Reservation"]:
+        """List[Reservation]: all reservations for the memory (physical ones first)."""
+
+        return self.physical_reservations + self.virtual_reservations
+
+    def __contains__(self, reservation: "Reservation") -> bool:
+        return reservation in self.virtual_reservations or self._find_physical(reservation) >= 0
 
     def has_virtual_reservation(self):
-        for res in self.reservations:
-            if res.isvirtual:
-                return True
-        return False
+        return len(self.virtual_reservations) > 0
 
     def add(self, reservation: "Reservation") -> bool:
         """Method to add reservation.
@@ -710,23 +612,18 @@ class MemoryTimeCard():
             reservation (Reservation): reservation to add.
 
         Returns:
-            bool: whether or not reservation was inserted successfully.
+            Tuple[bool, bool]: whether or not reservation was inserted successfully, and whether the memory has a virtual reservation.
         """
         
-        ##print('Trying to add reservation to this card with memory index: ', self.memory_index)
         pos, isCardVirtual = self.schedule_reservation(reservation)
-        if pos >= 0:
-            ##print('Reservation addition successful for this card')
-            self.reservations.insert(pos, reservation)
-            return True, isCardVirtual
-        else:
-            ##print('Reservation addition successful for this card')
+        if pos < 0:
             return False, isCardVirtual
-        #self.reservations.insert(len(self.reservations), reservation)
-        #return True
-        """else:
-            #print('Reservation addition failed to this card')
-            return False"""
+        if reservation.isvirtual:
+            self.virtual_reservations.append(reservation)
+        else:
+            self.physical_reservations.insert(pos, reservation)
+            self._start_times.insert(pos, reservation.start_time)
+        return True, isCardVirtual
         
     def remove(self, reservation: "Reservation") -> bool:
         """Method to remove a reservation.
@@ -738,69 +635,56 @@ class MemoryTimeCard():
             bool: if reservation was already on the memory or not.
         """
 
+        pos = self._find_physical(reservation)
+        if pos >= 0:
+            self.physical_reservations.pop(pos)
+            self._start_times.pop(pos)
+            return True
         try:
-            pos = self.reservations.index(reservation)
-            self.reservations.pop(pos)
+            self.virtual_reservations.remove(reservation)
             return True
         except ValueError:
             return False
 
+    def is_free(self, start_time: int, end_time: int) -> bool:
+        """Method to check if no physical reservation overlaps [start_time, end_time] (bounds included).
+
+        Args:
+            start_time (int): start of interval.
+            end_time (int): end of interval.
+
+        Returns:
+            bool: if the memory is free for the whole interval.
+        """
+
+        return self._insertion_index(start_time, end_time) >= 0
+
     def schedule_reservation(self, resv: "Reservation") -> int:
         """Method to add reservation to a memory.
 
-        Will return index at which reservation can be inserted into memory reservation list.
-        If no space found for reservation, will raise an exception.
-
-        
+        Will return index at which reservation can be inserted into the physical reservation list.
+        If no space found for reservation, will return -1.
 
         Args:
             resv (Reservation): reservation to schedule.
 
         Returns:
-            int: index to insert reservation in reservation list.
-
-        Raises:
-            Exception: no valid index to insert reservation.
+            Tuple[int, bool]: index to insert reservation in physical reservation list (-1 if it overlaps one), and whether the memory has a virtual reservation.
         """
-        isCardVirtual = False
-        physical_reservations=[]
-        for res in self.reservations:
-            if res.isvirtual:#$ or self.reservation.isvirtual
-                isCardVirtual = True
-                pass
-            else:
-                physical_reservations.append(res)
-        start, end = 0, len(physical_reservations) - 1
-        for res in physical_reservations:
-            while start <= end:
-                mid = (start + end) // 2
-                if physical_reservations[mid].start_time > res.end_time:
-                    end = mid - 1
-                elif physical_reservations[mid].end_time < res.start_time:
-                    start = mid + 1
-                elif max(physical_reservations[mid].start_time, res.start_time) <= min(physical_reservations[mid].end_time,
-                                                                                    res.end_time):
-                    return -1, isCardVirtual
-                else:
-                    raise Exception("Unexpected status")
-        return start, isCardVirtual
 
-        #$Previous code below for your reference
-        """
-        start, end = 0, len(self.reservations) - 1
-        while start <= end:
-            mid = (start + end) // 2
-            if self.reservations[mid].start_time > resv.end_time:
-                end = mid - 1
-            elif self.reservations[mid].end_time < resv.start_time:
-                start = mid + 1
-            elif max(self.reservations[mid].start_time, resv.start_time) <= min(self.reservations[mid].end_time,
-                                                                                resv.end_time):
-                return -1
-            else:
-                raise Exception("Unexpected status")
-        return start
-        """
+        return self._insertion_index(resv.start_time, resv.end_time), self.has_virtual_reservation()
+
+    def _insertion_index(self, start_time: int, end_time: int) -> int:
+        pos = bisect_right(self._start_times, end_time)
+        if pos > 0 and self.physical_reservations[pos - 1].end_time >= start_time:
+            return -1
+        return pos
+
+    def _find_physical(self, reservation: "Reservation") -> int:
+        pos = bisect_left(self._start_times, reservation.start_time)
+        if pos < len(self.physical_reservations) and self.physical_reservations[pos] is reservation:
+            return pos
+        return -1
 
 
 class QCap():
@@ -6,7 +6,7 @@ Also included is the message type used by the routing protocol.
 """
 
 from enum import Enum
-from typing import Dict, TYPE_CHECKING
+from typing import Dict, Iterable, Optional, TYPE_CHECKING
 if TYPE_CHECKING:
     from ..topology.node import Node 
 
@@ -14,9 +14,11 @@ if TYPE_CHECKING:
 from ..message import Message
 from ..protocol import StackProtocol
 from .reservation import RSVPMsgType
-import json
+from ..utils import trace
 import math
 
+import numpy as np
+
 class StaticRoutingMessage(Message):
     """Message used for communications between routing protocol instances.
 
@@ -31,6 +33,63 @@ class StaticRoutingMessage(Message):
         self.payload = payload
 
 
+class RoutingOracle():
+    """Class to look up distances for next hop selection.
+
+    A single instance is built from the all-pair shortest distances of a topology and shared (read-only) by all routers.
+
+    Attributes:
+        ids (Dict[str, int]): integer id of each node.
+        distance (np.ndarray): `distance[i, j]` is the shortest distance from node `i` to node `j`.
+        rank (np.ndarray): `rank[i, j]` is the position of node `j` in the distance table of node `i` (breaks ties between hops).
+    """
+
+    def __init__(self, all_pair_dist: Dict[str, Dict[str, float]]):
+        """Constructor for the routing oracle.
+
+        Args:
+            all_pair_dist (Dict[str, Dict[str, float]]): shortest distances in format {node1: {node2: distance}}.
+        """
+
+        names = list(all_pair_dist)
+        for row in all_pair_dist.values():
+            names.extend(name for name in row if name not in all_pair_dist)
+        self.ids = {name: i for i, name in enumerate(dict.fromkeys(names))}
+        size = len(self.ids)
+        self.distance = np.full((size, size), math.inf)
+        self.rank = np.full((size, size), size, dtype=int)
+        for name, row in all_pair_dist.items():
+            i = self.ids[name]
+            for position, (other, dist) in enumerate(row.items()):
+                self.distance[i, self.ids[other]] = dist
+                self.rank[i, self.ids[other]] = position
+        self.distance.flags.writeable = False
+        self.rank.flags.writeable = False
+
+    def closest(self, dest: str, candidates: Iterable[str]) -> Optional[str]:
+        """Method to find the candidate closest to a destination.
+
+        Args:
+            dest (str): name of destination node.
+            candidates (Iterable[str]): names of candidate nodes (unknown names are ignored).
+
+        Returns:
+            Optional[str]: closest candidate, or `None` if no candidate reaches `dest`.
+        """
+
+        distance = self.distance[self.ids[dest]]
+        rank = self.rank[self.ids[dest]]
+        best, least_dist, best_rank = None, math.inf, 0
+        for node in candidates:
+            i = self.ids.get(node)
+            if i is None:
+                continue
+            dist = distance[i]
+            if dist < least_dist or (best is not None and dist == least_dist and rank[i] < best_rank):
+                best, least_dist, best_rank = node, dist, rank[i]
+        return best
+
+
 class StaticRoutingProtocol(StackProtocol):
     """Class to route reservation requests.
 
@@ -122,79 +181,29 @@ class StaticRoutingProtocol(StackProtocol):
 
     #--------------------------------------------------
     def custom_next_best_hop(self, curr_node, dest, demand, visited):
-        print('----Routing')
+        trace.trace('----Routing')
         #if curr_node == dest:
         #    return dest
 
         if (curr_node == 'm' and dest == 'l') or (curr_node == 'm' and dest == 'g'):
             return 'h'
 
-        is_next_virtual = True
-        all_pair_path = self.own.all_pair_shortest_dist
+        oracle = self.own.routing_oracle
+        if oracle is None:
+            oracle = self.own.routing_oracle = RoutingOracle(self.own.all_pair_shortest_dist)
         neighbors = self.own.neighbors
-        
-        virtual_neighbors = self.own.find_virtual_neighbors()
-        #if curr_node == 'h':
-        #    #print('virtual_neighbors: ', virtual_neighbors)
-
-        nodewise_dest_distance = all_pair_path[dest]
-        nodewise_dest_distance = json.loads(json.dumps(nodewise_dest_distance))
+        virtual_neighbors = self.own.resource_manager.memory_manager.entangled_counts
 
-        ##print('Demand: --------------- ', demand)
-    
-        
         #Greedy Step:
-        #Pick the virtual neighbor that is closest to the destination
-    
-        least_dist = math.inf
-        best_hop = None
-        ##print('Current Node: ', curr_node)
-        for node in nodewise_dest_distance:
-            ##print((node,neighbor_dict[node]))
-            if (node in virtual_neighbors.keys()) or (node in neighbors):
-                ##print('Virtual neighbor found: ', node)
-                dist = nodewise_dest_distance[node]
-                if dist < least_dist:
-                    best_hop = node
-                    least_dist = dist
-
-        """if best_hop != None:
-            #print('virtual_neighbors[best_hop] --------------- ', virtual_neighbors[best_hop])"""
+        #Pick the (virtual or physical) neighbor that is closest to the destination
+        physical_hop = oracle.closest(dest, neighbors)
+        best_hop = oracle.closest(dest, (oracle.closest(dest, virtual_neighbors), physical_hop))
+
         #If such a virtual neighbor does not exist or cannot satisfy our demands then pick 
         #the best physical neighbor and generate entanglements through it
         #Or if we pick an already traversed neighbor
-        
-        ##print('Visited ----------------------', visited)
-        best_hop_virtual_link_size = 0
-        if best_hop in virtual_neighbors:
-            best_hop_virtual_link_size = virtual_neighbors[best_hop]
-
-        if best_hop == None or  best_hop_virtual_link_size < demand or ( best_hop in visited):
-            is_next_virtual = False
-            least_dist = math.inf
-            best_hop = None
-            
-            """#print('Dist Matrix for destination node(',dest,') :  ')
-            #print(nodewise_dest_distance)
-            #print('Neighbors of current node(',curr_node,'):  ', neighbors)"""
-            for node in nodewise_dest_distance:
-                ##print((node,neighbor_dict[node]))
-                if node in neighbors:
-                    dist = nodewise_dest_distance[node]
-                    if dist < least_dist:
-                        best_hop = node
-                        least_dist = dist
-
-
-        
-        ##print()
-        ##print('---------Next Hop Calculation using Modified Greedy------------')
-        ##print('Curr Node: ', curr_node,', picked neighbor: ', best_hop, ', distance b/w picked neighbor and destination ', least_dist)
-        
-        """#print('Virtual Neighbors of current node: ', self.own.find_virtual_neighbors())
-        #print('---------------------------------------------------------------')
-        #print()"""
-
+        if best_hop is None or virtual_neighbors.get(best_hop, 0) < demand or best_hop in visited:
+            best_hop = physical_hop
 
         return best_hop
     #--------------------------------------------------
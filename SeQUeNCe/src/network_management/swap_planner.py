@@ -0,0 +1,212 @@
+"""Definition of swap schedule planning.
+
+This module provides functions to build entanglement swapping schedules for a path of quantum routers.
+A schedule maps each swapping node to the pair of nodes it connects, in the format of `Timeline.swap_schedule` (`{node: [left, right]}`).
+Schedules are cached by path and policy, and can be scored analytically to discard slow ones before simulating them.
+"""
+
+from functools import lru_cache
+from math import exp, inf
+from typing import Dict, List, Sequence, Tuple, Union
+
+POLICIES = ("balanced", "sequential", "sequential_reverse")
+
+
+def plan_schedule(path: Sequence[str], policy: Union[str, Sequence[str]] = "balanced") -> Dict[str, List[str]]:
+    """Function to build the swap schedule of a path.
+
+    Policies:
+        balanced: nested swaps over segments of doubling length (e.g. `b`, `d`, then `c` on `a-b-c-d-e`).
+        sequential: swaps from the source outwards (`b`, `c`, then `d`).
+        sequential_reverse: swaps from the destination outwards (`d`, `c`, then `b`).
+        custom: a sequence of all intermediate nodes, each swapping with its closest neighbors that have not swapped yet.
+
+    Args:
+        path (Sequence[str]): names of nodes on the path, from source to destination.
+        policy (Union[str, Sequence[str]]): name of policy, or swap order of a custom schedule (default "balanced").
+
+    Returns:
+        Dict[str, List[str]]: swap schedule in format {swapping node: [left node, right node]}.
+    """
+
+    if not isinstance(policy, str):
+        policy = tuple(policy)
+    return {node: [left, right] for node, left, right in _plan(tuple(path), policy)}
+
+
+@lru_cache(maxsize=None)
+def _plan(path: Tuple[str, ...], policy: Union[str, Tuple[str, ...]]) -> Tuple[Tuple[str, str, str], ...]:
+    if policy == "balanced":
+        schedule = []
+        for node in path[1:-1]:
+            reduced = path
+            while reduced.index(node) % 2 == 0:
+                reduced = tuple(n for i, n in enumerate(reduced) if i % 2 == 0 or i == len(reduced) - 1)
+            index = reduced.index(node)
+            schedule.append((node, reduced[index - 1], reduced[index + 1]))
+        return tuple(schedule)
+
+    if policy == "sequential":
+        order = path[1:-1]
+    elif policy == "sequential_reverse":
+        order = path[-2:0:-1]
+    elif isinstance(policy, tuple):
+        order = policy
+        if sorted(order) != sorted(path[1:-1]):
+            raise ValueError("swap order {} is not a permutation of the intermediate nodes of {}".format(order, path))
+    else:
+        raise ValueError("unknown swap policy {}".format(policy))
+
+    # remove nodes from the path in swap order
+    remaining = list(path)
+    schedule = []
+    for node in order:
+        index = remaining.index(node)
+        schedule.append((node, remaining[index - 1], remaining[index + 1]))
+        del remaining[index]
+    return tuple(schedule)
+
+
+def enumerate_schedules(path: Sequence[str]) -> List[Dict[str, List[str]]]:
+    """Function to list all valid swap schedules of a path.
+
+    A schedule is a binary tree over the links of the path, so a path of `n` links has Catalan(`n` - 1) schedules.
+
+    Args:
+        path (Sequence[str]): names of nodes on the path, from source to destination.
+
+    Returns:
+        List[Dict[str, List[str]]]: swap schedules in format {swapping node: [left node, right node]}.
+    """
+
+    path = tuple(path)
+    return [{node: [path[left], path[right]] for node, left, right in schedule}
+            for schedule in _enumerate(path, 0, len(path) - 1)]
+
+
+@lru_cache(maxsize=None)
+def _enumerate(path: Tuple[str, ...], left: int, right: int) -> Tuple[Tuple[Tuple[str, int, int], ...], ...]:
+    if right - left < 2:
+        return ((),)
+    schedules = []
+    for middle in range(left + 1, right):
+        for left_schedule in _enumerate(path, left, middle):
+            for right_schedule in _enumerate(path, middle, right):
+                schedules.append(left_schedule + right_schedule + ((path[middle], left, right),))
+    return tuple(schedules)
+
+
+def _tree(schedule: Dict[str, List[str]], path: Sequence[str]) -> Dict[Tuple[int, int], int]:
+    # segment (left, right) of the path -> index of the node joining it, for all segments of the schedule
+    index = {node: i for i, node in enumerate(path)}
+    joins = {}
+    for node in path[1:-1]:
+        if node not in schedule:
+            raise ValueError("swap schedule does not include {}".format(node))
+        left, right = schedule[node]
+        joins[(index[left], index[right])] = index[node]
+
+    tree = {}
+    segments = [(0, len(path) - 1)]
+    while segments:
+        left, right = segments.pop()
+        if right - left < 2:
+            continue
+        middle = joins.get((left, right))
+        if middle is None or not left < middle < right:
+            raise ValueError("swap schedule {} cannot be completed on path {}".format(schedule, list(path)))
+        tree[(left, right)] = middle
+        segments += [(left, middle), (middle, right)]
+    if len(tree) != len(path) - 2:
+        raise ValueError("swap schedule {} cannot be completed on path {}".format(schedule, list(path)))
+    return tree
+
+
+def swap_order(schedule: Dict[str, List[str]], path: Sequence[str]) -> List[str]:
+    """Function to order the swaps of a schedule.
+
+    Swaps are sorted by their level in the swap tree (swaps of elementary links first), then by position on the path.
+
+    Args:
+        schedule (Dict[str, List[str]]): swap schedule in format {swapping node: [left node, right node]}.
+        path (Sequence[str]): names of nodes on the path, from source to destination.
+
+    Returns:
+        List[str]: names of swapping nodes.
+    """
+
+    tree = _tree(schedule, path)
+    levels = {}
+    for left, right in sorted(tree, key=lambda segment: segment[1] - segment[0]):
+        middle = tree[(left, right)]
+        levels[middle] = 1 + max(levels.get(tree.get((left, middle)), 0), levels.get(tree.get((middle, right)), 0))
+    return sorted(path[1:-1], key=lambda node: levels[path.index(node)])
+
+
+def expected_delivery_time(schedule: Dict[str, List[str]], path: Sequence[str], link_rates: Sequence[float],
+                           coherence_times: Dict[str, float] = None, swap_success: float = 1) -> float:
+    """Function to estimate the time for a schedule to entangle the ends of a path.
+
+    Each pair (elementary or swapped) is approximated as ready after an exponential time with the pair's expected time.
+    A pair waiting for the other input of its swap expires after its coherence time and is generated again.
+    A failed swap restarts both of its inputs.
+
+    Args:
+        schedule (Dict[str, List[str]]): swap schedule in format {swapping node: [left node, right node]}.
+        path (Sequence[str]): names of nodes on the path, from source to destination.
+        link_rates (Sequence[float]): entanglement generation rate (pairs per second) of each link on the path.
+        coherence_times (Dict[str, float]): memory coherence time (in s) of nodes (default None; missing or non-positive for no expiration).
+        swap_success (float): success probability of a swap (default 1).
+
+    Returns:
+        float: expected time (in s) until the ends of the path are entangled.
+    """
+
+    assert len(link_rates) == len(path) - 1
+    coherence_times = coherence_times or {}
+    tree = _tree(schedule, path)
+
+    def lifetime(node):
+        coherence_time = coherence_times.get(node, -1)
+        return coherence_time if coherence_time > 0 else inf
+
+    # (expected time, lifetime) of each segment, shortest segments first
+    pairs = {(i, i + 1): (1 / link_rates[i], min(lifetime(path[i]), lifetime(path[i + 1])))
+             for i in range(len(path) - 1)}
+    for left, right in sorted(tree, key=lambda segment: segment[1] - segment[0]):
+        middle = tree[(left, right)]
+        (time1, lifetime1), (time2, lifetime2) = pairs[(left, middle)], pairs[(middle, right)]
+        wait = _wait_for_both(1 / time1, 1 / time2, lifetime1, lifetime2)
+        pairs[(left, right)] = (wait / swap_success, min(lifetime1, lifetime2))
+    return pairs[(0, len(path) - 1)][0]
+
+
+def _wait_for_both(rate1: float, rate2: float, lifetime1: float, lifetime2: float) -> float:
+    # expected time until both pairs are held together; a pair ready first waits at most its lifetime
+    first1, first2 = rate1 / (rate1 + rate2), rate2 / (rate1 + rate2)
+    arrive2, arrive1 = 1 - exp(-rate2 * lifetime1), 1 - exp(-rate1 * lifetime2)
+    cycle = 1 / (rate1 + rate2) + first1 * arrive2 / rate2 + first2 * arrive1 / rate1
+    return cycle / (first1 * arrive2 + first2 * arrive1)
+
+
+def rank_schedules(path: Sequence[str], link_rates: Sequence[float], coherence_times: Dict[str, float] = None,
+                   swap_success: float = 1, schedules: List[Dict[str, List[str]]] = None
+                   ) -> List[Tuple[float, Dict[str, List[str]]]]:
+    """Function to sort swap schedules by expected delivery time.
+
+    Args:
+        path (Sequence[str]): names of nodes on the path, from source to destination.
+        link_rates (Sequence[float]): entanglement generation rate (pairs per second) of each link on the path.
+        coherence_times (Dict[str, float]): memory coherence time (in s) of nodes (default None for no expiration).
+        swap_success (float): success probability of a swap (default 1).
+        schedules (List[Dict[str, List[str]]]): candidate schedules (default None for all schedules of the path).
+
+    Returns:
+        List[Tuple[float, Dict[str, List[str]]]]: (expected time, schedule), fastest first.
+    """
+
+    if schedules is None:
+        schedules = enumerate_schedules(path)
+    scores = [expected_delivery_time(schedule, path, link_rates, coherence_times, swap_success) for schedule in schedules]
+    order = sorted(range(len(schedules)), key=lambda i: scores[i])
+    return [(scores[i], schedules[i]) for i in order]
@@ -1,11 +1,12 @@
 """Definition of abstract protocol type.
 
 This module defines the protocol type inherited by all protocol code implementations.
-Also defined is the stack protocol, which adds push and pop functionality.
+Also defined is the stack protocol, which adds push and pop functionality,
+and the protocol list used by nodes to register protocols and dispatch messages to them.
 """
 
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
+from typing import Iterable, Iterator, Tuple, Type, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .topology.node import Node
@@ -93,3 +94,68 @@ class StackProtocol(Protocol):
         pass
 
 
+class ProtocolList():
+    """Class for an ordered collection of protocols, indexed by name and type.
+
+    Supports the list operations used on node protocols (`append`, `remove`, `in`, iteration, `len`), with constant time registration, removal and membership.
+    A protocol is held at most once (appending it again does nothing), and its name must not change while it is held.
+    Lookups by name or type return protocols in the order they were appended, so message dispatch stays deterministic.
+    """
+
+    def __init__(self, protocols: Iterable["Protocol"] = ()):
+        """Constructor for the protocol list.
+
+        Args:
+            protocols (Iterable[Protocol]): initial protocols (default empty).
+        """
+
+        # dictionaries are used as ordered sets
+        self._protocols = {}  # protocol -> (name, type) it is indexed by
+        self._by_name = {}    # name -> {protocol: None}
+        self._by_type = {}    # type -> {protocol: None}
+        for protocol in protocols:
+            self.append(protocol)
+
+    def append(self, protocol: "Protocol") -> None:
+        if protocol in self._protocols:
+            return
+        key = (protocol.name, type(protocol))
+        self._protocols[protocol] = key
+        self._by_name.setdefault(key[0], {})[protocol] = None
+        self._by_type.setdefault(key[1], {})[protocol] = None
+
+    def remove(self, protocol: "Protocol") -> None:
+        if protocol not in self._protocols:
+            raise ValueError("{} not in protocol list".format(protocol))
+        name, protocol_type = self._protocols.pop(protocol)
+        for index, key in [(self._by_name, name), (self._by_type, protocol_type)]:
+            protocols = index[key]
+            del protocols[protocol]
+            if not protocols:
+                del index[key]
+
+    def named(self, name: str) -> Tuple["Protocol", ...]:
+        """Method to get the protocols with a given name."""
+
+        return tuple(self._by_name.get(name, ()))
+
+    def of_type(self, protocol_type: Type["Protocol"]) -> Tuple["Protocol", ...]:
+        """Method to get the protocols of a given type (subclasses excluded)."""
+
+        return tuple(self._by_type.get(protocol_type, ()))
+
+    def __contains__(self, protocol: "Protocol") -> bool:
+        return protocol in self._protocols
+
+    def __iter__(self) -> Iterator["Protocol"]:
+        # iterate over a copy, so protocols may be removed during iteration
+        return iter(list(self._protocols))
+
+    def __len__(self) -> int:
+        return len(self._protocols)
+
+    def __getitem__(self, index):
+        return list(self._protocols)[index]
+
+    def __repr__(self) -> str:
+        return "ProtocolList({})".format(list(self._protocols))
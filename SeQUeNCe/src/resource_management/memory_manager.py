@@ -8,9 +8,11 @@ There are three states of quantum memory represented by the string: "RAW", "OCCU
 * "ENTANGLED" denotes a free memory that is entangling with other memories. 
 
 This is done through instances of the MemoryInfo class, which track a single memory.
+The memory manager also indexes memory info objects by state and remote node, so that rules can look up memories without a scan.
 """
 
-from typing import TYPE_CHECKING
+from bisect import bisect_left, insort
+from typing import TYPE_CHECKING, Collection, Optional
 if TYPE_CHECKING:
     from .resource_manager import ResourceManager
     from ..components.memory import Memory, MemoryArray
@@ -25,6 +27,8 @@ class MemoryManager():
         memory_array (MemoryArray): memory array object to be tracked.
         memory_map (List[MemoryInfo]): array of memory info objects corresponding to memory array.
         resource_manager (ResourceManager): resource manager object using the memory manager.
+        buckets (Dict[Tuple[str, str], List[Tuple[float, int]]]): (fidelity, index) of memories for each (state, remote_node), sorted by fidelity.
+        entangled_counts (Dict[str, int]): number of entangled memories for each remote node (nodes without any are absent).
     """
 
     def __init__(self, memory_array: "MemoryArray"):
@@ -38,6 +42,12 @@ class MemoryManager():
         self.memory_array.attach(self)
         self.memory_map = [MemoryInfo(memory, index) for index, memory in enumerate(self.memory_array)]
         self.resource_manager = None
+        self._memory_indices = {memory: index for index, memory in enumerate(self.memory_array)}
+        self.buckets = {}
+        self.entangled_counts = {}
+        for info in self.memory_map:
+            info.manager = self
+            self.update_index(info)
 
     def set_resource_manager(self, resource_manager: "ResourceManager") -> None:
         """Method to set the resource manager."""
@@ -74,9 +84,55 @@ class MemoryManager():
     def get_info_by_memory(self, memory: "Memory") -> "MemoryInfo":
         """Gets memory info object for a desired memory."""
 
-        index = self.memory_array.memories.index(memory)
+        index = self._memory_indices[memory]
         return self.memory_map[index]
 
+    def update_index(self, info: "MemoryInfo") -> None:
+        """Method to move a memory info object to the bucket of its current state, remote node and fidelity.
+
+        Called by the memory info object whenever these change.
+
+        Args:
+            info (MemoryInfo): memory info object to index.
+        """
+
+        if info.index_key is not None:
+            state, remote_node, fidelity = info.index_key
+            bucket = self.buckets[(state, remote_node)]
+            del bucket[bisect_left(bucket, (fidelity, info.index))]
+            if state == "ENTANGLED":
+                self.entangled_counts[remote_node] -= 1
+                if self.entangled_counts[remote_node] == 0:
+                    del self.entangled_counts[remote_node]
+        if info.state == "ENTANGLED":
+            self.entangled_counts[info.remote_node] = self.entangled_counts.get(info.remote_node, 0) + 1
+        info.index_key = (info.state, info.remote_node, info.fidelity)
+        insort(self.buckets.setdefault((info.state, info.remote_node), []), (info.fidelity, info.index))
+
+    def find(self, state: str, remote_node: Optional[str], indices: Collection[int],
+             min_fidelity: float = 0) -> Optional["MemoryInfo"]:
+        """Method to find a memory by state, remote node and fidelity bound.
+
+        Equivalent to returning the first memory info object `info` (in index order) with
+        `info.state == state`, `info.remote_node == remote_node`, `info.index in indices` and `info.fidelity >= min_fidelity`.
+
+        Args:
+            state (str): state of memory.
+            remote_node (str): name of node holding entangled memory (None for unentangled memories).
+            indices (Collection[int]): allowed memory indices (preferably a set).
+            min_fidelity (float): lower bound of fidelity (default 0).
+
+        Returns:
+            MemoryInfo: memory info object found (None if no memory matches).
+        """
+
+        bucket = self.buckets.get((state, remote_node))
+        if not bucket:
+            return None
+        start = bisect_left(bucket, (min_fidelity, -1))
+        found = min((index for _, index in bucket[start:] if index in indices), default=None)
+        return None if found is None else self.memory_map[found]
+
 
 class MemoryInfo():
     """Class to track memory information parameters for memory manager.
@@ -98,6 +154,8 @@ class MemoryInfo():
         fidelity (int): fidelity of entanglement for memory.
         expire_event (Event): expiration event for the memory.
         entangle_time (int): time at which most recent entanglement is achieved.
+        manager (MemoryManager): memory manager indexing this object (None if not managed).
+        index_key (Tuple[str, str, float]): state, remote node and fidelity under which the manager indexed this object.
     """
 
     def __init__(self, memory: "Memory", index: int, state="RAW"):
@@ -117,6 +175,8 @@ class MemoryInfo():
         self.fidelity = 0
         self.expire_event = None
         self.entangle_time = -1
+        self.manager = None
+        self.index_key = None
 
     def to_raw(self) -> None:
         """Method to set memory to raw (unentangled) state."""
@@ -127,6 +187,8 @@ class MemoryInfo():
         self.remote_memo = None
         self.fidelity = 0
         self.entangle_time = -1
+        if self.manager is not None:
+            self.manager.update_index(self)
 
     def to_occupied(self) -> None:
         """Method to set memory to occupied state."""
@@ -140,6 +202,8 @@ class MemoryInfo():
             #print(f'Reached the to_occupied for d and entanglement to created for memory index: {self.index}')"""
         self.state = "OCCUPIED"
         self.entangle_time = self.memory.timeline.now() #Remove after testing
+        if self.manager is not None:
+            self.manager.update_index(self)
 
     def to_entangled(self) -> None:
         """Method to set memory to entangled state."""
@@ -156,3 +220,5 @@ class MemoryInfo():
         #print(f'Time of entanglement creation: ', self.memory.timeline.now())
         #print('Number of events run before this Entanglement: ', self.memory.timeline.run_counter)
         self.entangle_time = self.memory.timeline.now()
+        if self.manager is not None:
+            self.manager.update_index(self)
@@ -14,6 +14,7 @@ if TYPE_CHECKING:
 
 from ..entanglement_management.entanglement_protocol import EntanglementProtocol
 from ..message import Message
+from ..protocol import ProtocolList
 from .rule_manager import RuleManager
 from .memory_manager import MemoryManager
 
@@ -71,8 +72,8 @@ class ResourceManager():
         owner (QuantumRouter): node that resource manager is attached to.
         memory_manager (MemoryManager): internal memory manager object.
         rule_manager (RuleManager): internal rule manager object.
-        pending_protocols (List[Protocol]): list of protocols awaiting a response for a remote resource request.
-        waiting_protocols (List[Protocol]): list of protocols awaiting a request from a remote protocol.
+        pending_protocols (ProtocolList): protocols awaiting a response for a remote resource request.
+        waiting_protocols (ProtocolList): protocols awaiting a request from a remote protocol.
     """
 
     def __init__(self, owner: "QuantumRouter"):
@@ -89,9 +90,9 @@ class ResourceManager():
         self.rule_manager = RuleManager()
         self.rule_manager.set_resource_manager(self)
         # protocols that are requesting remote resource
-        self.pending_protocols = []
+        self.pending_protocols = ProtocolList()
         # protocols that are waiting request from remote resource
-        self.waiting_protocols = []
+        self.waiting_protocols = ProtocolList()
         self.memory_to_protocol_map = {}
 
     def load(self, rule: "Rule") -> bool:
@@ -251,7 +252,7 @@ class ResourceManager():
 
         # check if any rules have been met
         memo_info = self.memory_manager.get_info_by_memory(memory)
-        for rule in self.rule_manager:
+        for rule in self.rule_manager.match(memo_info):
             memories_info = rule.is_valid(memo_info)
             if len(memories_info) > 0:
                 rule.do(memories_info)
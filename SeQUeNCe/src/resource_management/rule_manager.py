@@ -2,9 +2,11 @@
 
 This module defines the rule manager, which is used by the resource manager to instantiate and control entanglement protocols.
 This is achieved through rules (also defined in this module), which if met define a set of actions to take.
+Rule conditions may be given declaratively as RuleCondition objects (also defined in this module).
+These can be inspected and pickled, and the rule manager indexes them by memory state.
 """
 import re
-from typing import Callable, TYPE_CHECKING, List, Tuple
+from typing import Callable, TYPE_CHECKING, Iterable, List, Optional, Tuple
 if TYPE_CHECKING:
     from ..entanglement_management.entanglement_protocol import EntanglementProtocol
     from .memory_manager import MemoryInfo, MemoryManager
@@ -28,6 +30,7 @@ class RuleManager():
 
         self.rules = []
         self.resource_manager = None
+        self._rules_by_state = {}
 
     def set_resource_manager(self, resource_manager: "ResourceManager"):
         """Method to set overseeing resource manager.
@@ -61,6 +64,7 @@ class RuleManager():
             else:
                 right = mid - 1
         self.rules.insert(left, rule)
+        self._rules_by_state = {}
         return True
 
     def expire(self, rule: "Rule") -> List["EntanglementProtocol"]:
@@ -74,8 +78,34 @@ class RuleManager():
         """
 
         self.rules.remove(rule)
+        self._rules_by_state = {}
         return rule.protocols
 
+    def clear(self) -> None:
+        """Method to remove all rules (without expiring their protocols)."""
+
+        self.rules = []
+        self._rules_by_state = {}
+
+    def match(self, memory_info: "MemoryInfo") -> List["Rule"]:
+        """Method to get the rules whose condition may be met by a memory.
+
+        Rules with a RuleCondition are only returned for memories in the state of the condition; other rules are always returned.
+
+        Args:
+            memory_info (MemoryInfo): memory info object to test.
+
+        Returns:
+            List[Rule]: candidate rules, in the order of `rules`.
+        """
+
+        rules = self._rules_by_state.get(memory_info.state)
+        if rules is None:
+            rules = [rule for rule in self.rules
+                     if not isinstance(rule.condition, RuleCondition) or rule.condition.state == memory_info.state]
+            self._rules_by_state[memory_info.state] = rules
+        return rules
+
     def get_memory_manager(self):
         return self.resource_manager.get_memory_manager()
 
@@ -217,3 +247,64 @@ class Rule():
 
     def get_reservation(self) -> "Reservation":
         return self.reservation
+
+
+class RuleCondition():
+    """Declarative condition of a rule on the state of a memory.
+
+    A memory meets the condition if its state is `state`, its index is in `indices`, its fidelity is at least `min_fidelity`,
+    and its remote node is allowed by `remote_nodes` and `excluded_remote_nodes`.
+    If `partners` is set, the memory must be entangled with one of the two partner nodes,
+    and another memory meeting the condition must be entangled with the other; both are returned (as for entanglement swapping).
+
+    Attributes:
+        state (str): required memory state.
+        indices (FrozenSet[int]): allowed memory indices.
+        remote_nodes (Tuple[str]): allowed remote nodes (None for any).
+        excluded_remote_nodes (Tuple[str]): excluded remote nodes.
+        min_fidelity (float): lower bound of fidelity.
+        partners (Tuple[str, str]): remote nodes of the two memories to return together (None for a single memory).
+    """
+
+    def __init__(self, state: str, indices: Iterable[int], remote_nodes: Optional[Iterable[str]] = None,
+                 excluded_remote_nodes: Iterable[str] = (), min_fidelity: float = 0,
+                 partners: Optional[Tuple[str, str]] = None):
+        """Constructor for rule condition class."""
+
+        self.state = state
+        self.indices = frozenset(indices)
+        self.remote_nodes = None if remote_nodes is None else tuple(remote_nodes)
+        self.excluded_remote_nodes = tuple(excluded_remote_nodes)
+        self.min_fidelity = min_fidelity
+        self.partners = None if partners is None else tuple(partners)
+        if self.partners is not None:
+            self.remote_nodes = self.partners
+
+    def __call__(self, memory_info: "MemoryInfo", manager: "MemoryManager") -> List["MemoryInfo"]:
+        """Method to test a memory (same signature as a rule condition function).
+
+        Args:
+            memory_info (MemoryInfo): memory info object to test.
+            manager (MemoryManager): memory manager of the memory (used to look up partners).
+
+        Returns:
+            List[MemoryInfo]: list of memory info objects meeting the condition (empty if not met).
+        """
+
+        if (memory_info.state != self.state
+                or memory_info.index not in self.indices
+                or memory_info.fidelity < self.min_fidelity
+                or (self.remote_nodes is not None and memory_info.remote_node not in self.remote_nodes)
+                or memory_info.remote_node in self.excluded_remote_nodes):
+            return []
+        if self.partners is None:
+            return [memory_info]
+
+        left, right = self.partners
+        partner = left if memory_info.remote_node == right else right
+        info = manager.find(self.state, partner, self.indices, self.min_fidelity)
+        return [] if info is None else [memory_info, info]
+
+    def __repr__(self):
+        return "RuleCondition(state=%r, indices=%s, remote_nodes=%r, excluded_remote_nodes=%r, min_fidelity=%r, partners=%r)" % (
+            self.state, sorted(self.indices), self.remote_nodes, self.excluded_remote_nodes, self.min_fidelity, self.partners)
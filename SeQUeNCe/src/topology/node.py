@@ -7,7 +7,7 @@ Node types can be used to collect all the necessary hardware and software for a
 
 from math import inf
 from time import monotonic_ns
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Dict, List
 
 if TYPE_CHECKING:
     from ..kernel.timeline import Timeline
@@ -20,6 +20,7 @@ if TYPE_CHECKING:
     from ..app.random_request import RandomRequestApp
 
 from ..kernel.entity import Entity
+from ..protocol import ProtocolList
 from ..components.memory import MemoryArray
 from ..components.bsm import SingleAtomBSM
 from ..components.light_source import LightSource
@@ -41,7 +42,7 @@ class Node(Entity):
         timeline (Timeline): timeline for simulation.
         cchannels (Dict[str, ClassicalChannel]): mapping of destination node names to classical channel instances.
         qchannels (Dict[str, ClassicalChannel]): mapping of destination node names to quantum channel instances.
-        protocols (List[Protocol]): list of attached protocols.
+        protocols (ProtocolList): attached protocols, indexed by name and type for message dispatch.
     """
 
     def __init__(self, name: str, timeline: "Timeline"):
@@ -55,7 +56,7 @@ class Node(Entity):
         self.owner = self
         self.cchannels = {}  # mapping of destination node names to classical channels
         self.qchannels = {}  # mapping of destination node names to quantum channels
-        self.protocols = []
+        self.protocols = ProtocolList()
 
     def init(self) -> None:
         pass
@@ -109,12 +110,11 @@ class Node(Entity):
 
         # signal to protocol that we've received a message
         if msg.receiver is not None:
-            for protocol in self.protocols:
-                if protocol.name == msg.receiver and protocol.received_message(src, msg):
+            for protocol in self.protocols.named(msg.receiver):
+                if protocol.received_message(src, msg):
                     return
         else:
-            matching = [p for p in self.protocols if type(p) == msg.protocol_type]
-            for p in matching:
+            for p in self.protocols.of_type(msg.protocol_type):
                 p.received_message(src, msg)
 
     def schedule_qubit(self, dst: str, min_time: int) -> int:
@@ -122,6 +122,11 @@ class Node(Entity):
 
         return self.qchannels[dst].schedule_transmit(min_time)
 
+    def schedule_qubits(self, dst: str, min_times: List[int]) -> List[int]:
+        """Interface for quantum channel `schedule_transmits` method."""
+
+        return self.qchannels[dst].schedule_transmits(min_times)
+
     def send_qubit(self, dst: str, qubit) -> None:
         """Interface for quantum channel `transmit` method."""
         #print(f'sent qubit from node: {self.name} to node: {dst}')
@@ -162,10 +167,9 @@ class BSMNode(Node):
 
     def receive_message(self, src: str, msg: "Message") -> None:
         # signal to protocol that we've received a message
-        for protocol in self.protocols:
-            if type(protocol) == msg.owner_type:
-                if protocol.received_message(src, msg):
-                    return
+        for protocol in self.protocols.of_type(msg.owner_type):
+            if protocol.received_message(src, msg):
+                return
 
         # if we reach here, we didn't successfully receive the message in any protocol
         ##print(src, msg)
@@ -226,29 +230,20 @@ class QuantumRouter(Node):
         self.app = None
         #-------------------------------------
         self.all_pair_shortest_dist = None
+        self.routing_oracle = None
         self.neighbors = None
         self.random_seed = None
         #-------------------------------------
 
     #--------------------------------------------------------------------------
-    def find_virtual_neighbors(self):
-        virtual_neighbors = {}
-
-        #Check the memory of this node for existing entanglements
-        for info in self.resource_manager.memory_manager:
-            
-            if info.state != 'ENTANGLED':
-                continue
-            else:
-                ##print((node, info.remote_node))
-                #This is a virtual neighbor
-                #nx_graph.add_edge(node, str(info.remote_node), color='r')
-                if str(info.remote_node) in virtual_neighbors.keys():
-                    virtual_neighbors[str(info.remote_node)] = virtual_neighbors[str(info.remote_node)] + 1
-                else:
-                    virtual_neighbors[str(info.remote_node)] = 1
-
-        return virtual_neighbors
+    def find_virtual_neighbors(self) -> Dict[str, int]:
+        """Method to get the nodes sharing entanglement with this node.
+
+        Returns:
+            Dict[str, int]: number of entangled memories for each remote node (kept up to date by the memory manager).
+        """
+
+        return dict(self.resource_manager.memory_manager.entangled_counts)
     #--------------------------------------------------------------------------
 
     def receive_message(self, src: str, msg: "Message") -> None:
@@ -258,14 +253,12 @@ class QuantumRouter(Node):
             self.network_manager.received_message(src, msg)
         else:
             if msg.receiver is None:
-                matching = [p for p in self.protocols if type(p) == msg.protocol_type]
-                for p in matching:
+                for p in self.protocols.of_type(msg.protocol_type):
                     p.received_message(src, msg)
             else:
-                for protocol in self.protocols:
-                    if protocol.name == msg.receiver:
-                        protocol.received_message(src, msg)
-                        break
+                for protocol in self.protocols.named(msg.receiver):
+                    protocol.received_message(src, msg)
+                    break
 
     def init(self):
         """Method to initialize quantum router node.
@@ -534,10 +527,9 @@ class QKDNode(Node):
 
     def receive_message(self, src: str, msg: "Message") -> None:
         # signal to protocol that we've received a message
-        for protocol in self.protocols:
-            if type(protocol) == msg.owner_type:
-                protocol.received_message(src, msg)
-                return
+        for protocol in self.protocols.of_type(msg.owner_type):
+            protocol.received_message(src, msg)
+            return
 
         # if we reach here, we didn't successfully receive the message in any protocol
         ##print(self.protocols)
@@ -0,0 +1,190 @@
+"""Definition of the ShortestPaths class.
+
+This module provides the shortest path engine used by the `Topology` class.
+One Dijkstra search per source gives both the all-pair distances and the forwarding tables of a network.
+Changing a link repeats only the searches of the sources it may affect.
+"""
+
+from heapq import heappush, heappop
+from math import inf
+from typing import Dict, List, Set
+
+import numpy as np
+
+
+class ShortestPaths():
+    """Class to compute shortest paths between all pairs of nodes.
+
+    Links are undirected.
+    Ties between paths of equal length go to the node added first, as in the former list-based Dijkstra of `Topology`.
+    The next hop towards a destination is the first node on the path (walking back from the destination) that is a neighbor of the source.
+
+    Attributes:
+        names (List[str]): node names, indexed by node id.
+        ids (Dict[str, int]): mapping of node names to node ids.
+        adjacency (List[Dict[int, float]]): length of the links of each node, indexed by node id.
+        distance (np.ndarray): `distance[i, j]` is the shortest distance from node `i` to node `j`.
+        previous (np.ndarray): `previous[i, j]` is the node before `j` on the shortest path from `i` (-1 if none).
+        next_hop (np.ndarray): `next_hop[i, j]` is the node `i` forwards to for reaching `j` (-1 if none).
+    """
+
+    def __init__(self, graph: Dict[str, Dict[str, float]]):
+        """Constructor for the shortest path engine.
+
+        Args:
+            graph (Dict[str, Dict[str, float]]): link lengths in format {node1: {node2: length}}.
+        """
+
+        self.names = []
+        self.ids = {}
+        self.adjacency = []
+        for node in graph:
+            self._add_node(node)
+        for node, links in graph.items():
+            for neighbor, length in links.items():
+                self._add_node(neighbor)
+                self.adjacency[self.ids[node]][self.ids[neighbor]] = length
+                self.adjacency[self.ids[neighbor]][self.ids[node]] = length
+        self._search_all()
+
+    def _add_node(self, name: str) -> bool:
+        if name in self.ids:
+            return False
+        self.ids[name] = len(self.names)
+        self.names.append(name)
+        self.adjacency.append({})
+        return True
+
+    def _search_all(self) -> None:
+        size = len(self.names)
+        self.distance = np.full((size, size), inf)
+        self.previous = np.full((size, size), -1)
+        self.next_hop = np.full((size, size), -1)
+        for source in range(size):
+            self._search(source)
+
+    def _search(self, source: int) -> None:
+        # Dijkstra's, ties popped in node order
+        size = len(self.names)
+        distance = [inf] * size
+        previous = [-1] * size
+        done = [False] * size
+        order = []
+        distance[source] = 0
+        heap = [(0, source)]
+        while heap:
+            cost, current = heappop(heap)
+            if done[current]:
+                continue
+            done[current] = True
+            order.append(current)
+            for neighbor, length in self.adjacency[current].items():
+                new_cost = cost + length
+                if new_cost < distance[neighbor]:
+                    distance[neighbor] = new_cost
+                    previous[neighbor] = current
+                    heappush(heap, (new_cost, neighbor))
+
+        # previous nodes are settled first, so their hops are already known
+        next_hop = [-1] * size
+        links = self.adjacency[source]
+        for node in order[1:]:
+            prev = previous[node]
+            if prev == source:
+                next_hop[node] = node
+            elif prev in links:
+                next_hop[node] = prev
+            else:
+                next_hop[node] = next_hop[prev]
+
+        self.distance[source] = distance
+        self.previous[source] = previous
+        self.next_hop[source] = next_hop
+
+    def set_link(self, node1: str, node2: str, length: float) -> Set[str]:
+        """Method to add a link or change its length.
+
+        Args:
+            node1 (str): first node of the link.
+            node2 (str): second node of the link.
+            length (float): length of the link.
+
+        Returns:
+            Set[str]: names of the sources whose paths were recomputed.
+        """
+
+        added = [self._add_node(node1), self._add_node(node2)]
+        u, v = self.ids[node1], self.ids[node2]
+        old_length = self.adjacency[u].get(v)
+        self.adjacency[u][v] = length
+        self.adjacency[v][u] = length
+        if any(added):
+            self._search_all()
+            return set(self.names)
+        if old_length == length:
+            return set()
+        if old_length is None or length < old_length:
+            # sources for which the link gives a path at least as short as the current one
+            through_u = self.distance[:, u] + length
+            through_v = self.distance[:, v] + length
+            affected = (np.isfinite(through_u) & (through_u <= self.distance[:, v])) | \
+                       (np.isfinite(through_v) & (through_v <= self.distance[:, u]))
+        else:
+            affected = self._uses_link(u, v)
+        return self._update(np.flatnonzero(affected), u, v)
+
+    def remove_link(self, node1: str, node2: str) -> Set[str]:
+        """Method to remove a link.
+
+        Args:
+            node1 (str): first node of the link.
+            node2 (str): second node of the link.
+
+        Returns:
+            Set[str]: names of the sources whose paths were recomputed.
+        """
+
+        u, v = self.ids[node1], self.ids[node2]
+        if v not in self.adjacency[u]:
+            return set()
+        del self.adjacency[u][v]
+        del self.adjacency[v][u]
+        return self._update(np.flatnonzero(self._uses_link(u, v)), u, v)
+
+    def _uses_link(self, u: int, v: int) -> np.ndarray:
+        # links outside of a shortest path tree do not change its searches
+        return (self.previous[:, v] == u) | (self.previous[:, u] == v)
+
+    def _update(self, sources: np.ndarray, u: int, v: int) -> Set[str]:
+        # the next hops of the link's own ends also depend on their links
+        sources = set(sources.tolist()) | {u, v}
+        for source in sources:
+            self._search(source)
+        return {self.names[source] for source in sources}
+
+    def neighbors(self, node: str) -> List[str]:
+        """Method to get the nodes linked to a node."""
+
+        return [self.names[neighbor] for neighbor in self.adjacency[self.ids[node]]]
+
+    def distances(self) -> Dict[str, Dict[str, float]]:
+        """Method to get all-pair shortest distances.
+
+        Returns:
+            Dict[str, Dict[str, float]]: distances in format {node1: {node2: distance}}.
+        """
+
+        return {name: dict(zip(self.names, row)) for name, row in zip(self.names, self.distance.tolist())}
+
+    def forwarding_table(self, node: str) -> Dict[str, str]:
+        """Method to get the forwarding table of a node.
+
+        Args:
+            node (str): name of node.
+
+        Returns:
+            Dict[str, str]: forwarding table in format {name of destination node: name of next node}.
+        """
+
+        return {self.names[dst]: self.names[next_node]
+                for dst, next_node in enumerate(self.next_hop[self.ids[node]].tolist()) if next_node >= 0}
@@ -2,6 +2,7 @@
 
 This module provides a definition of the Topology class, which can be used to manage a network's structure.
 Topology instances automatically perform many useful network functions.
+networkx and matplotlib are only imported when a graph is built for plotting.
 """
 
 from typing import TYPE_CHECKING
@@ -13,11 +14,8 @@ if TYPE_CHECKING:
 
 from .node import *
 from ..components.optical_channel import QuantumChannel, ClassicalChannel
-
-#----------------------------
-import networkx as nx
-import matplotlib.pyplot as plt
-#----------------------------
+from ..network_management.routing import RoutingOracle
+from .shortest_paths import ShortestPaths
 
 class Topology():
     """Class for managing network topologies.
@@ -32,6 +30,7 @@ class Topology():
         qchannels (List[QuantumChannel]): list of quantum channel objects in network.
         cchannels (List[ClassicalChannel]): list of classical channel objects in network.
         graph: (Dict[str, Dict[str, float]]): internal representation of quantum graph.
+        shortest_paths (ShortestPaths): shortest paths between nodes (built by `load_config`, then kept up to date).
     """
 
     def __init__(self, name: str, timeline: "Timeline"):
@@ -51,6 +50,7 @@ class Topology():
         self.graph = {}           # internal quantum graph representation {node_name : {adjacent_name : distance}}
         self.graph_no_middle = {} # internal quantum graph without bsm nodes {node_name : {adjacent_name : distance}}
         self._cc_graph = {}       # internal classical graph representation {node_name : {adjacent_name : delay}}
+        self.shortest_paths = None
 
     def load_config(self, config_file: str) -> None:
         """Method to load a network configuration file.
@@ -127,18 +127,25 @@ class Topology():
                 node2 = qchannel_params.pop("node2")
                 self.add_quantum_channel(node1, node2, **qchannel_params)
 
-        # generate forwarding tables
-        #-------------------------------
-        all_pair_dist, G = self.all_pair_shortest_dist()
-        #-------------------------------
+        # generate distance and forwarding tables
+        self.shortest_paths = ShortestPaths(self.graph_no_middle)
+        self._install_routing(set(self.shortest_paths.names))
+
+    def _install_routing(self, sources) -> None:
+        # distance tables and neighbors are shared by all routers, forwarding tables are replaced for the given sources
+        all_pair_dist = self.shortest_paths.distances()
+        routing_oracle = RoutingOracle(all_pair_dist)
         for node in self.get_nodes_by_type("QuantumRouter"):
-            #-----------------------------------------------
+            if node.name not in self.shortest_paths.ids:
+                continue
             node.all_pair_shortest_dist = all_pair_dist
-            node.neighbors = list(G.neighbors(node.name))
-            #-----------------------------------------------
-            table = self.generate_forwarding_table(node.name)
-            for dst, next_node in table.items():
-                node.network_manager.protocol_stack[0].add_forwarding_rule(dst, next_node)
+            node.routing_oracle = routing_oracle
+            node.neighbors = self.shortest_paths.neighbors(node.name)
+            if node.name in sources:
+                routing = node.network_manager.protocol_stack[0]
+                routing.forwarding_table.clear()
+                for dst, next_node in self.shortest_paths.forwarding_table(node.name).items():
+                    routing.add_forwarding_rule(dst, next_node)
 
     def add_node(self, node: "Node") -> None:
         """Method to add a node to the network.
@@ -170,6 +177,8 @@ class Topology():
             # update non-middle graph
             self.graph_no_middle[node1][node2] = kwargs["distance"]
             self.graph_no_middle[node2][node1] = kwargs["distance"]
+            if self.shortest_paths is not None:
+                self._install_routing(self.shortest_paths.set_link(node1, node2, kwargs["distance"]))
 
             # add middle node
             name_middle = "_".join(["middle", node1, node2])
@@ -215,6 +224,23 @@ class Topology():
         self.graph[node1][node2] = kwargs["distance"]
         if type(self.nodes[node1]) != BSMNode and type(self.nodes[node2]) != BSMNode:
             self.graph_no_middle[node1][node2] = kwargs["distance"]
+            if self.shortest_paths is not None:
+                self._install_routing(self.shortest_paths.set_link(node1, node2, kwargs["distance"]))
+
+    def remove_link(self, node1: str, node2: str) -> None:
+        """Method to take the quantum link between two nodes out of routing (e.g. for a broken fiber).
+
+        Channel objects are kept; distance and forwarding tables are updated if they have been generated.
+
+        Args:
+            node1 (str): first node of the link.
+            node2 (str): second node of the link.
+        """
+
+        for src, dst in [(node1, node2), (node2, node1)]:
+            self.graph_no_middle[src].pop(dst, None)
+        if self.shortest_paths is not None:
+            self._install_routing(self.shortest_paths.remove_link(node1, node2))
 
     def add_classical_connection(self, node1: str, node2: str, **kwargs) -> None:
         """Method to add a two-way classical channel between nodes.
@@ -261,39 +287,8 @@ class Topology():
             node (str): name of node for which to generate table.
         """
 
-        # set up priority queue and track previous nodes
-        nodes = list(self.nodes.keys())
-        costs = {node: float("inf") for node in nodes}
-        previous = {node: None for node in nodes}
-        costs[starting_node] = 0
-
-        # Dijkstra's
-        while len(nodes) > 0:
-            current = min(nodes, key=lambda node: costs[node])
-            if type(self.nodes[current]) == BSMNode:
-                nodes.remove(current)
-                continue
-            if costs[current] == float("inf"):
-                break
-            for neighbor in self.graph_no_middle[current]:
-                distance = self.graph_no_middle[current][neighbor]
-                new_cost = costs[current] + distance
-                if new_cost < costs[neighbor]:
-                    costs[neighbor] = new_cost
-                    previous[neighbor] = current
-            nodes.remove(current)
-
-        # find forwarding neighbor for each destination
-        next_node = {k: v for k, v in previous.items() if v} # remove nodes whose previous is None (starting, not connected)
-        for node, prev in next_node.items():
-            if prev is starting_node:
-                next_node[node] = node
-            else:
-                while prev not in self.graph_no_middle[starting_node]:
-                    prev = next_node[prev]
-                    next_node[node] = prev
-
-        return next_node
+        shortest_paths = self.shortest_paths or ShortestPaths(self.graph_no_middle)
+        return shortest_paths.forwarding_table(starting_node)
 
     def populate_protocols(self):
         # TODO: add higher-level protocols not added by nodes
@@ -301,6 +296,8 @@ class Topology():
 
     #-----------------------------------------------
     def generate_nx_graph(self):
+        import networkx as nx
+
         G = nx.Graph()
         for node in self.nodes.keys():
 
@@ -317,8 +314,8 @@ class Topology():
         return G
 
     def all_pair_shortest_dist(self):
-        G = self.generate_nx_graph()
-        return nx.floyd_warshall(G), G
+        shortest_paths = self.shortest_paths or ShortestPaths(self.graph_no_middle)
+        return shortest_paths.distances()
 
     def get_virtual_graph(self):
         #Plotting virtual graph
@@ -344,6 +341,9 @@ class Topology():
         return nx_graph
 
     def plot_graph(self, nx_graph):
+        import matplotlib.pyplot as plt
+        import networkx as nx
+
         colors = nx.get_edge_attributes(nx_graph,'color').values()
         ##print("Colors",colors)
         weights = nx.get_edge_attributes(nx_graph,'weight').values()
@@ -1,4 +1,4 @@
-__all__ = ['encoding', 'quantum_state', 'log']
+__all__ = ['encoding', 'quantum_state', 'log', 'trace', 'vectorized_chain']
 
 def __dir__():
     return sorted(__all__)
@@ -0,0 +1,45 @@
+"""Execution tracing.
+
+This module defines the behavior for the SeQUeNCe execution trace.
+The trace is a human-readable record of kernel and protocol activity (popped events, event list size, protocol results).
+Tracing is disabled by default; traced code paths check the `enabled` flag before doing any string formatting or I/O.
+When enabled, trace lines are written with `print` semantics to the selected stream (standard output by default).
+
+Attributes:
+    enabled (bool): whether trace output is currently produced.
+    _stream (TextIO): stream to write trace lines to (None to use the current `sys.stdout`).
+"""
+
+enabled = False
+_stream = None
+
+
+def set_trace(stream=None):
+    """Function to enable trace output.
+
+    Args:
+        stream (TextIO): stream to write trace lines to (default None, which uses the current standard output).
+    """
+
+    global enabled, _stream
+    _stream = stream
+    enabled = True
+
+
+def remove_trace():
+    """Function to disable trace output."""
+
+    global enabled, _stream
+    enabled = False
+    _stream = None
+
+
+def trace(*args):
+    """Function to write one trace line.
+
+    Arguments are formatted as by `print`.
+    Callers on hot paths should check `enabled` first so that arguments are not built when tracing is off.
+    """
+
+    if enabled:
+        print(*args, file=_stream)
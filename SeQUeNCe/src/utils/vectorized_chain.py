@@ -0,0 +1,354 @@
+"""Vectorized Monte Carlo sampling of abstract-link swap chains.
+
+This module defines the VectorizedChain class, which simulates many independent replications of entanglement distribution over a linear chain of quantum routers at once.
+It models the abstract-link experiment of the event-driven stack:
+link generation succeeds with `Timeline.gen_success_probability`, swapping succeeds with the reservation protocol's `es_succ_prob`,
+memories expire after their coherence time and swaps follow `Timeline.swap_schedule` (or the plan of `Timeline.swap_policy` if it is not set).
+Instead of exchanging messages, each replication is a row of NumPy arrays, and all rows advance from event to event together.
+The ChainSamples class holds the observables of the sampled replications.
+"""
+
+from collections import deque
+from typing import Dict, List, TYPE_CHECKING
+
+import numpy as np
+
+from ..network_management.swap_planner import plan_schedule
+
+if TYPE_CHECKING:
+    from ..kernel.timeline import Timeline
+    from ..topology.node import QuantumRouter
+
+
+class VectorizedChain:
+    """Class to sample entanglement distribution over a linear chain with vectorized Monte Carlo.
+
+    The timing of each elementary link follows `EntanglementGenerationA` and the resource manager:
+    an attempt started by the primary node (the node with the larger name) ends `attempt_time` later
+    (negotiation round trip, two emissions and the BSM result) and succeeds with probability `gen_success_probability`.
+    The single-atom BSM still detects the emitted photons, and two photons in the same round on different detectors fail the attempt
+    when the measurement result arrives: after the first round (one emission period early) or after the second round.
+    Memories are measured on emission and flipped between rounds, so each round has two photons with probability 1/4,
+    and each case has probability `double_click_probability`.
+    After a failure, the next attempt starts `restart_delay` later (the time for the resource managers to pair the new protocols).
+    An entangled pair expires `coherence_time` after the first emission of its successful attempt; its links then restart.
+    The first attempts start `restart_delay` after the reservation start time.
+
+    A swap at node `m` (with `Timeline.swap_schedule[m] == [left, right]`) starts once `m` holds pairs with `left` and `right`,
+    after a classical round trip to the farther of the two.
+    It succeeds with the node's swapping success probability; the new pair has fidelity `f1 * f2 * degradation`,
+    expires with the first of the two pairs and is available at `left` and `right` after the result messages arrive.
+    Pairs below the reservation target fidelity are not swapped.
+
+    A replication stops when the source and destination are entangled, when a swap fails, or at the time limit.
+    The stack's simultaneous-message races are not modeled, so the engine agrees with the event-driven simulation in distribution, not trajectory by trajectory.
+
+    Attributes:
+        path (List[str]): names of routers on the chain, from source to destination.
+        gen_success_probability (float): success probability of one generation attempt.
+        attempt_time (np.ndarray): duration (in ps) of a generation attempt, per link.
+        restart_delay (np.ndarray): delay (in ps) before the next attempt of a link, per link.
+        emit_offset (np.ndarray): time (in ps) from the first emission to the end of an attempt, per link.
+        emit_period (np.ndarray): time (in ps) between the two emissions of an attempt, per link.
+        double_click_probability (np.ndarray): probability of a double click in a given round of an attempt, per link.
+        coherence_time (np.ndarray): lifetime (in ps) of an elementary pair, per link (`inf` for no expiration).
+        raw_fidelity (np.ndarray): fidelity of an elementary pair, per link.
+        pairs (List[Tuple[str, str]]): node pairs that can be entangled (links first, then swap results).
+        swaps (List[Tuple[str, int, int, int]]): swapping node, left child pair, right child pair and result pair.
+        swap_delay (np.ndarray): time (in ps) between both pairs being ready and the swap, per swap.
+        settle_delay (np.ndarray): time (in ps) between a swap and its result being known at both ends, per swap.
+        swap_success_probability (np.ndarray): swapping success probability, per swap.
+        swap_degradation (np.ndarray): swapping fidelity degradation, per swap.
+        start_time (int): reservation start time (in ps).
+        target_fidelity (float): minimum fidelity of pairs that are swapped.
+    """
+
+    def __init__(self, timeline: "Timeline", start_time: int, target_fidelity: float = 0, src: str = None, dst: str = None):
+        """Constructor for the vectorized chain.
+
+        Reads all parameters from a configured (not yet run) network.
+
+        Args:
+            timeline (Timeline): timeline with the network topology, `gen_success_probability` and `swap_schedule` (or `swap_policy`) set.
+            start_time (int): start time (in ps) of the entanglement reservation.
+            target_fidelity (float): target fidelity of the reservation (default 0).
+            src (str): source router (default None to use `timeline.src`).
+            dst (str): destination router (default None to use `timeline.dst`).
+        """
+
+        nodes = timeline.topology.nodes
+        src = timeline.src if src is None else src
+        dst = timeline.dst if dst is None else dst
+        self.path = self._find_path(nodes, src, dst)
+        self.gen_success_probability = timeline.gen_success_probability
+        self.start_time = start_time
+        self.target_fidelity = target_fidelity
+
+        attempt_time, restart_delay, emit_offset, emit_period, double_click = [], [], [], [], []
+        coherence_time, raw_fidelity = [], []
+        self.pairs = []
+        for left, right in zip(self.path, self.path[1:]):
+            node1, node2 = nodes[left], nodes[right]
+            delay = node1.cchannels[right].delay
+            middle = node1.map_to_middle_node[right]
+            qc_delay = max(node1.qchannels[middle].delay, node2.qchannels[middle].delay)
+            bsm_delay = max(node1.cchannels[middle].delay, node2.cchannels[middle].delay)
+            memory1, memory2 = node1.memory_array[0], node2.memory_array[0]
+            period = int(1e12 / min(memory1.frequency, memory2.frequency))
+            offset = period + qc_delay + bsm_delay + 10
+            # the request goes from left to right, so a right primary starts as soon as it receives it
+            restart_delay.append(delay if right > left else 2 * delay)
+            attempt_time.append(2 * delay + offset)
+            emit_offset.append(offset)
+            emit_period.append(period)
+            # both photons survive and reach different detectors
+            detectors = nodes[middle].bsm.detectors
+            survival = [m.efficiency * (1 - node.qchannels[middle].loss) for m, node in ((memory1, node1), (memory2, node2))]
+            double_click.append(survival[0] * survival[1] * detectors[0].efficiency * detectors[1].efficiency / 8)
+            lifetimes = [m.coherence_time for m in (memory1, memory2) if m.coherence_time > 0]
+            coherence_time.append(int(min(lifetimes) * 1e12) if lifetimes else np.inf)
+            raw_fidelity.append(memory1.raw_fidelity)
+            self.pairs.append((left, right))
+
+        self.attempt_time = np.array(attempt_time, dtype=float)
+        self.restart_delay = np.array(restart_delay, dtype=float)
+        self.emit_offset = np.array(emit_offset, dtype=float)
+        self.emit_period = np.array(emit_period, dtype=float)
+        self.double_click_probability = np.array(double_click, dtype=float)
+        self.coherence_time = np.array(coherence_time, dtype=float)
+        self.raw_fidelity = np.array(raw_fidelity, dtype=float)
+
+        self.swaps = []
+        swap_delay, settle_delay, success_probability, degradation = [], [], [], []
+        schedule = timeline.swap_schedule or plan_schedule(self.path, timeline.swap_policy)
+        pending = [name for name in self.path[1:-1] if name in schedule]
+        while pending:
+            for name in pending:
+                left, right = schedule[name]
+                left_index = self._pair_index(left, name)
+                right_index = self._pair_index(name, right)
+                if left_index is None or right_index is None:
+                    continue
+                self.pairs.append((left, right))
+                self.swaps.append((name, left_index, right_index, len(self.pairs) - 1))
+                node = nodes[name]
+                delay = max(node.cchannels[left].delay, node.cchannels[right].delay)
+                swap_delay.append(2 * delay)
+                settle_delay.append(delay)
+                reservation_protocol = node.network_manager.protocol_stack[1]
+                success_probability.append(reservation_protocol.es_succ_prob)
+                degradation.append(reservation_protocol.es_degradation)
+                pending.remove(name)
+                break
+            else:
+                raise ValueError("swap schedule {} cannot be completed on path {}".format(pending, self.path))
+
+        self.swap_delay = np.array(swap_delay, dtype=float)
+        self.settle_delay = np.array(settle_delay, dtype=float)
+        self.swap_success_probability = np.array(success_probability, dtype=float)
+        self.swap_degradation = np.array(degradation, dtype=float)
+
+        self._target = self._pair_index(src, dst)
+        if self._target is None:
+            raise ValueError("swap schedule does not entangle {} and {}".format(src, dst))
+        # elementary links below each pair, which restart when the pair expires
+        self._links = [[i] for i in range(len(self.path) - 1)]
+        for _, left_index, right_index, _ in self.swaps:
+            self._links.append(self._links[left_index] + self._links[right_index])
+
+    @staticmethod
+    def _find_path(nodes: Dict[str, "QuantumRouter"], src: str, dst: str) -> List[str]:
+        previous = {src: None}
+        queue = deque([src])
+        while queue:
+            name = queue.popleft()
+            if name == dst:
+                break
+            for neighbor in nodes[name].neighbors:
+                if neighbor not in previous:
+                    previous[neighbor] = name
+                    queue.append(neighbor)
+        if dst not in previous:
+            raise ValueError("no path between {} and {}".format(src, dst))
+        path = [dst]
+        while path[-1] != src:
+            path.append(previous[path[-1]])
+        return path[::-1]
+
+    def _pair_index(self, node1: str, node2: str):
+        for i, pair in enumerate(self.pairs):
+            if pair == (node1, node2) or pair == (node2, node1):
+                return i
+        return None
+
+    def run(self, num_replications: int, time_limit: float, seed: int = None) -> "ChainSamples":
+        """Method to sample independent replications.
+
+        Args:
+            num_replications (int): number of replications.
+            time_limit (float): simulation time (in s) at which replications stop.
+            seed (int): seed of the random number generator (default None).
+
+        Returns:
+            ChainSamples: observables of all replications when they stopped.
+        """
+
+        rng = np.random.default_rng(seed)
+        n, num_links, num_pairs = num_replications, len(self.path) - 1, len(self.pairs)
+        horizon = time_limit * 1e12
+        inf = np.inf
+
+        link_start = np.zeros((n, num_links))
+        link_end = np.full((n, num_links), inf)
+        link_success = np.zeros((n, num_links), dtype=bool)
+        attempts = np.zeros((n, num_links), dtype=int)
+        held = np.zeros((n, num_pairs), dtype=bool)
+        expiry = np.full((n, num_pairs), inf)
+        ready = np.zeros((n, num_pairs))
+        fidelity = np.zeros((n, num_pairs))
+        entanglement_time = np.full((n, num_pairs), -1.0)
+        swap_time = np.full((n, len(self.swaps)), inf)
+        swap_failed = np.zeros(n, dtype=bool)
+        stop_time = np.full(n, horizon)
+        active = np.ones(n, dtype=bool)
+        double_click = 2 * self.double_click_probability
+        success_limit = double_click + self.gen_success_probability * (1 - double_click)
+
+        def start_attempts(mask, time):
+            # outcome of the attempt: double click after the first round, after the second round, or the success draw
+            draw = rng.random(mask.shape)
+            early = draw < self.double_click_probability
+            late = ~early & (draw < double_click)
+            start = time + self.restart_delay
+            end = start + self.attempt_time - np.where(early, self.emit_period + 10, 0) - np.where(late, 10, 0)
+            link_start[mask] = start[mask]
+            link_end[mask] = end[mask]
+            link_success[mask] = ((draw >= double_click) & (draw < success_limit))[mask]
+            attempts[mask] += 1
+
+        def stop(mask, time):
+            stop_time[mask] = time[mask]
+            active[mask] = False
+
+        start_attempts(np.ones((n, num_links), dtype=bool), np.full((n, 1), float(self.start_time)))
+
+        while active.any():
+            now = np.minimum(link_end.min(axis=1), np.where(held, expiry, inf).min(axis=1))
+            if self.swaps:
+                now = np.minimum(now, swap_time.min(axis=1))
+            active &= now <= horizon
+            column = now[:, None]
+
+            # ends of generation attempts
+            ended = active[:, None] & (link_end == column)
+            success = ended & link_success
+            link_end[success] = inf
+            held[:, :num_links] |= success
+            expiry[:, :num_links] = np.where(success, column - self.emit_offset + self.coherence_time, expiry[:, :num_links])
+            ready[:, :num_links] = np.where(success, column, ready[:, :num_links])
+            fidelity[:, :num_links] = np.where(success, self.raw_fidelity, fidelity[:, :num_links])
+            entanglement_time[:, :num_links] = np.where(success, column, entanglement_time[:, :num_links])
+            start_attempts(ended & ~link_success, column)
+
+            # expiration of held pairs (cancels the swaps waiting for them)
+            expired = active[:, None] & held & (expiry == column)
+            held &= ~expired
+            for j, (_, left_index, right_index, _) in enumerate(self.swaps):
+                swap_time[expired[:, left_index] | expired[:, right_index], j] = inf
+            for p in np.flatnonzero(expired.any(axis=0)):
+                links = np.zeros((n, num_links), dtype=bool)
+                links[:, self._links[p]] = expired[:, p, None]
+                start_attempts(links, column)
+
+            # swaps
+            for j, (_, left_index, right_index, result) in enumerate(self.swaps):
+                swapped = active & (swap_time[:, j] == now)
+                if not swapped.any():
+                    continue
+                swap_time[swapped, j] = inf
+                held[swapped, left_index] = held[swapped, right_index] = False
+                succeeded = swapped & (rng.random(n) < self.swap_success_probability[j])
+                failed = swapped & ~succeeded
+                held[succeeded, result] = True
+                expiry[succeeded, result] = np.maximum(np.minimum(expiry[:, left_index], expiry[:, right_index]),
+                                                       now + self.settle_delay[j])[succeeded]
+                ready[succeeded, result] = now[succeeded] + self.settle_delay[j]
+                fidelity[succeeded, result] = (fidelity[:, left_index] * fidelity[:, right_index]
+                                               * self.swap_degradation[j])[succeeded]
+                entanglement_time[succeeded, result] = now[succeeded]
+                swap_failed |= failed
+                stop(failed, now)
+
+            stop(active & held[:, self._target], now)
+
+            # schedule swaps whose pairs are both held
+            usable = held & (fidelity >= self.target_fidelity)
+            for j, (_, left_index, right_index, _) in enumerate(self.swaps):
+                waiting = active & usable[:, left_index] & usable[:, right_index] & (swap_time[:, j] == inf)
+                swap_time[waiting, j] = (np.maximum(ready[:, left_index], ready[:, right_index])
+                                         + self.swap_delay[j])[waiting]
+
+        # attempts scheduled after a replication stopped were never started
+        attempts -= (link_end < inf) & (link_start > stop_time[:, None])
+        return ChainSamples(self.pairs, entanglement_time, fidelity, held, attempts, swap_failed, stop_time)
+
+
+class ChainSamples:
+    """Class of observables sampled by VectorizedChain.
+
+    The accessors mirror the observables of the event-driven simulation and return one value per replication.
+
+    Attributes:
+        pairs (List[Tuple[str, str]]): node pairs of the chain (columns of the pair arrays).
+        entanglement_times (np.ndarray): time (in ps) each pair was last entangled (-1 if never), shape (replications, pairs).
+        fidelities (np.ndarray): fidelity of each pair when last entangled (0 if never).
+        held (np.ndarray): whether each pair was entangled when the replication stopped.
+        attempts (np.ndarray): number of generation attempts started per link, shape (replications, links).
+        swap_failures (np.ndarray): whether a swap failed.
+        stop_times (np.ndarray): time (in ps) at which each replication stopped.
+    """
+
+    def __init__(self, pairs, entanglement_times, fidelities, held, attempts, swap_failures, stop_times):
+        self.pairs = pairs
+        self.entanglement_times = entanglement_times
+        self.fidelities = fidelities
+        self.held = held
+        self.attempts = attempts
+        self.swap_failures = swap_failures
+        self.stop_times = stop_times
+
+    def __len__(self):
+        return len(self.stop_times)
+
+    def _column(self, node1: str, node2: str) -> int:
+        for i, pair in enumerate(self.pairs):
+            if pair == (node1, node2) or pair == (node2, node1):
+                return i
+        raise ValueError("{} and {} are not a pair of the chain".format(node1, node2))
+
+    def entangled(self, node1: str, node2: str) -> np.ndarray:
+        """Returns whether the nodes were ever entangled."""
+        return self.entanglement_times[:, self._column(node1, node2)] >= 0
+
+    def entanglement_time(self, node1: str, node2: str) -> np.ndarray:
+        """Returns the last time (in ps) the nodes were entangled, or -1."""
+        return self.entanglement_times[:, self._column(node1, node2)]
+
+    def fidelity(self, node1: str, node2: str) -> np.ndarray:
+        """Returns the fidelity of the last entanglement between the nodes, or 0."""
+        return self.fidelities[:, self._column(node1, node2)]
+
+    def retrial_count(self, node1: str, node2: str) -> np.ndarray:
+        """Returns the number of generation attempts between neighboring nodes (started by the primary node)."""
+        column = self._column(node1, node2)
+        if column >= self.attempts.shape[1]:
+            return np.zeros(len(self), dtype=int)
+        return self.attempts[:, column]
+
+    def swap_failed(self) -> np.ndarray:
+        """Returns whether a swap failed."""
+        return self.swap_failures
+
+    def get_time(self) -> np.ndarray:
+        """Returns the stopping time (in s) of each replication."""
+        return self.stop_times * 1e-12
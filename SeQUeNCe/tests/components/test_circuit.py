@@ -126,3 +126,19 @@ def test_Circuit():
                     [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, ],
                     [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, ]])
     assert array_equal(expect, qc.get_unitary_matrix())
+
+
+def test_gate_sequence():
+    # gates on non-adjacent qubits match the explicit kronecker products (qubit 0 is most significant)
+    from numpy import allclose, kron, sqrt
+    h = array([[1, 1], [1, -1]]) / sqrt(2)
+    x = array([[0, 1], [1, 0]])
+    i2 = identity(2)
+
+    qc = Circuit(3)
+    qc.h(2)
+    qc.x(0)
+    qc.swap(0, 2)
+    swap = identity(8)[[0, 4, 2, 6, 1, 5, 3, 7]]
+    expect = swap @ kron(x, kron(i2, h))
+    assert allclose(qc.get_unitary_matrix(), expect)
@@ -180,11 +180,11 @@ def test_Memory__schedule_expiration():
 
     mem._schedule_expiration()
 
-    counter = 0
-    for event in tl.events:
-        if event.is_invalid():
-            counter += 1
-    assert counter == 1
+    # the replaced expiration event is cancelled and taken out of the event list
+    assert event.is_invalid()
+    assert len(tl.events) == 1
+    for e in tl.events:
+        assert not e.is_invalid()
     
 def test_MemoryWithRandomCoherenceTime__schedule_expiration():
     NUM_TRIALS = 200
@@ -1,5 +1,5 @@
 from numpy import random
-from sequence.components.optical_channel import *
+from sequence.components.optical_channel import ClassicalChannel, QuantumChannel
 from sequence.kernel.timeline import Timeline
 from sequence.topology.node import Node
 
@@ -126,3 +126,18 @@ def test_QuantumChannel_schedule_transmit():
     tl.time = 2
     time = qc.schedule_transmit(0)
     assert time == 3
+
+
+def test_QuantumChannel_schedule_transmits():
+    tl = Timeline()
+    qc = QuantumChannel("qc", tl, attenuation=0, distance=1e3, frequency=1e12)
+
+    # same as scheduling one by one
+    assert qc.schedule_transmits([0, 0, 5, 1]) == [0, 1, 5, 2]
+    assert qc.schedule_transmit(0) == 3
+    assert qc.schedule_transmits([1, 5]) == [4, 6]
+
+    # past bins are pruned
+    tl.time = 5
+    assert qc.schedule_transmit(0) == 7
+    assert sorted(qc.send_bins) == [5, 6, 7]
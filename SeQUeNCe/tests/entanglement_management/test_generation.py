@@ -1,3 +1,5 @@
+from math import ceil, inf
+
 import numpy as np
 from qutip import Qobj
 from qutip.metrics import fidelity
@@ -305,3 +307,142 @@ def test_generation_fidelity_ket():
     ratio = correct / total
     assert abs(ratio - FIDELITY) < 0.1
 
+
+def test_generation_abstract():
+    random.seed(0)
+    NUM_TESTS = 1000
+
+    tl = Timeline()
+    tl.abstract_generation = True
+    tl.gen_exec_count = [[0, 0], [0, 0]]
+
+    a = FakeNode("a", tl)
+    m0 = FakeNode("m0", tl)
+    b = FakeNode("b", tl)
+
+    # add connections
+    qc0 = QuantumChannel("qc_am0", tl, 0, 1e3)
+    qc1 = QuantumChannel("qc_bm0", tl, 0, 1e3)
+    qc0.set_ends(a, m0)
+    qc1.set_ends(b, m0)
+    cc0 = ClassicalChannel("cc_am0", tl, 1e3, delay=1e9)
+    cc1 = ClassicalChannel("cc_m0a", tl, 1e3, delay=1e9)
+    cc2 = ClassicalChannel("cc_bm0", tl, 1e3, delay=1e9)
+    cc3 = ClassicalChannel("cc_m0b", tl, 1e3, delay=1e9)
+    cc4 = ClassicalChannel("cc_ab", tl, 2e3, delay=2e9)
+    cc5 = ClassicalChannel("cc_ba", tl, 2e3, delay=2e9)
+    cc0.set_ends(a, m0)
+    cc1.set_ends(m0, a)
+    cc2.set_ends(b, m0)
+    cc3.set_ends(m0, b)
+    cc4.set_ends(a, b)
+    cc5.set_ends(b, a)
+
+    # add hardware
+    a.memory_array = MemoryArray("a.memory_array", tl, fidelity=1, num_memories=NUM_TESTS)
+    a.memory_array.owner = a
+    b.memory_array = MemoryArray("b.memory_array", tl, fidelity=1, num_memories=NUM_TESTS)
+    b.memory_array.owner = b
+    detectors = [{"efficiency": 1, "count_rate": 1e11}] * 2
+    m0.bsm = make_bsm("m0.bsm", tl, encoding_type="single_atom", detectors=detectors)
+
+    tl.init()
+
+    for i in range(NUM_TESTS):
+        protocol0 = EntanglementGenerationA(a, "eg_a[{}]".format(i), middle="m0", other="b", memory=a.memory_array[i])
+        protocol1 = EntanglementGenerationA(b, "eg_b[{}]".format(i), middle="m0", other="a", memory=b.memory_array[i])
+        a.protocols.append(protocol0)
+        b.protocols.append(protocol1)
+        protocol0.set_others(protocol1)
+        protocol1.set_others(protocol0)
+        for protocol in (protocol0, protocol1):
+            tl.schedule(Event(i * 1e12, Process(protocol, "start", [])))
+
+    tl.run()
+
+    # no messages or photons: two starts and two ends per attempt
+    assert tl.run_counter == 4 * NUM_TESTS
+    assert a.msg_log == b.msg_log == m0.msg_log == []
+    assert tl.gen_exec_count == [[0, NUM_TESTS], [NUM_TESTS, 0]]
+
+    desired = np.array([complex(np.sqrt(1/2)), complex(0), complex(0), complex(np.sqrt(1/2))])
+    entangled = 0
+    for (memory0, state0), (memory1, state1) in zip(a.resource_manager.log, b.resource_manager.log):
+        assert state0 == state1
+        if state0 == "ENTANGLED":
+            entangled += 1
+            assert memory0.entangled_memory == {"node_id": "b", "memo_id": memory1.name}
+            assert memory1.entangled_memory == {"node_id": "a", "memo_id": memory0.name}
+            assert np.array_equal(tl.quantum_manager.get(memory0.qstate_key).state, desired)
+
+    # double clicks fail 1/4 of the attempts, half of the others succeed
+    assert abs(entangled / NUM_TESTS - 0.375) < 0.05
+
+
+def test_generation_skip_retries():
+    random.seed(2)
+    NUM_TESTS = 200
+    STOP_TIME = 1e12
+
+    for stop_time, success_probability in ((inf, 0.1), (STOP_TIME, 1e-9)):
+        tl = Timeline(stop_time)
+        tl.abstract_generation = True
+        tl.skip_generation_retries = True
+        tl.gen_success_probability = success_probability
+        tl.gen_exec_count = [[0, 0], [0, 0]]
+
+        a = FakeNode("a", tl)
+        m0 = FakeNode("m0", tl)
+        b = FakeNode("b", tl)
+
+        # add connections
+        qc0 = QuantumChannel("qc_am0", tl, 0, 1e3)
+        qc1 = QuantumChannel("qc_bm0", tl, 0, 1e3)
+        qc0.set_ends(a, m0)
+        qc1.set_ends(b, m0)
+        cc0 = ClassicalChannel("cc_am0", tl, 1e3, delay=1e9)
+        cc1 = ClassicalChannel("cc_bm0", tl, 1e3, delay=1e9)
+        cc2 = ClassicalChannel("cc_ab", tl, 2e3, delay=2e9)
+        cc3 = ClassicalChannel("cc_ba", tl, 2e3, delay=2e9)
+        cc0.set_ends(a, m0)
+        cc1.set_ends(b, m0)
+        cc2.set_ends(a, b)
+        cc3.set_ends(b, a)
+
+        # add hardware (no double clicks)
+        a.memory_array = MemoryArray("a.memory_array", tl, num_memories=NUM_TESTS)
+        a.memory_array.owner = a
+        b.memory_array = MemoryArray("b.memory_array", tl, num_memories=NUM_TESTS)
+        b.memory_array.owner = b
+        detectors = [{"efficiency": 0, "count_rate": 1e11}] * 2
+        m0.bsm = make_bsm("m0.bsm", tl, encoding_type="single_atom", detectors=detectors)
+
+        tl.init()
+
+        num_tests = NUM_TESTS if stop_time == inf else 1
+        for i in range(num_tests):
+            protocol0 = EntanglementGenerationA(a, "eg_a[{}]".format(i), middle="m0", other="b", memory=a.memory_array[i])
+            protocol1 = EntanglementGenerationA(b, "eg_b[{}]".format(i), middle="m0", other="a", memory=b.memory_array[i])
+            a.protocols.append(protocol0)
+            b.protocols.append(protocol1)
+            protocol0.set_others(protocol1)
+            protocol1.set_others(protocol0)
+            for protocol in (protocol0, protocol1):
+                tl.schedule(Event(i * 1e12, Process(protocol, "start", [])))
+
+        tl.run()
+
+        attempts = tl.gen_exec_count[0][1]
+        assert tl.gen_exec_count[1][0] == attempts
+        if stop_time == inf:
+            # two starts and two ends per success, plus one count per skipped attempt and node
+            assert tl.run_counter == 2 * num_tests + 2 * attempts
+            assert [state for _, state in a.resource_manager.log] == ["ENTANGLED"] * num_tests
+            assert [state for _, state in b.resource_manager.log] == ["ENTANGLED"] * num_tests
+            assert abs(attempts / num_tests - 1 / success_probability) < 2
+        else:
+            # "b" (primary) started after "a" answered: it sends a new request after each failure
+            attempt_time = 2e9 + 2e9 + int(1e12 / a.memory_array[0].frequency) + qc0.delay + 1e9 + 10
+            retry_period = attempt_time + 2e9 + 2e9
+            assert attempts == ceil(STOP_TIME / retry_period)
+            assert a.resource_manager.log == b.resource_manager.log == []
@@ -133,3 +133,61 @@ def test_update_event_time():
             event = e.pop()
             assert event.time >= pre_time
             pre_time = event.time
+
+
+def test_remove_shrinks_heap():
+    from numpy import random
+    random.seed(0)
+    el = EventList()
+    events = [Event(t, None) for t in random.randint(0, 100, 50)]
+    for e in events:
+        el.push(e)
+    for e in events[::2]:
+        el.remove(e)
+
+    assert len(el) == 25
+    remaining = sorted(e.time for e in events[1::2])
+    while not el.isempty():
+        event = el.pop()
+        assert not event.is_invalid()
+        assert event.time == remaining.pop(0)
+
+    # removing an event that is no longer pending only invalidates it
+    el.remove(events[1])
+    assert events[1].is_invalid() and len(el) == 0
+
+
+def test_heapq_order():
+    from heapq import heappush, heappop
+    from numpy import random
+    random.seed(1)
+    el = EventList()
+    reference = []
+    for t, p in zip(random.randint(0, 10, 500), random.randint(0, 5, 500)):
+        e = Event(t, None, p)
+        el.push(e)
+        heappush(reference, e)
+        if random.random() < 0.3:
+            assert el.pop() is heappop(reference)
+    while reference:
+        assert el.pop() is heappop(reference)
+
+
+def test_update_event_time_index():
+    from numpy import random
+    random.seed(2)
+    el = EventList()
+    events = [Event(t, None, p) for t, p in zip(random.randint(0, 1000, 300), random.randint(0, 10, 300))]
+    for e in events:
+        el.push(e)
+    for _ in range(300):
+        e = events[random.randint(len(events))]
+        el.update_event_time(e, random.randint(0, 1000))
+        assert all(el.data[i]._heap_index == i for i in range(len(el)))
+
+    expected = sorted((e.time, e.priority) for e in events)
+    popped = []
+    while not el.isempty():
+        e = el.pop()
+        popped.append((e.time, e.priority))
+    assert popped == expected
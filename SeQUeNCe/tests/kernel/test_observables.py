@@ -0,0 +1,80 @@
+import json
+from math import inf
+
+from sequence.kernel.timeline import Timeline
+from sequence.topology.topology import Topology
+
+
+def build_topology(tmp_path, names):
+    config = {"nodes": [{"name": name, "type": "QuantumRouter", "memo_size": 2} for name in names],
+              "qconnections": [{"node1": names[i], "node2": names[i + 1], "attenuation": 0.0002, "distance": 10}
+                               for i in range(len(names) - 1)]}
+    config_file = tmp_path / "topology.json"
+    config_file.write_text(json.dumps(config))
+    tl = Timeline()
+    topology = Topology("topology", tl)
+    topology.load_config(str(config_file))
+    tl.set_topology(topology)
+    return tl, topology
+
+
+def test_pairs(tmp_path):
+    tl, _ = build_topology(tmp_path, ["alice", "r1", "bob"])
+    observables = tl.observables
+    assert observables.ids == {"alice": 0, "r1": 1, "bob": 2}
+    assert not observables.entangled("alice", "bob")
+    assert observables.entanglement_time("alice", "bob") == -1
+    assert observables.fidelity("alice", "bob") == 0
+
+    for _ in range(3):
+        observables.count_attempt("alice", "r1")
+    observables.count_attempt("r1", "alice")
+    assert observables.retries("alice", "r1") == 3
+    assert observables.retries("r1", "alice") == 1
+    assert observables.retries("alice", "bob") == 0
+    assert tl.gen_exec_count[0][1] == 3
+
+    tl.time = 5
+    observables.record_entanglement("alice", "bob", 0.8)
+    assert observables.entangled("alice", "bob") and observables.entangled("bob", "alice")
+    assert observables.entanglement_time("alice", "bob") == 5
+    assert observables.entanglement_time("bob", "alice") == -1
+    assert tl.entanglement_time == {"alice-bob": 5}
+    observables.record_fidelity("bob", "alice", 0.9)
+    assert observables.fidelity("alice", "bob") == 0.9
+
+    # nodes outside of the topology are indexed when reported
+    observables.count_attempt("carol", "alice")
+    assert observables.retries("carol", "alice") == 1
+    assert len(tl.gen_exec_count) == 4 and all(len(row) == 4 for row in tl.gen_exec_count)
+
+
+def test_memory_lifetime(tmp_path):
+    tl, topology = build_topology(tmp_path, ["alice", "bob"])
+    observables = tl.observables
+    assert observables.min_coherence_time == inf
+    assert observables.all_memories_live(1e6)
+
+    for node in topology.get_nodes_by_type("QuantumRouter"):
+        node.memory_array.update_memory_params("coherence_time", 0.5)
+    assert observables.min_coherence_time == 0.5
+    assert observables.all_memories_live(0.5)
+    assert not observables.all_memories_live(0.6)
+
+    bob = topology.nodes["bob"].memory_array
+    bob.update_memory_params("coherence_time", 0.1)
+    assert observables.min_coherence_time == 0.1
+    bob.update_memory_params("coherence_time", -1)
+    assert observables.min_coherence_time == 0.5
+
+
+def test_without_topology():
+    tl = Timeline()
+    assert tl.gen_exec_count is None
+    observables = tl.observables
+    observables.count_attempt("e0", "e1")
+    observables.count_attempt("e0", "e1")
+    observables.count_attempt("e1", "e0")
+    assert observables.ids == {"e0": 0, "e1": 1}
+    assert tl.gen_exec_count == [[0, 2], [1, 0]]
+    assert observables.retries("e0", "e1") == 2
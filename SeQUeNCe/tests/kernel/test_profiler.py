@@ -0,0 +1,98 @@
+from sequence.kernel.entity import Entity
+from sequence.kernel.event import Event
+from sequence.kernel.process import Process
+from sequence.kernel.profiler import Profiler, _bucket, _bucket_bounds
+from sequence.kernel.timeline import Timeline
+
+
+class Dummy(Entity):
+    def __init__(self, name, tl):
+        Entity.__init__(self, name, tl)
+        self.counter = 0
+
+    def init(self):
+        pass
+
+    def op(self):
+        self.counter += 1
+
+    def other_op(self):
+        pass
+
+
+def test_bucket():
+    for nanoseconds in list(range(100)) + [1000, 12345, 10 ** 9 + 7]:
+        lower, upper = _bucket_bounds(_bucket(nanoseconds))
+        assert lower <= nanoseconds < upper
+        assert upper - lower <= max(1, lower / 4)
+
+
+def test_profiling():
+    tl = Timeline()
+    dummy = Dummy("dummy", tl)
+    assert tl.profiler is None
+
+    profiler = tl.enable_profiling()
+    events = [Event(t, Process(dummy, "op", [])) for t in range(10)]
+    for event in events:
+        tl.schedule(event)
+    other = Event(20, Process(dummy, "other_op", []))
+    tl.schedule(other)
+    tl.remove_event(events[3])
+    tl.remove_event(events[3])
+    events[5].set_invalid()
+    tl.run()
+
+    assert dummy.counter == 8
+    stats = profiler.stats[("Dummy", "op")]
+    assert (stats.scheduled, stats.executed, stats.invalidated) == (10, 8, 2)
+    assert sum(stats.histogram.values()) == 8
+    assert profiler.stats[("Dummy", "other_op")].executed == 1
+
+    rows = profiler.rows()
+    assert [row["activation"] for row in rows] == sorted(["op", "other_op"],
+                                                         key=lambda a: -profiler.stats[("Dummy", a)].total_time)
+    owner_rows = profiler.rows(by="owner")
+    assert len(owner_rows) == 1
+    assert owner_rows[0]["executed"] == 9 and owner_rows[0]["activation"] == "*"
+    assert 0 < owner_rows[0]["p50_us"] <= owner_rows[0]["p99_us"]
+    assert len(profiler.table().splitlines()) == 3
+
+    # disabled profiling records nothing
+    tl.disable_profiling()
+    tl.schedule(Event(30, Process(dummy, "op", [])))
+    assert tl.profiler is None
+    assert profiler.stats[("Dummy", "op")].scheduled == 10
+
+
+def test_run_step():
+    tl = Timeline()
+    dummy = Dummy("dummy", tl)
+    profiler = Profiler()
+    assert tl.enable_profiling(profiler) is profiler
+    for t in range(5):
+        tl.schedule(Event(t, Process(dummy, "op", [])))
+    tl.run_until(max_steps=3)
+    assert profiler.stats[("Dummy", "op")].executed == 3
+    profiler.reset()
+    tl.run_step()
+    assert profiler.stats[("Dummy", "op")].executed == 1
+
+
+def test_stop_time():
+    tl = Timeline(stop_time=5)
+    dummy = Dummy("dummy", tl)
+    profiler = tl.enable_profiling()
+    for t in range(8):
+        tl.schedule(Event(t, Process(dummy, "op", [])))
+
+    # the first event at the stop time is put back in the queue, it is not scheduled again
+    tl.run()
+    stats = profiler.stats[("Dummy", "op")]
+    assert (stats.scheduled, stats.executed, stats.invalidated) == (8, 5, 0)
+    assert tl.schedule_counter == 8 and len(tl.events) == 3
+
+    # run_step drops events at the stop time and counts them as invalidated
+    tl.run_step()
+    assert dummy.counter == 5 and len(tl.events) == 0
+    assert (stats.scheduled, stats.executed, stats.invalidated) == (8, 5, 3)
@@ -196,6 +196,60 @@ def test_qmanager_circuit_density():
     assert np.array_equal(density1.state, density2.state)
 
 
+def test_qmanager_circuit_permutation():
+    # circuit on qubits out of order in a compound state; same result as the reordering SWAP matrix
+    qm = QuantumManagerKet()
+    keys = [qm.new() for _ in range(3)]
+    amplitudes = np.arange(8) / math.sqrt(np.sum(np.arange(8) ** 2))
+    qm.set(keys, amplitudes)
+    circ = Circuit(2)
+    circ.cx(0, 1)
+    qm.run_circuit(circ, [keys[2], keys[0]])
+
+    assert qm.get(keys[0]).keys == [keys[2], keys[0], keys[1]]
+    # qubit order (2, 0, 1) is reached by swapping qubits 0 and 2, then 1 and 2
+    swap_02 = np.identity(8)[[0, 4, 2, 6, 1, 5, 3, 7]]
+    swap_12 = np.identity(8)[[0, 2, 1, 3, 4, 6, 5, 7]]
+    expect = np.kron(circ.get_unitary_matrix(), np.identity(2)) @ swap_12 @ swap_02 @ amplitudes
+    assert np.allclose(qm.get(keys[0]).state, expect)
+
+    qm = QuantumManagerDensity()
+    keys = [qm.new() for _ in range(3)]
+    qm.set(keys, np.outer(amplitudes, amplitudes))
+    qm.run_circuit(circ, [keys[2], keys[0]])
+    assert qm.get(keys[0]).keys == [keys[2], keys[0], keys[1]]
+    assert np.allclose(qm.get(keys[0]).state, np.outer(expect, expect))
+
+
+def test_qmanager_circuit_local_operator():
+    # 1-qubit gate on the last qubit of a 6-qubit group, same as the circuit padded with the identity
+    num_qubits = 6
+    np.random.seed(0)
+    amplitudes = np.random.random(2 ** num_qubits) - 0.5
+    amplitudes /= np.linalg.norm(amplitudes)
+    circ = Circuit(1)
+    circ.h(0)
+    padded = np.kron(circ.get_unitary_matrix(), np.identity(2 ** (num_qubits - 1)))
+    # the target qubit is moved to the front by exchanging it with the first qubit
+    bits = [format(i, "06b") for i in range(2 ** num_qubits)]
+    swap = np.identity(2 ** num_qubits)[[int(b[-1] + b[1:-1] + b[0], 2) for b in bits]]
+
+    qm = QuantumManagerKet()
+    keys = [qm.new() for _ in range(num_qubits)]
+    qm.set(keys, amplitudes)
+    qm.run_circuit(circ, [keys[-1]])
+    assert qm.get(keys[0]).keys == [keys[-1]] + keys[1:-1] + [keys[0]]
+    assert np.allclose(qm.get(keys[0]).state, padded @ swap @ amplitudes)
+
+    qm = QuantumManagerDensity()
+    keys = [qm.new() for _ in range(num_qubits)]
+    density = np.outer(amplitudes, amplitudes)
+    qm.set(keys, density)
+    qm.run_circuit(circ, [keys[-1]])
+    expect = padded @ swap @ density @ swap.T @ padded.T
+    assert np.allclose(qm.get(keys[0]).state, expect)
+
+
 def test_qmanager__measure():
     NUM_TESTS = 1000
 
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from sequence.kernel.quantum_utils import *
+
+
+def test_measurement_cache_hits():
+    cache = measure_entangled_state_with_cache_ket.cache
+    cache.clear()
+    state = np.array([0.5, 0.5, 0.5, 0.5])
+    state0, state1, prob_0 = measure_entangled_state_with_cache_ket(state, 1, 2)
+    assert prob_0 == pytest.approx(0.5)
+    assert np.allclose(state0, [0.5 ** 0.5, 0.5 ** 0.5])
+
+    # floating-point drift below the key precision hits the same entry
+    measure_entangled_state_with_cache_ket(state + 1e-15, 1, 2)
+    # other arguments and formats are separate entries
+    measure_entangled_state_with_cache_ket(state, 0, 2)
+    measure_entangled_state_with_cache_ket(state.astype(complex), 1, 2)
+    assert cache.info() == {"hits": 1, "misses": 3, "size": 3}
+    assert measurement_cache_info()["measure_entangled_state_with_cache_ket"] == cache.info()
+
+
+def test_measurement_cache_eviction():
+    def square(state):
+        return state ** 2
+
+    states = [np.array([float(i)]) for i in range(3)]
+    for policy, evicted in [("lru", 1), ("fifo", 0)]:
+        cache = MeasurementCache(maxsize=2, policy=policy)
+        cache.lookup(square, states[0], ())
+        cache.lookup(square, states[1], ())
+        cache.lookup(square, states[0], ())
+        cache.lookup(square, states[2], ())
+        assert cache.info()["size"] == 2
+        misses = cache.misses
+        cache.lookup(square, states[evicted], ())
+        assert cache.misses == misses + 1
+
+    cache = MeasurementCache(maxsize=0)
+    cache.lookup(square, states[0], ())
+    cache.lookup(square, states[0], ())
+    assert cache.info() == {"hits": 0, "misses": 2, "size": 0}
+
+    with pytest.raises(ValueError):
+        cache.configure(policy="random")
+
+
+def test_set_measurement_cache():
+    set_measurement_cache(maxsize=10, policy="fifo")
+    assert all(info["size"] == 0 for info in measurement_cache_info().values())
+    assert measure_state_with_cache_density.cache.maxsize == 10
+    assert measure_state_with_cache_density.cache.policy == "fifo"
+    set_measurement_cache(maxsize=1000, policy="lru")
@@ -92,3 +92,42 @@ def test_update_event_time():
     tl.run()
 
     assert d1.click_time == 10 and d2.click_time == 20
+
+
+def test_run_until():
+    tl = Timeline()
+    dummy = Dummy("dummy", tl)
+    for t in range(10):
+        tl.schedule(Event(t, Process(dummy, "op", [])))
+    tl.init()
+
+    assert tl.run_until(max_steps=3) == 3
+    assert dummy.counter == 3 and tl.now() == 2
+
+    assert tl.run_until(time=5) == 4
+    assert dummy.counter == 7 and tl.now() == 6
+
+    assert tl.run_until(lambda: dummy.counter == 8) == 1
+    assert tl.now() == 7
+
+    tl.run_until()
+    assert dummy.counter == 10 and tl.has_completed
+
+
+def test_snapshot_restore():
+    tl = Timeline()
+    dummy = Dummy("dummy", tl)
+    for t in range(10):
+        tl.schedule(Event(t, Process(dummy, "click", [])))
+    tl.init()
+    tl.run_until(max_steps=4)
+    snapshot = tl.snapshot()
+
+    restored = [Timeline.restore(snapshot) for _ in range(2)]
+    tl.run()
+    for new_tl in restored:
+        assert new_tl is not tl and new_tl.now() == 3 and len(new_tl.events) == 6
+        new_dummy = new_tl.entities[0]
+        assert new_dummy is not dummy and new_dummy.click_time == 3
+        new_tl.run()
+        assert new_dummy.click_time == dummy.click_time == 9
@@ -12,31 +12,42 @@ from sequence.topology.node import QuantumRouter, BSMNode
 
 def test_MemoryTimeCard_add():
     timecard = MemoryTimeCard(0)
-    r1 = Reservation("", "", 10, 20, 5, 0.9)
-    assert timecard.add(r1) is True
-    r2 = Reservation("", "", 5, 7, 5, 0.9)
-    assert timecard.add(r2) is True
-    r3 = Reservation("", "", 20, 25, 5, 0.9)
-    assert timecard.add(r3) is False
-    r4 = Reservation("", "", 15, 25, 5, 0.9)
-    assert timecard.add(r4) is False
+    r1 = Reservation("", "", 10, 20, 5, 0.9, False)
+    assert timecard.add(r1) == (True, False)
+    r2 = Reservation("", "", 5, 7, 5, 0.9, False)
+    assert timecard.add(r2) == (True, False)
+    r3 = Reservation("", "", 20, 25, 5, 0.9, False)
+    assert timecard.add(r3) == (False, False)
+    r4 = Reservation("", "", 15, 25, 5, 0.9, False)
+    assert timecard.add(r4) == (False, False)
+    assert timecard.reservations == [r2, r1]
+
+    # virtual reservations are admitted against physical ones only, and do not block them
+    r5 = Reservation("", "", 30, 40, 5, 0.9, True)
+    assert timecard.add(r5) == (True, False)
+    r6 = Reservation("", "", 30, 40, 5, 0.9, False)
+    assert timecard.add(r6) == (True, True)
+    assert r5 in timecard and r6 in timecard and r3 not in timecard
+    assert timecard.physical_reservations == [r2, r1, r6] and timecard.virtual_reservations == [r5]
 
 
 def test_MemoryTimeCard_remove():
     timecard = MemoryTimeCard(0)
-    r1 = Reservation("", "", 10, 20, 5, 0.9)
-    r2 = Reservation("", "", 5, 7, 5, 0.9)
+    r1 = Reservation("", "", 10, 20, 5, 0.9, False)
+    r2 = Reservation("", "", 5, 7, 5, 0.9, False)
     timecard.add(r1)
     assert timecard.remove(r2) is False
     assert timecard.remove(r1) is True
+    assert timecard.add(r2) == (True, False) and timecard.is_free(10, 20)
 
 
 def test_MemoryTimeCard_schedule_reservation():
     timecard = MemoryTimeCard(0)
     for _ in range(500):
         s_time = random.randint(100)
-        r = Reservation("", "", s_time, s_time + random.randint(24) + 1, 1, 0.9)
-        timecard.add(r)
+        r = Reservation("", "", s_time, s_time + random.randint(24) + 1, 1, 0.9, False)
+        free = all(r.end_time < other.start_time or other.end_time < r.start_time for other in timecard.reservations)
+        assert timecard.add(r)[0] == free
 
     for i, r in enumerate(timecard.reservations):
         if i > 0:
@@ -182,6 +193,15 @@ def test_ResourceReservationProtocol_pop():
     reset(n1)
 
 
+def test_ResourceReservationProtocol_schedule_no_memory():
+    tl = Timeline()
+    n1 = FakeNode("n1", tl)
+    reservation = Reservation("", "", 10, 20, 1, 0.9, False)
+    reservation.memory_size = 0
+    assert n1.rsvp.schedule(reservation)
+    assert all(not card.reservations for card in n1.rsvp.timecards)
+
+
 def test_ResourceReservationProtocol_schedule():
     tl = Timeline()
     n1 = FakeNode("n1", tl)
@@ -0,0 +1,42 @@
+import math
+import random
+
+from sequence.network_management.routing import RoutingOracle
+
+
+def test_RoutingOracle():
+    all_pair_dist = {"a": {"a": 0, "b": 1, "c": 2, "d": math.inf},
+                     "b": {"b": 0, "a": 1, "c": 1, "d": math.inf},
+                     "c": {"c": 0, "b": 1, "a": 2, "d": math.inf},
+                     "d": {"d": 0}}
+    oracle = RoutingOracle(all_pair_dist)
+    assert oracle.distance[oracle.ids["a"], oracle.ids["c"]] == 2
+    assert oracle.distance[oracle.ids["d"], oracle.ids["a"]] == math.inf
+
+    assert oracle.closest("c", ["a", "b"]) == "b"
+    assert oracle.closest("c", ["a", "x", None]) == "a"
+    assert oracle.closest("d", ["a", "b", "c"]) is None
+    assert oracle.closest("a", []) is None
+    # ties go to the node listed first in the distance table of the destination
+    assert oracle.closest("b", ["c", "a"]) == "a"
+    assert oracle.closest("a", ["c", "b"]) == "b"
+
+
+def test_RoutingOracle_greedy_scan():
+    # same choice as a scan of the destination's distance table
+    random.seed(0)
+    names = [str(i) for i in range(12)]
+    all_pair_dist = {}
+    for name in names:
+        others = random.sample(names, len(names))
+        all_pair_dist[name] = {other: random.choice([1, 2, 3, math.inf]) for other in others}
+    oracle = RoutingOracle(all_pair_dist)
+
+    for _ in range(200):
+        dest = random.choice(names)
+        candidates = set(random.sample(names, random.randint(0, 5)))
+        expected, least_dist = None, math.inf
+        for node, dist in all_pair_dist[dest].items():
+            if node in candidates and dist < least_dist:
+                expected, least_dist = node, dist
+        assert oracle.closest(dest, candidates) == expected
@@ -0,0 +1,87 @@
+import math
+import random
+
+import pytest
+
+from sequence.network_management.swap_planner import *
+
+
+def test_plan_schedule():
+    path = ["a", "b", "c", "d", "e"]
+    assert plan_schedule(path) == {"b": ["a", "c"], "c": ["a", "e"], "d": ["c", "e"]}
+    assert plan_schedule(path, "sequential") == {"b": ["a", "c"], "c": ["a", "d"], "d": ["a", "e"]}
+    assert plan_schedule(path, "sequential_reverse") == {"b": ["a", "e"], "c": ["b", "e"], "d": ["c", "e"]}
+    assert plan_schedule(path, ["c", "b", "d"]) == {"b": ["a", "d"], "c": ["b", "d"], "d": ["a", "e"]}
+    assert plan_schedule(["a", "b"]) == {}
+
+    # cached schedules are not shared
+    plan_schedule(path)["b"].append("x")
+    assert plan_schedule(path)["b"] == ["a", "c"]
+
+    with pytest.raises(ValueError):
+        plan_schedule(path, "unknown")
+    with pytest.raises(ValueError):
+        plan_schedule(path, ["b", "c"])
+
+
+def test_enumerate_schedules():
+    path = ["a", "b", "c", "d", "e"]
+    schedules = enumerate_schedules(path)
+    assert len(schedules) == 5
+    for policy in POLICIES:
+        assert plan_schedule(path, policy) in schedules
+    # Catalan numbers
+    assert [len(enumerate_schedules(range(n))) for n in range(2, 9)] == [1, 1, 2, 5, 14, 42, 132]
+
+
+def test_swap_order():
+    path = ["a", "b", "c", "d", "e", "f"]
+    assert swap_order(plan_schedule(path), path) == ["b", "d", "c", "e"]
+    assert swap_order(plan_schedule(path, "sequential_reverse"), path) == ["e", "d", "c", "b"]
+    with pytest.raises(ValueError):
+        swap_order({"b": ["a", "d"], "c": ["a", "d"], "d": ["c", "f"], "e": ["d", "f"]}, path)
+
+
+def test_expected_delivery_time():
+    path = ["a", "b", "c"]
+    schedule = plan_schedule(path)
+    # without expiration: expected maximum of two exponential times
+    assert expected_delivery_time(schedule, path, [1, 2]) == pytest.approx(1 + 1 / 2 - 1 / 3)
+    assert expected_delivery_time(schedule, path, [1, 2], swap_success=0.5) == pytest.approx(2 * (1 + 1 / 2 - 1 / 3))
+    assert expected_delivery_time(schedule, path, [1, 2], {"b": 0.1}) > expected_delivery_time(schedule, path, [1, 2])
+
+    # Monte Carlo of the same model
+    random.seed(0)
+    rates, lifetime = [1, 2], 0.5
+    total = 0
+    for _ in range(20000):
+        now, ready = 0, [None, None]
+        next_pair = [random.expovariate(rate) for rate in rates]
+        while True:
+            i = 0 if next_pair[0] < next_pair[1] else 1
+            if ready[1 - i] is not None and next_pair[i] - ready[1 - i] > lifetime:
+                # the waiting pair expires and is generated again
+                j = 1 - i
+                next_pair[j] = ready[j] + lifetime + random.expovariate(rates[j])
+                ready[j] = None
+                continue
+            now = next_pair[i]
+            if ready[1 - i] is not None:
+                break
+            ready[i] = now
+            next_pair[i] = math.inf
+        total += now
+    estimate = expected_delivery_time(schedule, path, rates, {"a": lifetime, "b": lifetime, "c": lifetime})
+    assert total / 20000 == pytest.approx(estimate, rel=0.03)
+
+
+def test_rank_schedules():
+    path = ["a", "b", "c", "d", "e"]
+    ranked = rank_schedules(path, [10, 10, 10, 10], {node: 0.05 for node in path}, swap_success=0.9)
+    assert len(ranked) == 5
+    assert [score for score, _ in ranked] == sorted(score for score, _ in ranked)
+
+    candidates = [plan_schedule(path, policy) for policy in POLICIES]
+    ranked = rank_schedules(path, [100, 1, 100, 100], {node: 0.05 for node in path}, schedules=candidates)
+    assert [schedule for _, schedule in ranked] == [candidates[1], candidates[2], candidates[0]]
+    assert ranked[0][0] == expected_delivery_time(candidates[1], path, [100, 1, 100, 100], {node: 0.05 for node in path})
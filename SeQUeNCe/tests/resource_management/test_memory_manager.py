@@ -41,3 +41,33 @@ def test_update():
     assert manager[0].remote_memo == 0
 
 
+
+
+def test_find():
+    tl = Timeline()
+    arr = MemoryArray("memo_arr", tl, num_memories=6)
+    manager = MemoryManager(arr)
+    assert manager.find("RAW", None, range(6)) is manager[0]
+
+    for index, node, fidelity in [(1, "alice", 0.9), (2, "bob", 0.8), (3, "alice", 0.7), (4, "alice", 0.95)]:
+        arr[index].fidelity = fidelity
+        arr[index].entangled_memory = {"node_id": node, "memo_id": 0}
+        manager.update(arr[index], "ENTANGLED")
+
+    # lowest index among matching memories, as a scan of the manager would return
+    assert manager.find("ENTANGLED", "alice", set(range(6))) is manager[1]
+    assert manager.find("ENTANGLED", "alice", {3, 4, 5}) is manager[3]
+    assert manager.find("ENTANGLED", "alice", {3, 4, 5}, 0.8) is manager[4]
+    assert manager.find("ENTANGLED", "alice", {3}, 0.8) is None
+    assert manager.find("ENTANGLED", "carol", set(range(6))) is None
+    assert manager.find("RAW", None, set(range(6))) is manager[0]
+
+    manager.update(arr[1], "OCCUPIED")
+    manager.update(arr[0], "OCCUPIED")
+    assert manager.find("ENTANGLED", "alice", set(range(6))) is manager[3]
+    assert manager.find("RAW", None, set(range(6))) is manager[5]
+    manager.update(arr[1], "RAW")
+    assert manager.find("RAW", None, set(range(6))) is manager[1]
+    assert manager.entangled_counts == {"alice": 2, "bob": 1}
+    manager.update(arr[2], "RAW")
+    assert manager.entangled_counts == {"alice": 2}
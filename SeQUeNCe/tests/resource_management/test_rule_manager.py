@@ -1,8 +1,10 @@
+import pickle
+
 from numpy import random
-from sequence.components.memory import Memory
+from sequence.components.memory import Memory, MemoryArray
 from sequence.kernel.timeline import Timeline
-from sequence.resource_management.memory_manager import MemoryInfo
-from sequence.resource_management.rule_manager import RuleManager, Rule
+from sequence.resource_management.memory_manager import MemoryInfo, MemoryManager
+from sequence.resource_management.rule_manager import RuleManager, Rule, RuleCondition
 
 random.seed(1)
 
@@ -89,3 +91,50 @@ def test_RuleManager_expire():
     protocol = ruleset.expire(rule)
     assert len(ruleset) == 0
     assert protocol == ["protocol"]
+
+
+def test_RuleCondition():
+    tl = Timeline()
+    arr = MemoryArray("memo_arr", tl, num_memories=4)
+    manager = MemoryManager(arr)
+    for index, node, fidelity in [(0, "left", 0.9), (1, "other", 0.9), (2, "right", 0.5), (3, "right", 0.9)]:
+        arr[index].fidelity = fidelity
+        arr[index].entangled_memory = {"node_id": node, "memo_id": 0}
+        manager.update(arr[index], "ENTANGLED")
+
+    condition = RuleCondition("ENTANGLED", [0, 1, 2], excluded_remote_nodes=["left"], min_fidelity=0.8)
+    assert [condition(info, manager) for info in manager] == [[], [manager[1]], [], []]
+    condition = RuleCondition("RAW", range(4))
+    assert all(condition(info, manager) == [] for info in manager)
+
+    # swapping: memories entangled with the two partners are returned together
+    condition = RuleCondition("ENTANGLED", range(4), min_fidelity=0.8, partners=("left", "right"))
+    assert condition(manager[0], manager) == [manager[0], manager[3]]
+    assert condition(manager[3], manager) == [manager[3], manager[0]]
+    assert condition(manager[1], manager) == []
+    assert condition(manager[2], manager) == []
+
+    # conditions can be pickled (unlike closures)
+    copy = pickle.loads(pickle.dumps(condition))
+    assert copy(manager[0], manager) == [manager[0], manager[3]]
+    assert repr(copy) == repr(condition)
+
+
+def test_RuleManager_match():
+    tl = Timeline()
+    memory = Memory("mem", tl, fidelity=1, frequency=0, efficiency=1, coherence_time=-1, wavelength=500)
+    info = MemoryInfo(memory, 0)
+    rule_manager = RuleManager()
+    raw_rule = Rule(1, None, RuleCondition("RAW", [0]))
+    entangled_rule = Rule(2, None, RuleCondition("ENTANGLED", [0]))
+    opaque_rule = Rule(3, None, lambda memory_info, manager: [])
+    for rule in [opaque_rule, entangled_rule, raw_rule]:
+        rule_manager.load(rule)
+
+    assert rule_manager.match(info) == [raw_rule, opaque_rule]
+    info.state = "ENTANGLED"
+    assert rule_manager.match(info) == [entangled_rule, opaque_rule]
+    rule_manager.expire(opaque_rule)
+    assert rule_manager.match(info) == [entangled_rule]
+    rule_manager.clear()
+    assert len(rule_manager) == 0 and rule_manager.match(info) == []
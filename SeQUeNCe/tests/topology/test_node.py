@@ -1,5 +1,7 @@
 from sequence.components.optical_channel import ClassicalChannel, QuantumChannel
 from sequence.kernel.timeline import Timeline
+from sequence.message import Message
+from sequence.protocol import Protocol
 from sequence.topology.node import Node, QuantumRouter, BSMNode
 
 
@@ -122,3 +124,45 @@ def test_QuantumRouter_init():
     for i in range(2, 50):
         node_name = "node%d" % i
         assert node1.map_to_middle_node[node_name] == "mid%d" % i
+
+
+def test_Node_receive_message():
+    class DummyProtocol(Protocol):
+        def received_message(self, src, msg):
+            log.append((self.name, msg.msg_type))
+            return msg.msg_type == "accept"
+
+    class OtherProtocol(DummyProtocol):
+        pass
+
+    class DummyMessage(Message):
+        def __init__(self, msg_type, receiver, protocol_type=None):
+            super().__init__(msg_type, receiver)
+            self.protocol_type = protocol_type
+
+    tl = Timeline()
+    node = Node("node", tl)
+    p1, p2, p3, p4 = [DummyProtocol(node, "p1"), DummyProtocol(node, "p2"), OtherProtocol(node, "p1"),
+                      DummyProtocol(node, "p1")]
+    for protocol in [p1, p2, p3, p4, p1]:
+        node.protocols.append(protocol)
+    assert len(node.protocols) == 4 and list(node.protocols) == [p1, p2, p3, p4]
+
+    # by name, in registration order until one accepts
+    log = []
+    node.receive_message("src", DummyMessage("reject", "p1"))
+    assert log == [("p1", "reject")] * 3
+    log = []
+    node.receive_message("src", DummyMessage("accept", "p1"))
+    assert log == [("p1", "accept")]
+
+    # by exact type, in registration order
+    log = []
+    node.receive_message("src", DummyMessage("broadcast", None, DummyProtocol))
+    assert log == [("p1", "broadcast"), ("p2", "broadcast"), ("p1", "broadcast")]
+
+    node.protocols.remove(p1)
+    assert p1 not in node.protocols and node.protocols.named("p1") == (p3, p4)
+    assert node.protocols.of_type(DummyProtocol) == (p2, p4)
+    node.protocols.append(p1)
+    assert node.protocols.named("p1") == (p3, p4, p1)
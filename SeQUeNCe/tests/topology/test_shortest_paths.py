@@ -0,0 +1,50 @@
+import random
+
+import numpy as np
+
+from sequence.topology.shortest_paths import ShortestPaths
+
+
+def test_ShortestPaths():
+    #  a - b - c
+    #   \     /
+    #    - d -
+    graph = {"a": {"b": 1, "d": 2}, "b": {"a": 1, "c": 1}, "c": {"b": 1, "d": 1}, "d": {"a": 2, "c": 1}, "e": {}}
+    paths = ShortestPaths(graph)
+
+    assert paths.distances()["a"] == {"a": 0, "b": 1, "c": 2, "d": 2, "e": float("inf")}
+    # tie between a-b-c and a-d-c goes to b (added first)
+    assert paths.forwarding_table("a") == {"b": "b", "c": "b", "d": "d"}
+    assert paths.forwarding_table("e") == {}
+    assert paths.neighbors("d") == ["a", "c"]
+
+
+def test_ShortestPaths_update():
+    random.seed(0)
+    names = [str(i) for i in range(15)]
+    graph = {name: {} for name in names}
+    for _ in range(20):
+        node1, node2 = random.sample(names, 2)
+        graph[node1][node2] = graph[node2][node1] = random.choice([1, 2, 3])
+    paths = ShortestPaths(graph)
+
+    for _ in range(100):
+        node1, node2 = random.sample(names, 2)
+        if node2 in graph[node1] and random.random() < 0.5:
+            del graph[node1][node2], graph[node2][node1]
+            updated = paths.remove_link(node1, node2)
+        else:
+            length = random.choice([1, 2, 3])
+            unchanged = graph[node1].get(node2) == length
+            graph[node1][node2] = graph[node2][node1] = length
+            updated = paths.set_link(node1, node2, length)
+            if unchanged:
+                assert updated == set()
+                continue
+        assert {node1, node2} <= updated
+
+        # same as computing from scratch
+        expected = ShortestPaths(graph)
+        assert np.array_equal(paths.distance, expected.distance)
+        assert np.array_equal(paths.previous, expected.previous)
+        assert np.array_equal(paths.next_hop, expected.next_hop)
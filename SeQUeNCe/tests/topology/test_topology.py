@@ -1,6 +1,7 @@
 import json5
 
 from sequence.topology.topology import Topology
+from sequence.topology.shortest_paths import ShortestPaths
 from sequence.kernel.timeline import Timeline
 from sequence.topology.node import *
 from sequence.components.optical_channel import *
@@ -98,6 +99,26 @@ def test_add_quantum_connection():
     assert len(channels) == 4 # 2 for each connection
 
 
+def test_remove_link():
+    tl = Timeline()
+    topo = Topology("test_topo", tl)
+    for name in ["n1", "n2", "n3"]:
+        topo.add_node(QuantumRouter(name, tl))
+    topo.add_quantum_connection("n1", "n2", attenuation=1e-5, distance=1e3)
+    topo.add_quantum_connection("n2", "n3", attenuation=1e-5, distance=1e3)
+    assert topo.generate_forwarding_table("n1") == {"n2": "n2", "n3": "n2"}
+
+    topo.shortest_paths = ShortestPaths(topo.graph_no_middle)
+    topo.add_quantum_connection("n1", "n3", attenuation=1e-5, distance=1.5e3)
+    assert topo.generate_forwarding_table("n1") == {"n2": "n2", "n3": "n3"}
+    assert topo.nodes["n1"].neighbors == ["n2", "n3"]
+
+    topo.remove_link("n1", "n2")
+    assert topo.generate_forwarding_table("n1") == {"n3": "n3", "n2": "n3"}
+    assert topo.nodes["n1"].network_manager.protocol_stack[0].forwarding_table == {"n3": "n3", "n2": "n3"}
+    assert topo.nodes["n3"].all_pair_shortest_dist["n1"]["n2"] == 2.5e3
+
+
 def test_get_nodes_by_type():
     tl = Timeline()
     topo = Topology("test_topo", tl)
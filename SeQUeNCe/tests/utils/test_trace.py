@@ -0,0 +1,68 @@
+import io
+
+import sequence.utils.trace as tr
+from sequence.kernel.entity import Entity
+from sequence.kernel.event import Event
+from sequence.kernel.process import Process
+from sequence.kernel.timeline import Timeline
+
+
+class Dummy(Entity):
+    def __init__(self, name, tl):
+        Entity.__init__(self, name, tl)
+        self.counter = 0
+
+    def init(self):
+        pass
+
+    def op(self):
+        self.counter += 1
+
+
+def _schedule(tl, dummy, n):
+    for t in range(n):
+        tl.schedule(Event(t, Process(dummy, "op", [])))
+
+
+def test_trace_disabled(capsys):
+    tr.remove_trace()
+    tl = Timeline()
+    dummy = Dummy("dummy", tl)
+    _schedule(tl, dummy, 10)
+    tl.init()
+    tl.run_step()
+    tl.run()
+
+    assert dummy.counter == 10
+    assert capsys.readouterr().out == ""
+
+
+def test_trace_enabled():
+    stream = io.StringIO()
+    tr.set_trace(stream)
+    try:
+        tl = Timeline()
+        dummy = Dummy("dummy", tl)
+        _schedule(tl, dummy, 3)
+        tl.init()
+        tl.run_step()
+        tl.run()
+    finally:
+        tr.remove_trace()
+
+    lines = stream.getvalue().splitlines()
+    assert lines[0] == "Timeline running step:  1"
+    assert lines[1] == "len(self.events):  3"
+    assert lines[2] == "Running event:  dummy->op 0"
+    assert lines[3] == "Timeline start simulation"
+    assert lines.count("Running event:  dummy->op 1") == 1
+    assert dummy.counter == 3
+
+
+def test_remove_trace():
+    stream = io.StringIO()
+    tr.set_trace(stream)
+    tr.remove_trace()
+    tr.trace("message")
+    assert tr.enabled is False
+    assert stream.getvalue() == ""
@@ -0,0 +1,141 @@
+import json
+import math
+import random
+
+import numpy as np
+import pytest
+
+from sequence.kernel.eventlist import EventList
+from sequence.kernel.timeline import Timeline
+from sequence.topology.topology import Topology
+from sequence.utils.vectorized_chain import VectorizedChain
+
+START_TIME = int(1e12)
+
+
+def build(tmp_path, nodes, swap_schedule, gen_prob=0.5, swap_prob=0.5, coherence_time=0.006, detector_efficiency=0.99):
+    # same network as the MultiVeStA model: routers 50 m apart, 1 ms classical round trip between neighbors
+    config = {"nodes": [{"name": name, "type": "QuantumRouter"} for name in nodes],
+              "qconnections": [{"node1": n1, "node2": n2, "attenuation": 0.2, "distance": 50}
+                               for n1, n2 in zip(nodes, nodes[1:])],
+              "cchannels_table": {"type": "RT", "labels": nodes,
+                                  "table": [[1e9 * abs(i - j) for j in range(len(nodes))] for i in range(len(nodes))]}}
+    config_file = tmp_path / "chain.json"
+    config_file.write_text(json.dumps(config))
+
+    tl = Timeline(10e12)
+    topology = Topology("chain", tl)
+    topology.load_config(str(config_file))
+    tl.set_topology(topology)
+    tl.src, tl.dst = nodes[0], nodes[-1]
+    tl.swap_schedule = swap_schedule
+    tl.gen_success_probability = gen_prob
+
+    for node in topology.get_nodes_by_type("QuantumRouter"):
+        node.memory_array.update_memory_params("frequency", 2e3)
+        node.memory_array.update_memory_params("coherence_time", coherence_time)
+        node.memory_array.update_memory_params("efficiency", 1)
+        node.memory_array.update_memory_params("raw_fidelity", 0.93)
+        node.network_manager.protocol_stack[1].set_swapping_success_rate(swap_prob)
+        node.network_manager.protocol_stack[1].set_swapping_degradation(0.99)
+    for node in topology.get_nodes_by_type("BSMNode"):
+        node.bsm.update_detectors_params("efficiency", detector_efficiency)
+        node.bsm.update_detectors_params("count_rate", 5e7)
+        node.bsm.update_detectors_params("time_resolution", 100)
+    for qc in topology.qchannels:
+        qc.attenuation = 1e-5
+        qc.frequency = 1e11
+
+    tl.init()
+    tl.events = EventList()
+    topology.nodes[tl.src].network_manager.request(tl.dst, start_time=START_TIME, end_time=20e12,
+                                                   memory_size=1, target_fidelity=0.4)
+    return tl
+
+
+def run_event_driven(tl, time_limit, seed):
+    # one replication of the event-driven simulation, stopped like VectorizedChain
+    tl = Timeline.restore(tl.snapshot())
+    random.seed(seed)
+    np.random.seed(seed)
+    src, dst = tl.src, tl.dst
+
+    def stopped():
+        return (src + "-" + dst) in tl.entanglement_time or (dst + "-" + src) in tl.entanglement_time or tl.hasSwapFailed
+
+    tl.run_until(stopped, time=time_limit * 1e12)
+    return tl
+
+
+def test_parameters(tmp_path):
+    tl = build(tmp_path, ["a", "b", "c", "d"], {"b": ["a", "c"], "c": ["a", "d"]})
+    chain = VectorizedChain(tl, START_TIME, target_fidelity=0.4)
+
+    assert chain.path == ["a", "b", "c", "d"]
+    assert chain.pairs == [("a", "b"), ("b", "c"), ("c", "d"), ("a", "c"), ("a", "d")]
+    assert [swap[0] for swap in chain.swaps] == ["b", "c"]
+    # negotiation round trip, emission period, photon flight and BSM result
+    assert np.all(chain.attempt_time == 1e9 + 5e8 + 125000 + 2.5e8 + 10)
+    assert np.all(chain.restart_delay == 5e8)
+    assert np.all(chain.coherence_time == 6e9)
+    assert list(chain.swap_delay) == [1e9, 2e9]
+    assert chain.double_click_probability[0] == pytest.approx(0.99 ** 2 / 8, rel=1e-3)
+
+
+def test_swap_policy(tmp_path):
+    # without a schedule, swaps follow the plan of the timeline's swap policy
+    tl = build(tmp_path, ["a", "b", "c", "d", "e"], None)
+    assert VectorizedChain(tl, START_TIME).pairs[4:] == [("a", "c"), ("c", "e"), ("a", "e")]
+    tl.swap_policy = "sequential"
+    assert VectorizedChain(tl, START_TIME).pairs[4:] == [("a", "c"), ("a", "d"), ("a", "e")]
+
+
+def test_schedule_errors(tmp_path):
+    tl = build(tmp_path, ["a", "b", "c", "d"], {"b": ["a", "d"]})
+    with pytest.raises(ValueError):
+        VectorizedChain(tl, START_TIME)
+
+
+def test_deterministic_timing(tmp_path):
+    # without randomness (every attempt and swap succeeds, no photon is detected), times match the event-driven simulation
+    tl = build(tmp_path, ["a", "b", "c", "d"], {"b": ["a", "c"], "c": ["a", "d"]},
+               gen_prob=1, swap_prob=1, detector_efficiency=0)
+    samples = VectorizedChain(tl, START_TIME, target_fidelity=0.4).run(10, 1.1, seed=0)
+    tl = run_event_driven(tl, 1.1, 0)
+
+    assert np.all(samples.entangled("a", "d"))
+    assert not samples.swap_failed().any()
+    for node1, node2 in [("a", "b"), ("c", "d")]:
+        assert np.all(samples.entanglement_time(node1, node2) == tl.entanglement_time[node1 + "-" + node2])
+    ad_time = tl.entanglement_time.get("a-d", tl.entanglement_time.get("d-a"))
+    assert np.all(samples.entanglement_time("a", "d") == ad_time)
+    assert np.all(samples.retrial_count("a", "b") == 1)
+    assert np.all(samples.retrial_count("a", "d") == 0)
+    assert np.all(samples.fidelity("a", "d") == pytest.approx(0.93 ** 3 * 0.99 ** 2))
+
+
+@pytest.mark.parametrize("nodes,swap_schedule,swap_prob,time_limit", [
+    (["a", "b", "c"], {"b": ["a", "c"]}, 0.5, 1.012),
+    (["a", "b", "c", "d"], {"b": ["a", "c"], "c": ["a", "d"]}, 1, 1.015)])
+def test_statistical_equivalence(tmp_path, nodes, swap_schedule, swap_prob, time_limit):
+    # query P(T) of the MultiVeStA model (src and dst entangled by T), with link expiration within the time limit
+    num_replications = 150
+    tl = build(tmp_path, nodes, swap_schedule, swap_prob=swap_prob)
+    src, dst = nodes[0], nodes[-1]
+
+    entangled, swap_failed, retrials = [], [], []
+    for seed in range(num_replications):
+        replication = run_event_driven(tl, time_limit, seed)
+        entangled.append((src + "-" + dst) in replication.entanglement_time
+                         or (dst + "-" + src) in replication.entanglement_time)
+        swap_failed.append(replication.hasSwapFailed)
+        # attempts started by the primary (b) of link a-b
+        retrials.append(replication.gen_exec_count[1][0])
+    samples = VectorizedChain(tl, START_TIME, target_fidelity=0.4).run(20000, time_limit, seed=0)
+
+    for event_driven, vectorized in [(entangled, samples.entangled(src, dst)),
+                                     (swap_failed, samples.swap_failed())]:
+        p = np.mean(vectorized)
+        assert abs(np.mean(event_driven) - p) <= 4 * math.sqrt(p * (1 - p) / num_replications)
+    vectorized = samples.retrial_count("b", "a")
+    assert abs(np.mean(retrials) - vectorized.mean()) < 4 * vectorized.std() / math.sqrt(num_replications)
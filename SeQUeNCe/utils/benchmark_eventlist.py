@@ -0,0 +1,44 @@
+import argparse
+import time
+
+from numpy import random
+
+from sequence.kernel.event import Event
+from sequence.kernel.eventlist import EventList
+
+
+def timed(label, func, count):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print("\t{:<20} {:>10.2f} us/op".format(label, elapsed / count * 1e6))
+
+
+if __name__ == "__main__":
+    '''
+    Program for measuring event list operations with many pending events
+    input: numbers of pending events (default 10^5 and 10^6)
+    '''
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('sizes', type=int, nargs='*', default=[100000, 1000000])
+    parser.add_argument('-o', dest='num_ops', type=int, default=10000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    for size in args.sizes:
+        print("{} pending events".format(size))
+        el = EventList()
+        events = [Event(int(t), None) for t in random.randint(0, 10 * size, size)]
+        timed("push", lambda: [el.push(e) for e in events], size)
+
+        targets = [events[i] for i in random.randint(0, size, args.num_ops)]
+        new_times = random.randint(0, 10 * size, args.num_ops)
+        timed("update_event_time", lambda: [el.update_event_time(e, int(t)) for e, t in zip(targets, new_times)],
+              args.num_ops)
+
+        removed = [events[i] for i in random.choice(size, args.num_ops, replace=False)]
+        timed("remove", lambda: [el.remove(e) for e in removed], args.num_ops)
+        assert len(el) == size - args.num_ops
+
+        timed("pop", lambda: [el.pop() for _ in range(len(el))], size - args.num_ops)
@@ -0,0 +1,61 @@
+import argparse
+import os
+import time
+
+from sequence.kernel.entity import Entity
+from sequence.kernel.event import Event
+from sequence.kernel.process import Process
+from sequence.kernel.timeline import Timeline
+from sequence.utils import trace
+
+
+class Dummy(Entity):
+    def __init__(self, name, tl):
+        Entity.__init__(self, name, tl)
+        self.counter = 0
+
+    def init(self):
+        pass
+
+    def op(self):
+        self.counter += 1
+
+
+def build(num_events):
+    tl = Timeline()
+    dummy = Dummy("dummy", tl)
+    for t in range(num_events):
+        tl.schedule(Event(t, Process(dummy, "op", [])))
+    tl.init()
+    return tl
+
+
+def events_per_second(num_events, stepping):
+    tl = build(num_events)
+    start = time.perf_counter()
+    if stepping:
+        while len(tl.events) > 0:
+            tl.run_step()
+    else:
+        tl.run()
+    return tl.run_counter / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    '''
+    Program for measuring timeline throughput (events/second) with tracing on and off
+    Tracing on writes to os.devnull and reproduces the output cost of the untraced kernel's former behavior
+    '''
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', dest='num_events', type=int, default=100000)
+    args = parser.parse_args()
+
+    with open(os.devnull, 'w') as devnull:
+        for stepping, label in [(False, "run"), (True, "run_step")]:
+            trace.set_trace(devnull)
+            traced = events_per_second(args.num_events, stepping)
+            trace.remove_trace()
+            silent = events_per_second(args.num_events, stepping)
+            print("{:>8}: traced {:>12.0f} events/s; silent {:>12.0f} events/s; speedup {:.1f}x".format(
+                label, traced, silent, silent / traced))
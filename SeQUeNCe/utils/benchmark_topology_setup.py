@@ -0,0 +1,102 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from sequence.kernel.timeline import Timeline
+from sequence.topology.shortest_paths import ShortestPaths
+from sequence.topology.topology import Topology
+
+
+def generate_links(kind, num_nodes, rng):
+    if kind == "line":
+        return [(i, i + 1) for i in range(num_nodes - 1)]
+    if kind == "ring":
+        return [(i, (i + 1) % num_nodes) for i in range(num_nodes)]
+    if kind == "grid":
+        width = int(num_nodes ** 0.5)
+        return [(i, j) for i in range(num_nodes) for j in (i + 1, i + width)
+                if j < num_nodes and (j == i + width or j % width != 0)]
+    # random tree plus one extra link per node
+    links = {(rng.randrange(i), i) for i in range(1, num_nodes)}
+    while len(links) < 2 * (num_nodes - 1):
+        i, j = sorted(rng.sample(range(num_nodes), 2))
+        links.add((i, j))
+    return sorted(links)
+
+
+def write_config(path, kind, num_nodes, memo_size, rng):
+    names = ["r{}".format(i) for i in range(num_nodes)]
+    config = {"nodes": [{"name": name, "type": "QuantumRouter", "memo_size": memo_size} for name in names],
+              "qconnections": [{"node1": names[i], "node2": names[j], "attenuation": 0.0002,
+                                "distance": rng.choice([10, 20, 50, 100])}
+                               for i, j in generate_links(kind, num_nodes, rng)]}
+    with open(path, "w") as config_file:
+        json.dump(config, config_file)
+
+
+def networkx_time(graph):
+    # reference: the former Floyd-Warshall setup (skipped if networkx is not installed)
+    try:
+        import networkx as nx
+    except ImportError:
+        return None
+    G = nx.Graph()
+    for node, links in graph.items():
+        for neighbor, distance in links.items():
+            G.add_edge(node, neighbor, weight=distance)
+    start = time.perf_counter()
+    nx.floyd_warshall(G)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    '''
+    Program for measuring network setup time (Topology.load_config) on generated topologies
+    Also reports the time for building the routing tables alone, for changing one link (incremental update), and for networkx Floyd-Warshall
+    '''
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', dest='sizes', type=int, nargs='+', default=[50, 100, 200], help='numbers of routers')
+    parser.add_argument('--topologies', nargs='+', default=["line", "ring", "grid", "random"])
+    parser.add_argument('--memo-size', type=int, default=10, help='memories per router')
+    parser.add_argument('--updates', type=int, default=20, help='link changes timed per topology')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print("{:>8} {:>6} {:>12} {:>12} {:>14} {:>10} {:>14}".format(
+        "topology", "nodes", "setup (ms)", "routing (ms)", "link chg (ms)", "sources", "networkx (ms)"))
+    with tempfile.TemporaryDirectory() as tmp:
+        config_file = os.path.join(tmp, "topology.json")
+        for kind in args.topologies:
+            for num_nodes in args.sizes:
+                write_config(config_file, kind, num_nodes, args.memo_size, rng)
+
+                start = time.perf_counter()
+                topology = Topology(kind, Timeline())
+                topology.load_config(config_file)
+                setup = time.perf_counter() - start
+
+                start = time.perf_counter()
+                ShortestPaths(topology.graph_no_middle)
+                routing = time.perf_counter() - start
+
+                # take a link out of routing and put it back
+                links = [(node, neighbor) for node in topology.graph_no_middle
+                         for neighbor in topology.graph_no_middle[node] if node < neighbor]
+                update, sources = 0, 0
+                for node1, node2 in rng.sample(links, min(args.updates, len(links))):
+                    distance = topology.graph_no_middle[node1][node2]
+                    start = time.perf_counter()
+                    sources += len(topology.shortest_paths.remove_link(node1, node2))
+                    sources += len(topology.shortest_paths.set_link(node1, node2, distance))
+                    update += time.perf_counter() - start
+                num_updates = 2 * min(args.updates, len(links))
+
+                reference = networkx_time(topology.graph_no_middle)
+                print("{:>8} {:>6} {:>12.1f} {:>12.1f} {:>14.2f} {:>10.1f} {:>14}".format(
+                    kind, num_nodes, setup * 1e3, routing * 1e3, update / num_updates * 1e3, sources / num_updates,
+                    "-" if reference is None else "{:.1f}".format(reference * 1e3)))
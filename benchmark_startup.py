@@ -0,0 +1,41 @@
+import argparse, os, statistics, subprocess, sys, time
+
+# what a multivesta python worker runs before playWithState (without the py4j gateway):
+# import the integrator and build the model and its wrapper
+WORKER_START = '''
+import time
+start = time.perf_counter()
+import MV_python_integrator
+model = MV_python_integrator.sequence_model.SequenceModel()
+wrapper = MV_python_integrator.SimulationWrapper(model)
+{first_simulation}
+elapsed = time.perf_counter() - start
+import sys
+print(elapsed, ','.join(m for m in ('qutip', 'networkx', 'matplotlib', 'scipy', 'pandas') if m in sys.modules))
+'''
+
+if __name__ == '__main__':
+    '''
+    Program for measuring the cold-start latency of a multivesta python worker (MV_python_integrator.py up to playWithState)
+    Each run is a fresh interpreter; the total includes interpreter startup, the in-process time starts at the first import
+    '''
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', dest='runs', type=int, default=5, help='number of cold starts')
+    parser.add_argument('--first-simulation', action='store_true',
+                        help='also set up the first simulation (builds the network)')
+    args = parser.parse_args()
+
+    code = WORKER_START.format(first_simulation='wrapper.setSimulatorForNewSimulation(0)' if args.first_simulation else '')
+    here = os.path.dirname(os.path.abspath(__file__))
+    totals, in_process = [], []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, '-c', code], cwd=here, capture_output=True, text=True, check=True).stdout
+        totals.append(time.perf_counter() - start)
+        elapsed, _, loaded = out.strip().partition(' ')
+        in_process.append(float(elapsed))
+
+    print(f'cold start: {statistics.median(totals) * 1e3:.0f} ms total, {statistics.median(in_process) * 1e3:.0f} ms in process '
+          f'(median of {args.runs})')
+    print(f'heavy modules loaded: {loaded or "none"}')
@@ -0,0 +1,464 @@
+import argparse, itertools, math, re, sys
+from statistics import NormalDist
+
+import sequence_model
+from MV_python_integrator import SimulationWrapper
+
+# Statistical model checking of MultiQuaTEx queries in process, as multivesta does with MV_python_integrator.py:
+# replications are run in blocks until the confidence interval of every estimated expression is small enough.
+#
+# Supported MultiQuaTEx (as used in query.multiquatex and query-store.md):
+#   P(x, y) = if (...) then ... else ... fi ;     temporal operators, with recursion
+#   # P(...)                                      next: evaluate P in the state after one simulation step
+#   s.rval(0)                                     simulated time; other observations as in SimulationWrapper.compile
+#   eval E[ P(...) ] ;  eval parametric(E[ P(...) ], x, from, step, to) ;
+# with numbers, + - * /, comparisons, && || ! and parentheses. # must be in tail position (the value of a branch).
+
+TOKEN = re.compile(r'\s*(?:(//[^\n]*)|(\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?)|("[^"]*")|'
+                   r'([A-Za-z_][A-Za-z_0-9]*)|(==|!=|<=|>=|&&|\|\||[-+*/<>!(),;=#\[\].]))')
+KEYWORDS = {'if', 'then', 'else', 'fi', 'eval', 'parametric', 'E', 'true', 'false'}
+
+
+def _either(left, right):
+    return lambda args, accessors: left(args, accessors) or right(args, accessors)
+
+
+def _both(left, right):
+    return lambda args, accessors: left(args, accessors) and right(args, accessors)
+
+
+def _apply(operator, left, right):
+    return lambda args, accessors: operator(left(args, accessors), right(args, accessors))
+
+
+class Next:
+    """Value of `# P(args)`: P is evaluated with args in the next state."""
+    __slots__ = ('name', 'args')
+
+    def __init__(self, name, args):
+        self.name, self.args = name, args
+
+
+def tokenize(text):
+    tokens, position = [], 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN.match(text, position)
+        if match is None:
+            raise SyntaxError(f'unexpected character {text[position]!r} at {position}')
+        position = match.end()
+        comment, number, string, name, symbol = match.groups()
+        if number is not None:
+            tokens.append(('number', float(number)))
+        elif string is not None:
+            tokens.append(('string', string[1:-1]))
+        elif name is not None:
+            tokens.append(('keyword' if name in KEYWORDS else 'name', name))
+        elif symbol is not None:
+            tokens.append(('symbol', symbol))
+    return tokens
+
+
+class Query:
+    """A MultiQuaTEx query compiled into Python closures.
+
+    Each expression is a function `(args, accessors) -> value` of the parameters of its definition and of the
+    accessors of the observations (in `observations` order). A definition returns a number or a `Next`.
+    `points` lists the (definition, arguments) of each estimated expression, with `labels` naming them
+    (e.g. "P_ac(T=2100)" for parametric queries).
+    """
+
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.position = 0
+        self.definitions = {}
+        self.observations = []
+        self.points, self.labels = [], []
+        self.params = ()
+        self.calls = []
+        while self.position < len(self.tokens):
+            if self.peek() == ('keyword', 'eval'):
+                self.parse_eval()
+            else:
+                self.parse_definition()
+        if not self.points:
+            raise SyntaxError('query has no eval statement')
+        for name, args in self.points + self.calls:
+            self.check_call(name, args)
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self, kind=None, value=None):
+        token = self.peek()
+        if token[0] is None or (kind is not None and token[0] != kind) or (value is not None and token[1] != value):
+            raise SyntaxError(f'expected {value or kind}, found {token[1]!r} (token {self.position})')
+        self.position += 1
+        return token[1]
+
+    def accept(self, value):
+        if self.peek()[1] == value and self.peek()[0] in ('symbol', 'keyword'):
+            self.position += 1
+            return True
+        return False
+
+    def check_call(self, name, args):
+        if name not in self.definitions:
+            raise SyntaxError(f'{name} is not defined')
+        if len(args) != len(self.definitions[name][0]):
+            raise SyntaxError(f'{name} takes {len(self.definitions[name][0])} arguments, {len(args)} given')
+
+    # statements
+
+    def parse_definition(self):
+        name = self.take('name')
+        self.take('symbol', '(')
+        params = []
+        while not self.accept(')'):
+            params.append(self.take('name'))
+            if self.peek()[1] != ')':
+                self.take('symbol', ',')
+        self.take('symbol', '=')
+        self.params = tuple(params)
+        body = self.parse_expression()
+        self.take('symbol', ';')
+        self.definitions[name] = (tuple(params), body)
+
+    def parse_eval(self):
+        self.take('keyword', 'eval')
+        self.params = ()
+        if self.accept('parametric'):
+            self.take('symbol', '(')
+            calls = [self.parse_estimate()]
+            while self.accept(','):
+                if self.peek() != ('keyword', 'E'):
+                    break
+                calls.append(self.parse_estimate())
+            variable = self.take('name')
+            self.take('symbol', ',')
+            start = self.parse_constant()
+            self.take('symbol', ',')
+            step = self.parse_constant()
+            self.take('symbol', ',')
+            end = self.parse_constant()
+            self.take('symbol', ')')
+            if step <= 0:
+                raise SyntaxError('parametric step must be positive')
+            for name, args in calls:
+                if any(isinstance(arg, str) and arg != variable for arg in args):
+                    raise SyntaxError(f'unbound parameter in E[ {name}(...) ]')
+            for k in range(int(math.floor((end - start) / step + 1e-9)) + 1):
+                value = start + k * step
+                for name, args in calls:
+                    self.points.append((name, tuple(value if arg == variable else arg for arg in args)))
+                    self.labels.append(f'{name}({variable}={value:g})')
+        else:
+            calls = [self.parse_estimate()]
+            while self.accept(','):
+                calls.append(self.parse_estimate())
+            for name, args in calls:
+                if any(isinstance(arg, str) for arg in args):
+                    raise SyntaxError(f'unbound parameter in E[ {name}(...) ]')
+                self.points.append((name, args))
+                self.labels.append(f'{name}({", ".join(f"{arg:g}" for arg in args)})')
+        self.take('symbol', ';')
+
+    def parse_estimate(self):
+        # E[ name(constant or parametric variable, ...) ]
+        self.take('keyword', 'E')
+        self.take('symbol', '[')
+        name = self.take('name')
+        self.take('symbol', '(')
+        args = []
+        while not self.accept(')'):
+            args.append(self.take('name') if self.peek()[0] == 'name' else self.parse_constant())
+            if self.peek()[1] != ')':
+                self.take('symbol', ',')
+        self.take('symbol', ']')
+        return name, tuple(args)
+
+    def parse_constant(self):
+        sign = -1 if self.accept('-') else 1
+        return sign * self.take('number')
+
+    # expressions, by increasing precedence
+
+    def parse_expression(self):
+        left = self.parse_and()
+        while self.accept('||'):
+            left = _either(left, self.parse_and())
+        return left
+
+    def parse_and(self):
+        left = self.parse_comparison()
+        while self.accept('&&'):
+            left = _both(left, self.parse_comparison())
+        return left
+
+    def parse_comparison(self):
+        left = self.parse_sum()
+        operators = {'==': lambda a, b: a == b, '!=': lambda a, b: a != b, '<': lambda a, b: a < b,
+                     '<=': lambda a, b: a <= b, '>': lambda a, b: a > b, '>=': lambda a, b: a >= b}
+        while self.peek()[0] == 'symbol' and self.peek()[1] in operators:
+            operator = operators[self.take('symbol')]
+            left = _apply(operator, left, self.parse_sum())
+        return left
+
+    def parse_sum(self):
+        left = self.parse_product()
+        while self.peek()[1] in ('+', '-') and self.peek()[0] == 'symbol':
+            if self.take('symbol') == '+':
+                left = _apply(lambda a, b: a + b, left, self.parse_product())
+            else:
+                left = _apply(lambda a, b: a - b, left, self.parse_product())
+        return left
+
+    def parse_product(self):
+        left = self.parse_unary()
+        while self.peek()[1] in ('*', '/') and self.peek()[0] == 'symbol':
+            if self.take('symbol') == '*':
+                left = _apply(lambda a, b: a * b, left, self.parse_unary())
+            else:
+                left = _apply(lambda a, b: a / b, left, self.parse_unary())
+        return left
+
+    def parse_unary(self):
+        if self.accept('!'):
+            operand = self.parse_unary()
+            return lambda args, accessors: not operand(args, accessors)
+        if self.accept('-'):
+            operand = self.parse_unary()
+            return lambda args, accessors: -operand(args, accessors)
+        if self.accept('#'):
+            name, arguments = self.parse_call()
+            return lambda args, accessors: Next(name, tuple(argument(args, accessors) for argument in arguments))
+        return self.parse_primary()
+
+    def parse_call(self):
+        # definitions may be called before they are defined, so they are checked once the query is parsed
+        name = self.take('name')
+        self.take('symbol', '(')
+        arguments = []
+        while not self.accept(')'):
+            arguments.append(self.parse_expression())
+            if self.peek()[1] != ')':
+                self.take('symbol', ',')
+        self.calls.append((name, arguments))
+        return name, arguments
+
+    def parse_primary(self):
+        kind, value = self.peek()
+        if kind == 'number':
+            self.position += 1
+            return lambda args, accessors: value
+        if self.accept('true') or self.accept('false'):
+            constant = float(value == 'true')
+            return lambda args, accessors: constant
+        if self.accept('('):
+            expression = self.parse_expression()
+            self.take('symbol', ')')
+            return expression
+        if self.accept('if'):
+            condition = self.parse_expression()
+            self.take('keyword', 'then')
+            then = self.parse_expression()
+            self.take('keyword', 'else')
+            otherwise = self.parse_expression()
+            self.take('keyword', 'fi')
+            return lambda args, accessors: then(args, accessors) if condition(args, accessors) else otherwise(args, accessors)
+        if kind == 'name' and value == 's' and self.tokens[self.position + 1:self.position + 3] == [('symbol', '.'), ('name', 'rval')]:
+            self.position += 3
+            self.take('symbol', '(')
+            observation = int(self.take('number')) if self.peek()[0] == 'number' else self.take('string')
+            self.take('symbol', ')')
+            if observation not in self.observations:
+                self.observations.append(observation)
+            index = self.observations.index(observation)
+            return lambda args, accessors: accessors[index]()
+        if kind == 'name':
+            if self.tokens[self.position + 1:self.position + 2] == [('symbol', '(')]:
+                name, arguments = self.parse_call()
+                definitions = self.definitions
+                return lambda args, accessors: definitions[name][1](
+                    tuple(argument(args, accessors) for argument in arguments), accessors)
+            self.position += 1
+            if value not in self.params:
+                raise SyntaxError(f'unknown parameter {value}')
+            index = self.params.index(value)
+            return lambda args, accessors: args[index]
+        raise SyntaxError(f'unexpected {value!r} (token {self.position})')
+
+    def accessors(self, wrapper):
+        """Accessors of the observations of the query on a SimulationWrapper (observation 0 is the simulated time)."""
+        return [wrapper.getTime if observation == 0 else wrapper.accessors[wrapper.compile(observation)]
+                for observation in self.observations]
+
+    def evaluate(self, wrapper):
+        """Evaluate all points of the query on one simulation, stepping the wrapper until every value is determined."""
+        accessors = self.accessors(wrapper)
+        definitions = self.definitions
+        values = [None] * len(self.points)
+        pending = [(i, name, args) for i, (name, args) in enumerate(self.points)]
+        while True:
+            still_pending = []
+            for i, name, args in pending:
+                value = definitions[name][1](args, accessors)
+                if isinstance(value, Next):
+                    still_pending.append((i, value.name, value.args))
+                else:
+                    values[i] = float(value)
+            if not still_pending:
+                return values
+            if wrapper.model.is_simulation_completed():
+                raise RuntimeError(f'{[self.labels[i] for i, _, _ in still_pending]} not determined when the simulation completed')
+            pending = still_pending
+            wrapper.performOneStepOfSimulation()
+
+
+# compiled queries and wrappers kept by each process running replications
+_queries = {}
+_wrappers = {}
+
+
+class QueryReplication:
+    """Picklable replication `replicate(model) -> values of all points` of a query, for ReplicationRunner."""
+
+    def __init__(self, text):
+        self.text = text
+
+    def __call__(self, model):
+        query = _queries.get(self.text)
+        if query is None:
+            query = _queries[self.text] = Query(self.text)
+        wrapper = _wrappers.get(id(model))
+        if wrapper is None or wrapper.model is not model:
+            wrapper = _wrappers[id(model)] = SimulationWrapper(model)
+        return query.evaluate(wrapper)
+
+
+class Estimate:
+    """Running mean and variance of the values of one expression."""
+
+    def __init__(self):
+        self.n, self.mean, self.m2 = 0, 0.0, 0.0
+
+    def add(self, value):
+        self.n += 1
+        change = value - self.mean
+        self.mean += change / self.n
+        self.m2 += change * (value - self.mean)
+
+    def half_width(self, z):
+        if self.n < 2:
+            return math.inf
+        return z * math.sqrt(self.m2 / (self.n - 1) / self.n)
+
+
+def estimate(text, alpha=0.05, delta=0.01, block_size=100, max_replications=math.inf, processes=1, first_seed=0,
+             **model_args):
+    """Estimate the expected value of each expression of a MultiQuaTEx query.
+
+    Replications (seeds first_seed, first_seed + 1, ...) are run in blocks of block_size until the (1 - alpha)
+    confidence interval of every expression has a half-width of at most its delta (a number, or one per expression),
+    or max_replications have been run. The interval uses the normal approximation of the sample mean.
+    With processes > 1, blocks are run on a ReplicationRunner; otherwise in this process.
+
+    Returns:
+        list of (label, mean, half-width, number of replications), one per expression.
+    """
+    return sweep(text, [{}], alpha, delta, block_size, max_replications, processes, first_seed, **model_args)[0][1]
+
+
+def sweep(text, points, alpha=0.05, delta=0.01, block_size=100, max_replications=math.inf, processes=1, first_seed=0,
+          **model_args):
+    """Estimate a MultiQuaTEx query at several points of the model parameters (see SequenceModel.update_parameters).
+
+    Every point is estimated as in estimate, by the same model (or pool of models), so the topology is loaded once.
+    Points use the same seeds (common random numbers): differences between points are due to the parameters
+    rather than to sampling. All the expressions of the query (e.g. every T of a parametric query) are evaluated
+    on each trajectory.
+
+    Args:
+        points: list of dicts of parameters, e.g. [{'lifetime': 0.002}, {'lifetime': 0.004}];
+            parameters a point does not set keep the values of model_args.
+
+    Returns:
+        list of (point, estimates of the point as returned by estimate).
+    """
+    query = Query(text)
+    deltas = list(delta) if isinstance(delta, (list, tuple)) else [delta]
+    deltas = (deltas * len(query.points))[:len(query.points)] if len(deltas) == 1 else deltas
+    if len(deltas) != len(query.points):
+        raise ValueError(f'{len(deltas)} deltas for {len(query.points)} expressions')
+    z = NormalDist().inv_cdf(1 - alpha / 2)
+    replicate = QueryReplication(text)
+
+    runner, model = None, None
+    if processes > 1:
+        runner = sequence_model.ReplicationRunner(processes, **model_args)
+    else:
+        model = sequence_model.SequenceModel(**model_args)
+        defaults = model.get_parameters()
+    results = []
+    try:
+        for point in points:
+            estimates = [Estimate() for _ in query.points]
+            seed = first_seed
+            while True:
+                seeds = range(seed, seed + int(min(block_size, max_replications - (seed - first_seed))))
+                if runner is not None:
+                    block = runner.stream(replicate, seeds, point)
+                else:
+                    model.update_parameters(**{**defaults, **point})
+                    block = _run_in_process(replicate, model, seeds)
+                for values in block:
+                    for estimate_, value in zip(estimates, values):
+                        estimate_.add(value)
+                seed = seeds.stop
+                done = all(e.half_width(z) <= d for e, d in zip(estimates, deltas))
+                if done or seed - first_seed >= max_replications:
+                    break
+            results.append((point, [(label, e.mean, e.half_width(z), e.n) for label, e in zip(query.labels, estimates)]))
+    finally:
+        if runner is not None:
+            runner.close()
+    return results
+
+
+def _run_in_process(replicate, model, seeds):
+    for seed in seeds:
+        model.set_simulator_for_new_simulation(seed)
+        yield replicate(model)
+
+
+if __name__ == '__main__':
+    # same estimation as
+    # java -jar multivesta.jar -c -m MV_python_integrator.py -f query.multiquatex -l 4 -bs 1000 -ds '[10]' -a 0.05 ...
+    # without multivesta: python3 multiquatex.py -f query.multiquatex -l 4 -bs 1000 -ds '[10]' -a 0.05
+    # and the tau loop of run.sh in one process: ... -p lifetime=0.001,0.003,0.005
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-f', dest='query', default='query.multiquatex', help='MultiQuaTEx query file')
+    parser.add_argument('-a', dest='alpha', type=float, default=0.05, help='1 - confidence of the intervals')
+    parser.add_argument('-ds', dest='deltas', default='[0.01]', help='half-width of the intervals, e.g. [0.01] or [0.01,0.02]')
+    parser.add_argument('-bs', dest='block_size', type=int, default=100, help='replications between two checks of the intervals')
+    parser.add_argument('-l', dest='processes', type=int, default=1, help='number of processes')
+    parser.add_argument('-p', dest='parameters', action='append', default=[],
+                        help='parameter values to sweep, e.g. lifetime=0.001,0.003 (all combinations of the -p options)')
+    parser.add_argument('--max-replications', type=float, default=math.inf)
+    args = parser.parse_args()
+
+    with open(args.query) as query_file:
+        text = query_file.read()
+    deltas = [float(d) for d in args.deltas.strip('[] ').split(',')]
+    names, values = [], []
+    for parameter in args.parameters:
+        name, _, parameter_values = parameter.partition('=')
+        names.append(name.strip())
+        values.append([float(value) for value in parameter_values.split(',')])
+    points = [dict(zip(names, point)) for point in itertools.product(*values)]
+    for point, estimates in sweep(text, points, args.alpha, deltas, args.block_size, args.max_replications,
+                                  args.processes):
+        for label, mean, half_width, n in estimates:
+            prefix = ''.join(f'{name}={value:g}\t' for name, value in point.items())
+            print(f'{prefix}{label}\t{mean}\t+/- {half_width}\t({n} replications)')
+    sys.stdout.flush()
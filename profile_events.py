@@ -0,0 +1,26 @@
+import argparse
+
+import sequence_model
+from sequence.kernel.profiler import Profiler
+
+if __name__ == '__main__':
+    '''
+    Program for profiling the events of SequenceModel replications (see sequence.kernel.profiler)
+    Prints, per owner type and activation method, the events scheduled, executed and invalidated and their wall time
+    '''
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', dest='runs', type=int, default=20, help='number of replications')
+    parser.add_argument('-t', dest='time_limit', type=float, default=2.1, help='time limit (in s) of a replication')
+    parser.add_argument('--by', choices=['activation', 'owner', 'method'], default='activation', help='grouping of rows')
+    parser.add_argument('--abstract-generation', action='store_true')
+    args = parser.parse_args()
+
+    model = sequence_model.SequenceModel(abstract_generation=args.abstract_generation)
+    profiler = Profiler()
+    for seed in range(args.runs):
+        model.set_simulator_for_new_simulation(seed)
+        # events scheduled while building the network are not part of the replication
+        model.tl.enable_profiling(profiler)
+        sequence_model.entangled_by(model, args.time_limit)
+    print(profiler.table(args.by))
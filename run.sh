@@ -5,6 +5,8 @@ do
     python3 update_config.py $tau
     java -jar multivesta.jar -c -m MV_python_integrator.py -sm true -f query.multiquatex -l 4 -sots 1 -sd vesta.python.simpy.SimPyState -vp false -bs 1000 -ds '[10]' -a 0.05 -otherParams "python3" >> "results/vs_tau/tau_1000_swap_limit_1to20_before_1_02.txt"
 done
+# the same tau sweep in one process (common seeds across tau values):
+# python3 multiquatex.py -f query.multiquatex -l 4 -bs 1000 -ds '[10]' -a 0.05 -p lifetime=0.001,0.003,0.005,0.007,0.009,0.011,0.013,0.015,0.017,0.019
 
 #vs mu(total time)
 # java -jar multivesta.jar -c -m MV_python_integrator.py -sm true -f query.multiquatex -l 4 -sots 1 -sd vesta.python.simpy.SimPyState -vp false -bs 500 -ds '[10]' -a 0.05 -otherParams "python3" >> "results/vs_mu/mu_500_swap_limit_10to30.txt"
@@ -1,37 +1,112 @@
 import sequence
 from numpy import random
+import random as py_random
 from sequence.kernel.timeline import Timeline
 from sequence.topology.topology import Topology
 from sequence.topology.node import *
 import math, sys
-import networkx as nx
-import matplotlib.pyplot as plt
-
+from array import array
+from functools import partial
+from multiprocessing import Pool
 from sequence.kernel.eventlist import EventList
+from sequence.utils.vectorized_chain import VectorizedChain
 import json
 
 class SequenceModel:
      
-    def __init__(self):
+    # parameters that can be changed between simulations without rebuilding the topology (see update_parameters)
+    PARAMETERS = ('lifetime', 'gen_success_probability', 'swap_success_probability', 'attenuation')
+
+    def __init__(self, time_thresholds=(), reuse_network=True, swap_schedule="balanced", abstract_generation=False,
+                 skip_generation_retries=False, lifetime=None, gen_success_probability=0.5, swap_success_probability=0.5,
+                 attenuation=1e-5):
         # #print('--------Object instantiated---------')
         self.tl : Timeline = Timeline(4e12)
         self.topology = None
         self.already_set = False
+        # times (in seconds, as returned by get_time) that queries compare against; run_until_change stops when one is crossed
+        self.time_thresholds = sorted(time_thresholds)
+        # the network is built once and each new simulation restores this snapshot of its initial state
+        self.reuse_network = reuse_network
+        self._snapshot = None
+        # snapshot of the loaded topology, before parameters are set: kept when parameters change
+        self._topology_snapshot = None
+        # entanglement request made by the source node
+        self.request_args = {'start_time': 1e12, 'end_time': 20e12, 'memory_size': 1, 'target_fidelity': 0.4}
+        # swap policy name (see swap_planner.POLICIES), swap order, or explicit schedule {node: [left, right]}
+        self.swap_schedule = swap_schedule
+        # sample generation attempts of elementary links instead of simulating photons
+        self.abstract_generation = abstract_generation
+        # with abstract_generation, sample the failed attempts before each success at once
+        self.skip_generation_retries = skip_generation_retries
+        # memory coherence time (in s; None for LIFE_TIME of config.json), success probabilities of generation and swapping,
+        # and attenuation of quantum channels
+        self.lifetime = lifetime
+        self.gen_success_probability = gen_success_probability
+        self.swap_success_probability = swap_success_probability
+        self.attenuation = attenuation
+
+    def update_parameters(self, **parameters):
+        """Change parameters (names in PARAMETERS) for the next simulations; the loaded topology is reused."""
+        for name, value in parameters.items():
+            if name not in self.PARAMETERS:
+                raise ValueError(f'unknown parameter {name}, expected one of {self.PARAMETERS}')
+            if getattr(self, name) != value:
+                setattr(self, name, value)
+                self._snapshot = None
+
+    def get_parameters(self):
+        """Current values of the parameters in PARAMETERS."""
+        return {name: getattr(self, name) for name in self.PARAMETERS}
 
     def set_simulator_for_new_simulation(self, seed: int):
         # #print('-------setting up simulator for new simulation-------')
+        if self.reuse_network:
+            if self._snapshot is None:
+                if self._topology_snapshot is None:
+                    self.build_topology()
+                    self._topology_snapshot = self.tl.snapshot()
+                else:
+                    self.tl = Timeline.restore(self._topology_snapshot)
+                    self.topology = self.tl.topology
+                self.configure()
+                self._snapshot = self.tl.snapshot()
+            self.tl = Timeline.restore(self._snapshot)
+            self.topology = self.tl.topology
+        else:
+            self.build_network()
+
+        # protocols draw from both numpy's and python's generators
         random.seed(seed)
+        py_random.seed(seed)
+
+    def build_network(self):
+        """Build, configure and initialize the network and its entanglement request (sets tl and topology)."""
+        self.build_topology()
+        self.configure()
+
+    def build_topology(self):
+        """Load the network topology on a new timeline (sets tl and topology)."""
         network_config = "linear-5-node.json"
 
         self.tl = Timeline(10e12)
-        network_topo = Topology("network_topo", self.tl)
-        network_topo.load_config(network_config)
-        self.tl.set_topology(network_topo)
+        self.topology = Topology("network_topo", self.tl)
+        self.topology.load_config(network_config)
+        self.tl.set_topology(self.topology)
+
+    def configure(self):
+        """Set the parameters of the loaded network, initialize it and make its entanglement request."""
+        network_topo = self.topology
         self.tl.gen_threshold = 100
 
         self.tl.src, self.tl.dst = "a", "c"
         # self.tl.src, self.tl.dst = "a", "d"
-        self.tl.swap_schedule = {'b':['a','c']}
+        if isinstance(self.swap_schedule, dict):
+            self.tl.swap_schedule = self.swap_schedule
+        else:
+            self.tl.swap_policy = self.swap_schedule
+        self.tl.abstract_generation = self.abstract_generation
+        self.tl.skip_generation_retries = self.skip_generation_retries
         # self.tl.swap_schedule = {'b':['a','c'], 'c':['a','d']}
         # self.tl.swap_schedule = {'b':['a','c'], 'd':['c','e'], 'c':['a','e']}
         # self.tl.swap_schedule = {'b':['a','c'], 'c':['a','d'], 'd':['a','e']}
@@ -41,14 +116,17 @@ class SequenceModel:
         # self.tl.swap_schedule = {'b':['a','d'], 'c':['b','d']}
         # self.tl.src, self.tl.dst = "a", "d"
 
-        configuration = json.load(open('config.json'))
         max_execution_time = 10
         # epr_lifetime = 0.01   #Usual value
-        epr_lifetime = float(configuration['LIFE_TIME'])
+        if self.lifetime is None:
+            configuration = json.load(open('config.json'))
+            epr_lifetime = float(configuration['LIFE_TIME'])
+        else:
+            epr_lifetime = self.lifetime
         #print(f'lifetime: {epr_lifetime}')
 
-        self.tl.gen_success_probability = 0.5
-        swap_succ_prob = 0.5
+        self.tl.gen_success_probability = self.gen_success_probability
+        swap_succ_prob = self.swap_success_probability
 
         # #For retrials experiment
         # memory_lifetime = {'a': 0.010, 'b': 0.010, 'c': 0.008, 'd':0.005, 'e':0.005}
@@ -114,7 +192,7 @@ class SequenceModel:
                     node.network_manager.protocol_stack[1].set_swapping_degradation(SWAP_DEGRADATION)
                     
                 # set quantum channel parameters
-                ATTENUATION = 1e-5
+                ATTENUATION = self.attenuation
                 #ATTENUATION = 1e-10
                 #ATTENUATION = 1e-8
                 #ATTENUATION = attenuation
@@ -129,16 +207,46 @@ class SequenceModel:
         self.tl.events = EventList()
 
         nm = network_topo.nodes[self.tl.src].network_manager
-        nm.request(self.tl.dst, start_time=1e12, end_time=20e12, memory_size=1, target_fidelity=0.4)
+        nm.request(self.tl.dst, **self.request_args)
         #print('-------simulator set up for new simulation-------')
         # tl.run()
-        self.topology = network_topo
     
+    def vectorized_chain(self) -> VectorizedChain:
+        """Vectorized engine for this experiment (same network, swap schedule and request), built from a freshly configured network."""
+        if self._snapshot is not None:
+            tl = Timeline.restore(self._snapshot)
+        else:
+            self.build_network()
+            tl = self.tl
+        return VectorizedChain(tl, int(self.request_args['start_time']), self.request_args['target_fidelity'])
+
     def one_step(self) -> None:
         #print(f'---Performing one simulation step')
         self.tl.run_step()
         return 0
 
+    def run_until_change(self) -> int:
+        """Advance the simulation until a query observable may have changed.
+
+        Steps until a pair becomes entangled for the first time (a new key of `entanglement_time`),
+        `hasSwapFailed` changes, the simulated time crosses the next declared time threshold, or the simulation completes.
+        The state reached is the one a step-by-step run would be in when the query outcome can first change.
+
+        Returns:
+            int: number of steps performed.
+        """
+        tl = self.tl
+        num_entangled = len(tl.entanglement_time)
+        swap_failed = tl.hasSwapFailed
+        now = self.get_time()
+        threshold = next((t for t in self.time_thresholds if t >= now), math.inf)
+
+        def changed():
+            return (len(tl.entanglement_time) != num_entangled or tl.hasSwapFailed != swap_failed
+                    or self.get_time() > threshold)
+
+        return tl.run_until(changed)
+
     def run(self) -> None:
         #print('---Running Simulation----')
         self.tl.run()
@@ -162,7 +270,7 @@ class SequenceModel:
         #print(f'---checking if {node1} and {node2} are entangled at simulator time:{self.tl.time*0.000000000001}')
         #print(f'self.tl.entanglement_time: {self.tl.entanglement_time}')
         #print(f'self.tl.gen_exec_count: {self.tl.gen_exec_count}')
-        return (node1+'-'+node2 in self.tl.entanglement_time.keys()) or (node2+'-'+node1 in self.tl.entanglement_time.keys())
+        return self.tl.observables.entangled(node1, node2)
         # if len(args) == 0:
         #     #print(f'---checking if {node1} and {node2} are entangled at simulator time:{self.tl.time*0.000000000001}')
         #     #if any memory is entangled -> return true
@@ -174,24 +282,22 @@ class SequenceModel:
         #     pass
         # return False
     
+    def entangled_accessor(self, node1, node2):
+        """Function returning `entangled(node1, node2)`, with the key of the pair built once."""
+        key = (node1, node2)
+        return lambda: key in self.tl.observables.entangled_pairs
+
     def entanglement_time(self, node1, node2, args = []) -> float:
-        key = node1+'-'+node2
         #print(f'self.tl.entanglement_time: {self.tl.entanglement_time}')
         #print(f'self.tl.gen_exec_count: {self.tl.gen_exec_count}')
-        if key in self.tl.entanglement_time.keys():
-            return self.tl.entanglement_time[key]
-        return -1
+        return self.tl.observables.entanglement_time(node1, node2)
 
     def get_swap_order(self):
         #print(f'swap_order: {self.tl.swap_order}')
         return self.tl.swap_order
 
     def all_mem_life_above(self, lifetime):
-        for node_obj in self.topology.get_nodes_by_type('QuantumRouter'):
-            mem_0_lifetime = node_obj.memory_array.memories[0].coherence_time
-            if mem_0_lifetime != -1 and mem_0_lifetime < lifetime:
-                return False
-        return True
+        return self.tl.observables.all_memories_live(lifetime)
     
     def swap_failed(self):
         # #print(f'---swap_failed---: {self.tl.hasSwapFailed}')
@@ -199,14 +305,18 @@ class SequenceModel:
     
     def retrial_count(self, node1, node2):
         #print(f'self.tl.gen_exec_count: {self.tl.gen_exec_count}')
-        return self.tl.gen_exec_count[ord(node1)-ord('a')][ord(node2)-ord('a')]
+        return self.tl.observables.retries(node1, node2)
+
+    def retrial_count_accessor(self, node1, node2):
+        """Function returning `retrial_count(node1, node2)`, with the indices of the pair looked up once."""
+        ids = self.tl.observables.ids
+        if node1 not in ids or node2 not in ids:
+            return lambda: self.tl.observables.retries(node1, node2)
+        index1, index2 = ids[node1], ids[node2]
+        return lambda: self.tl.gen_exec_count[index1][index2]
 
     def fidelity(self, node1, node2):
-        for node_obj in self.topology.get_nodes_by_type('QuantumRouter'):
-            mem_0_lifetime = node_obj.memory_array.memories[0].coherence_time
-            if mem_0_lifetime != -1 and mem_0_lifetime < lifetime:
-                return False
-        return True
+        return self.tl.observables.fidelity(node1, node2)
     # #Not clear how to integrate this with multivesta
     # def set_swap_schedule(self, schedule):
     #     self.tl.swap_schedule = schedule
@@ -223,4 +333,96 @@ class SequenceModel:
             
 
 
+def entangled_by(model: SequenceModel, time_limit: float, src='a', dst='c'):
+    """One replication of P_ac(T) in query.multiquatex.
+
+    Returns (1.0,) if src and dst are entangled once the time exceeds time_limit (in seconds) or as soon as they are,
+    and (0.0,) if a swap fails first.
+    """
+    model.time_thresholds = [time_limit]
+    while True:
+        model.run_until_change()
+        if model.get_time() > time_limit or model.entangled(src, dst) or model.tl.has_completed:
+            return (float(model.entangled(src, dst)),)
+        if model.swap_failed() == 1:
+            return (0.0,)
+
+
+# model kept warm (network built and snapshotted once) in each worker process of a ReplicationRunner,
+# and its parameters as built from the model arguments
+_worker_model = None
+_worker_parameters = None
+
+
+def _init_worker(model_args):
+    global _worker_model, _worker_parameters
+    _worker_model = SequenceModel(**model_args)
+    _worker_parameters = _worker_model.get_parameters()
+    _worker_model.set_simulator_for_new_simulation(0)
+
+
+def _run_replications(replicate, seeds, parameters=None):
+    # parameters of a previous call that are not given again go back to their initial values
+    _worker_model.update_parameters(**{**_worker_parameters, **(parameters or {})})
+    values = array('d')
+    for seed in seeds:
+        _worker_model.set_simulator_for_new_simulation(seed)
+        values.extend(replicate(_worker_model))
+    return values.tobytes()
+
+
+class ReplicationRunner:
+    """Runs independent replications of SequenceModel on a pool of worker processes.
+
+    Each worker builds the network once and restores it for every seed.
+    A replication is a picklable function `replicate(model) -> Sequence[float]` (e.g. `partial(entangled_by, time_limit=2.1)`)
+    called after the model is set up for the seed; it must return the same number of observations every time.
+    Observations are sent back per chunk of seeds as packed doubles.
+    Parameters of the model (see SequenceModel.update_parameters) can be changed per call of stream or run;
+    parameters a call does not give keep the values set by model_args.
+    """
+
+    def __init__(self, processes=None, chunk_size=16, **model_args):
+        self.chunk_size = chunk_size
+        self.pool = Pool(processes, initializer=_init_worker, initargs=(model_args,))
+
+    def stream(self, replicate, seeds, parameters=None):
+        """Yield one tuple of observations per seed, in seed order (with the model parameters changed first, if given)."""
+        seeds = list(seeds)
+        chunks = [seeds[i:i + self.chunk_size] for i in range(0, len(seeds), self.chunk_size)]
+        for chunk, data in zip(chunks, self.pool.imap(partial(_run_replications, replicate, parameters=parameters), chunks)):
+            values = array('d')
+            values.frombytes(data)
+            width = len(values) // len(chunk)
+            for i in range(len(chunk)):
+                yield tuple(values[i * width:(i + 1) * width])
+
+    def run(self, replicate, seeds, parameters=None):
+        """Return the list of observation tuples for all seeds."""
+        return list(self.stream(replicate, seeds, parameters))
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
 
+if __name__ == '__main__':
+    # estimate E[P_ac(T)] with replications on all cores, without multivesta
+    # (or with the vectorized engine instead of the event-driven simulation):
+    # python3 sequence_model.py [time limit in seconds] [number of replications] [vectorized]
+    time_limit = float(sys.argv[1]) if len(sys.argv) > 1 else 2.1
+    num_replications = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    if len(sys.argv) > 3 and sys.argv[3] == 'vectorized':
+        samples = list(SequenceModel().vectorized_chain().run(num_replications, time_limit).entangled('a', 'c'))
+    else:
+        with ReplicationRunner() as runner:
+            samples = [obs[0] for obs in runner.stream(partial(entangled_by, time_limit=time_limit), range(num_replications))]
+    mean = sum(samples) / len(samples)
+    variance = sum((x - mean) ** 2 for x in samples) / max(len(samples) - 1, 1)
+    print(f'E[P_ac({time_limit})] = {mean} +/- {1.96 * math.sqrt(variance / len(samples))} ({len(samples)} replications)')
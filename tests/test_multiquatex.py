@@ -0,0 +1,186 @@
+import math
+import os
+from statistics import NormalDist
+
+import pytest
+
+import multiquatex
+from MV_python_integrator import SimulationWrapper
+from multiquatex import Estimate, Query
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class StubModel:
+    """Model whose time advances by 1 per step until 10; "Entangled: (a, b)" is the parity of the seed."""
+
+    def __init__(self, lifetime=0):
+        self.parameters = {'lifetime': lifetime}
+        self.seed = None
+        self.time = 0
+
+    def update_parameters(self, **parameters):
+        self.parameters.update(parameters)
+
+    def get_parameters(self):
+        return dict(self.parameters)
+
+    def set_simulator_for_new_simulation(self, seed):
+        self.seed = seed
+        self.time = 0
+
+    def one_step(self):
+        self.time += 1
+
+    def get_time(self):
+        return self.time
+
+    def is_simulation_completed(self):
+        return int(self.time >= 10)
+
+    def entangled_accessor(self, node1, node2):
+        return lambda: self.seed % 2
+
+    def retrial_count_accessor(self, node1, node2):
+        return lambda: self.parameters['lifetime']
+
+
+def evaluate(text, seed=0):
+    model = StubModel()
+    model.set_simulator_for_new_simulation(seed)
+    return Query(text).evaluate(SimulationWrapper(model))
+
+
+def value(expression):
+    return evaluate(f'P() = if ({expression}) then 1 else 0 fi; eval E[ P() ];')[0]
+
+
+def test_precedence():
+    assert value('1 || 0 && 0') == 1
+    assert value('(1 || 0) && 0') == 0
+    assert value('0 && 1 || 1') == 1
+    assert value('1 + 1 == 2 && 3 > 2') == 1
+    assert value('2 + 3 * 4 == 14') == 1
+    assert value('10 - 4 / 2 == 8') == 1
+    assert value('!(1 == 1) || -1 < 0') == 1
+    assert value('s.rval(0) < 1 && s.rval("Entangled: (a, b)") == 0') == 1
+
+
+def test_nested_if():
+    text = '''P(x) = if (x > 1)
+                    then if (x > 2) then 3 else 2 fi
+                  else if (x > 0) then 1 else 0 fi
+                  fi;
+              eval E[ P(0) ], E[ P(1.5) ], E[ P(2.5) ], E[ P(1) ];'''
+    assert evaluate(text) == [0, 2, 3, 1]
+
+
+def test_next():
+    # arguments of # are evaluated in the current state, the body in the next one
+    text = '''// last time before 3, plus a small increment
+              P(T) = if (s.rval(0) >= 3) then T else #P(s.rval(0)+1e-7) fi;
+              eval E[ P(-1) ];'''
+    assert evaluate(text) == [2 + 1e-7]
+
+    # expressions are evaluated on the same trajectory, each until it is determined
+    text = 'P(T) = if (s.rval(0) > T) then s.rval(0) else # P(T) fi; eval E[ P(0) ], E[ P(4) ];'
+    assert evaluate(text) == [1, 5]
+
+    with pytest.raises(RuntimeError):
+        evaluate('P() = #P(); eval E[ P() ];')
+
+
+def test_parametric():
+    query = Query('P_ac(T) = if (s.rval(0) > T) then 1 else #P_ac(T) fi;'
+                  'eval parametric(E[ P_ac(T) ], T, 1, 0.009, 1.049002000110);')
+    assert len(query.points) == 6
+    assert [args[0] for _, args in query.points] == pytest.approx([1, 1.009, 1.018, 1.027, 1.036, 1.045])
+    assert query.labels[1] == 'P_ac(T=1.009)'
+
+    query = Query('P(x, y) = x + y; eval parametric(E[ P(2, y) ], E[ P(y, 0) ], y, 0, 5, 10);')
+    assert query.points == [('P', (2, 0)), ('P', (0, 0)), ('P', (2, 5)), ('P', (5, 0)), ('P', (2, 10)), ('P', (10, 0))]
+
+
+@pytest.mark.parametrize('text', [
+    'P() = x; eval E[ P() ];',                          # unknown parameter
+    'P(x) = x; eval E[ P(y) ];',                        # unbound parameter of the estimate
+    'P(x) = x; eval parametric(E[ P(y) ], x, 0, 1, 2);',
+    'eval E[ Q() ];',                                   # undefined definitions
+    'P() = #Q(); eval E[ P() ];',
+    'P(x) = x; eval E[ P(1, 2) ];',                     # wrong number of arguments
+    'P(x) = #P(); eval E[ P(1) ];',
+    'P() = 1;',                                         # no eval
+    'P() = 1 $ 2; eval E[ P() ];',                      # unexpected character
+    'P() = s.rval(1 + 1); eval E[ P() ];',              # observations must be constants
+])
+def test_syntax_error(text):
+    with pytest.raises(SyntaxError):
+        Query(text)
+
+
+def test_half_width():
+    estimate = Estimate()
+    assert estimate.half_width(1.96) == math.inf
+    for x in [1, 2, 3, 4]:
+        estimate.add(x)
+    assert estimate.n == 4
+    assert estimate.mean == pytest.approx(2.5)
+    assert estimate.half_width(1.96) == pytest.approx(1.96 * math.sqrt(5 / 3 / 4))
+
+
+def test_estimate(monkeypatch):
+    monkeypatch.setattr(multiquatex.sequence_model, 'SequenceModel', StubModel)
+    text = 'P() = s.rval("Entangled: (a, b)"); eval E[ P() ];'
+
+    # values 0, 1, 0, 1, ...: the half-width is z * sqrt(0.25 / (n - 1)) for even n, below 0.1 from n = 98
+    z = NormalDist().inv_cdf(0.975)
+    first = next(n for n in range(2, 1000, 2) if z * math.sqrt(0.25 / (n - 1)) <= 0.1)
+    [(label, mean, half_width, n)] = multiquatex.estimate(text, alpha=0.05, delta=0.1, block_size=10)
+    assert label == 'P()'
+    assert n == math.ceil(first / 10) * 10 == 100
+    assert mean == 0.5
+    assert half_width <= 0.1
+
+    # constant values stop after the first block, max_replications caps the others
+    [(_, mean, half_width, n)] = multiquatex.estimate('P() = 1; eval E[ P() ];', block_size=7)
+    assert (mean, half_width, n) == (1, 0, 7)
+    [(_, _, _, n)] = multiquatex.estimate(text, delta=0.001, block_size=10, max_replications=25)
+    assert n == 25
+
+    with pytest.raises(ValueError):
+        multiquatex.estimate('P(x) = x; eval E[ P(1) ], E[ P(2) ];', delta=[0.1, 0.1, 0.1])
+
+
+def test_sweep(monkeypatch):
+    monkeypatch.setattr(multiquatex.sequence_model, 'SequenceModel', StubModel)
+    text = '''P() = s.rval("RETRIALS: (a, b)");
+              Q() = s.rval("RETRIALS: (a, b)") + s.rval("Entangled: (a, b)");
+              eval E[ P() ], E[ Q() ];'''
+    points = [{'lifetime': 0.002}, {'lifetime': 0.004}, {'lifetime': 0.008}]
+    results = multiquatex.sweep(text, points, block_size=4, max_replications=8)
+    assert [point for point, _ in results] == points
+    for point, estimates in results:
+        assert len(estimates) == 2
+        # the second expression is not determined after one block, and both are estimated on the same replications
+        assert [n for _, _, _, n in estimates] == [8, 8]
+        assert estimates[0][1:3] == (point['lifetime'], 0)
+        assert estimates[1][1] == pytest.approx(point['lifetime'] + 0.5)
+
+    # parameters of a point do not carry over to the next points
+    results = multiquatex.sweep(text, [{'lifetime': 0.002}, {}], block_size=4, max_replications=8, lifetime=0.001)
+    assert [estimates[0][1] for _, estimates in results] == [0.002, 0.001]
+
+
+def test_sweep_processes(monkeypatch):
+    # config.json and the topology are read from the working directory
+    monkeypatch.chdir(ROOT)
+    text = '''T_ac(T) = if (s.rval(0) > T || s.rval("Entangled: (a, c)") == 1 || s.rval("SWAP_FAILED: 1") == 1)
+                     then s.rval(0)
+                 else #T_ac(T) fi;
+              eval E[ T_ac(2.1) ];'''
+    points = [{'lifetime': 0.002}, {}]
+    results = multiquatex.sweep(text, points, delta=0, block_size=3, max_replications=6, processes=2)
+    assert [point for point, _ in results] == points
+    assert results == multiquatex.sweep(text, points, delta=0, block_size=3, max_replications=6)
+    assert results[1][1] == multiquatex.sweep(text, [{}], delta=0, block_size=3, max_replications=6)[0][1]
+    assert results[0][1][0][1] != results[1][1][0][1]
@@ -0,0 +1,75 @@
+import os
+from functools import partial
+
+import pytest
+
+from sequence_model import ReplicationRunner, SequenceModel, entangled_by
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def replicate(model, seed):
+    model.set_simulator_for_new_simulation(seed)
+    result = entangled_by(model, 2.1)
+    return result, model.get_time(), model.tl.gen_exec_count, model.fidelity('a', 'c')
+
+
+def observations(model):
+    # several values per replication, from a function that can be sent to the workers
+    return entangled_by(model, 2.1) + (model.get_time(), model.retrial_count('a', 'b'), model.retrial_count('b', 'c'))
+
+
+@pytest.fixture(autouse=True)
+def configuration(monkeypatch):
+    # config.json and the topology are read from the working directory
+    monkeypatch.chdir(ROOT)
+
+
+def test_snapshot():
+    # replications restored from the snapshot of the network are those of a network built for each seed
+    def run(model, seed):
+        model.set_simulator_for_new_simulation(seed)
+        return entangled_by(model, 2.1), model.tl.time, model.tl.run_counter, model.tl.gen_exec_count
+
+    restored, built = SequenceModel(), SequenceModel(reuse_network=False)
+    for seed in range(6):
+        assert run(restored, seed) == run(built, seed)
+
+
+def test_update_parameters():
+    seeds = range(4)
+    model = SequenceModel()
+    default = [replicate(model, seed) for seed in seeds]
+
+    model.update_parameters(lifetime=0.002)
+    updated = [replicate(model, seed) for seed in seeds]
+    assert updated == [replicate(SequenceModel(lifetime=0.002), seed) for seed in seeds]
+    assert updated != default
+
+    # restoring the parameter gives back the trajectories of the default model
+    model.update_parameters(lifetime=None)
+    assert [replicate(model, seed) for seed in seeds] == default
+
+    with pytest.raises(ValueError):
+        model.update_parameters(coherence_time=0.002)
+
+
+def test_replication_runner():
+    seeds = range(7)
+    model = SequenceModel()
+    serial = []
+    for seed in seeds:
+        model.set_simulator_for_new_simulation(seed)
+        serial.append(entangled_by(model, 2.1))
+    model.update_parameters(lifetime=0.002)
+    updated = []
+    for seed in seeds:
+        model.set_simulator_for_new_simulation(seed)
+        updated.append(observations(model))
+    assert len(updated[0]) == 4
+
+    with ReplicationRunner(2, chunk_size=3) as runner:
+        assert runner.run(partial(entangled_by, time_limit=2.1), range(6)) == serial[:6]
+        # chunks of 3, 3 and 1 seeds come back in seed order
+        assert list(runner.stream(partial(entangled_by, time_limit=2.1), seeds)) == serial
+        assert runner.run(observations, seeds, parameters={'lifetime': 0.002}) == updated
@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from MV_python_integrator import SimulationWrapper
+from sequence_model import SequenceModel
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAIRS = [('a', 'c'), ('c', 'a'), ('a', 'b'), ('b', 'a'), ('b', 'c'), ('a', 'z')]
+
+
+def expected(model):
+    # observations of the query language and their values read directly from the model
+    values = {3: float(model.is_simulation_completed()), "SWAP_FAILED: 1": model.swap_failed(),
+              "MEM_LIFETIME: 0": float(model.all_mem_life_above(0)),
+              "MEM_LIFETIME: 1": float(model.all_mem_life_above(1))}
+    for node1, node2 in PAIRS:
+        values[f"Entangled: ({node1}, {node2})"] = float(model.entangled(node1, node2))
+        values[f"RETRIALS: ({node1}, {node2})"] = float(model.retrial_count(node1, node2))
+        values[f"FIDELITY: ({node1},{node2})"] = float(model.fidelity(node1, node2))
+    return values
+
+
+@pytest.fixture(autouse=True)
+def configuration(monkeypatch):
+    # config.json and the topology are read from the working directory
+    monkeypatch.chdir(ROOT)
+
+
+def test_observations():
+    model = SequenceModel()
+    wrapper = SimulationWrapper(model)
+    seen = set()
+    for seed in range(3):
+        # observations compiled for a simulation are reused by the next ones
+        wrapper.setSimulatorForNewSimulation(seed)
+        for _ in range(3000):
+            values = expected(model)
+            observations = list(values)
+            assert [wrapper.rval(observation) for observation in observations] == list(values.values())
+            assert wrapper.rvals(observations) == [wrapper.rval(observation) for observation in observations]
+            seen.update(values.items())
+            if model.is_simulation_completed():
+                break
+            wrapper.performOneStepOfSimulation()
+
+    # the observations change during the simulations
+    assert ("Entangled: (a, c)", 1.0) in seen and ("Entangled: (a, c)", 0.0) in seen
+    assert len({value for observation, value in seen if observation == "RETRIALS: (a, b)"}) > 2
+    assert len(wrapper.accessors) == len(wrapper.handles) == len(expected(model))
+
+
+def test_compile():
+    wrapper = SimulationWrapper(SequenceModel())
+    wrapper.setSimulatorForNewSimulation(0)
+    handle = wrapper.compile("Entangled: (a, c)")
+    assert wrapper.compile("Entangled: (a, c)") == handle
+    wrapper.rval("Entangled: (a, c)")
+    assert len(wrapper.accessors) == 1
+
+    # the value of unknown observations is None
+    assert wrapper.rval("UNKNOWN: 1") is None
+    assert wrapper.rval(7) is None
+    assert wrapper.rvals([7, "Entangled: (a, c)", "UNKNOWN: 1"]) == [None, 0.0, None]
+    assert len(wrapper.accessors) == 3